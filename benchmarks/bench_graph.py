@@ -0,0 +1,86 @@
+"""
+Benchmark task graph construction and topological sorting.
+
+`Flow.tasks` sorts the flow's graph on every access, and the orchestrator
+sorts the upstream tasks of its targets, so both the first (uncached) sort and
+repeated (cached) sorts matter. Task lists are also searched throughout
+orchestration, so the cost of comparing tasks is measured with a scan of all
+tasks.
+
+    python benchmarks/bench_graph.py --tasks 1000 10000
+"""
+
+import argparse
+import random
+import time
+
+from controlflow.flows.graph import Graph
+from controlflow.tasks.task import Task
+
+
+def make_tasks(n: int, shape: str) -> list[Task]:
+    rng = random.Random(0)
+    tasks = []
+    for i in range(n):
+        if shape == "chain":
+            depends_on = tasks[-1:]
+        elif shape == "wide":
+            # one root, n - 2 independent tasks, and one task that needs them all
+            if i == 0:
+                depends_on = []
+            elif i == n - 1:
+                depends_on = tasks[1:]
+            else:
+                depends_on = tasks[:1]
+        else:
+            # each task depends on up to three random earlier tasks
+            depends_on = rng.sample(tasks, min(len(tasks), 3))
+        tasks.append(Task(f"task {i}", depends_on=depends_on))
+    return tasks
+
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--shapes", nargs="+", default=["chain", "wide", "random"])
+    args = parser.parse_args()
+
+    print(
+        f"{'shape':<8}{'tasks':>8}{'build ms':>12}{'sort ms':>12}"
+        f"{'cached ms':>12}{'upstream ms':>14}{'add+upstream ms':>18}"
+        f"{'scan ms':>12}"
+    )
+    for shape in args.shapes:
+        for n in args.tasks:
+            tasks = make_tasks(n, shape)
+            graph = Graph()
+            build = timed(lambda: [graph.add_task(t) for t in tasks])
+            sort = timed(graph.topological_sort)
+            cached = timed(graph.topological_sort, repeat=1000)
+            upstream = timed(lambda: graph.upstream_tasks(tasks[-1:]))
+
+            # a task added mid-run (e.g. a generated subtask) that doesn't
+            # change the upstream tasks of the orchestrator's target
+            def add_and_query():
+                graph.add_task(Task("new task", depends_on=tasks[-1:]))
+                graph.upstream_tasks(tasks[-1:])
+
+            add_and_query = timed(add_and_query, repeat=10)
+            # compares the last task to every other task
+            scan = timed(lambda: tasks[-1] in tasks)
+            print(
+                f"{shape:<8}{n:>8}{build * 1000:>12.2f}{sort * 1000:>12.2f}"
+                f"{cached * 1000:>12.4f}{upstream * 1000:>14.2f}"
+                f"{add_and_query * 1000:>18.3f}{scan * 1000:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark per-turn event retrieval as a thread grows.
+
+Each simulated turn appends events for one task and then loads the events an
+agent would see for its current tasks, the same query `AgentContext.get_events`
+makes every orchestrator turn.
+
+    python benchmarks/bench_history.py --events 100000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from controlflow.events.events import UserMessage
+from controlflow.events.history import History, InMemoryHistory, SQLiteHistory
+
+EVENTS_PER_TURN = 10
+TASKS_PER_TURN = 2
+
+
+def run(history: History, total_events: int, checkpoints: list[int], samples: int):
+    thread_id = "benchmark"
+    agent_id = "agent"
+    results = {}
+    turn = 0
+
+    while turn * EVENTS_PER_TURN < total_events:
+        task_ids = [f"task-{turn}-{i}" for i in range(TASKS_PER_TURN)]
+        events = [
+            UserMessage(
+                content=f"turn {turn} message {i}",
+                task_ids={task_ids[i % TASKS_PER_TURN]},
+                agent_ids={agent_id},
+            )
+            for i in range(EVENTS_PER_TURN)
+        ]
+        history.add_events(thread_id, events)
+        turn += 1
+
+        size = turn * EVENTS_PER_TURN
+        if size in checkpoints:
+            start = time.perf_counter()
+            for _ in range(samples):
+                loaded = history.get_events(
+                    thread_id, agent_ids=[agent_id], task_ids=task_ids
+                )
+            elapsed = (time.perf_counter() - start) / samples
+            assert len(loaded) == EVENTS_PER_TURN
+            results[size] = elapsed
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    checkpoints = [n for n in [1_000, 10_000, 50_000, 100_000] if n <= args.events]
+    if args.events not in checkpoints:
+        checkpoints.append(args.events)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "InMemoryHistory": InMemoryHistory(history={}),
+            "SQLiteHistory": SQLiteHistory(path=Path(tmp) / "history.db"),
+        }
+        print(f"{'backend':<20}{'events':>10}{'ms / turn':>12}")
+        for name, history in backends.items():
+            for size, elapsed in run(
+                history, args.events, checkpoints, args.samples
+            ).items():
+                print(f"{name:<20}{size:>10}{elapsed * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
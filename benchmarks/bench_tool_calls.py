@@ -0,0 +1,58 @@
+"""
+Benchmark the per-call overhead of running tools with and without Prefect
+tracking.
+
+With tracking, every tool call is a Prefect task run. With
+`enable_prefect_tracking=False`, tools call their functions directly.
+
+    python benchmarks/bench_tool_calls.py --calls 50
+"""
+
+import argparse
+import time
+
+from controlflow.settings import temporary_settings
+from controlflow.tools.tools import tool
+from prefect.testing.utilities import prefect_test_harness
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+def per_call(calls: int) -> float:
+    # warm up
+    add.run(input=dict(a=1, b=2))
+    start = time.perf_counter()
+    for i in range(calls):
+        add.run(input=dict(a=i, b=i))
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'calls':>8}{'us/call':>14}")
+
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        add.fn(a=1, b=2)
+    direct = (time.perf_counter() - start) / args.calls
+    print(f"{'function':<12}{args.calls:>8}{direct * 1e6:>14.1f}")
+
+    with temporary_settings(enable_prefect_tracking=False):
+        untracked = per_call(args.calls)
+    print(f"{'untracked':<12}{args.calls:>8}{untracked * 1e6:>14.1f}")
+
+    # tracked runs need a Prefect API; use a temporary one
+    with prefect_test_harness():
+        tracked = per_call(args.calls)
+    print(f"{'tracked':<12}{args.calls:>8}{tracked * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,27 @@ import logging
 import random
 import uuid
 from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncGenerator,
     Callable,
+    ClassVar,
     Generator,
     Optional,
 )
 
 from langchain_core.language_models import BaseChatModel
-from pydantic import Field, field_serializer
+from pydantic import Field, PrivateAttr, field_serializer
 
 import controlflow
 from controlflow.events.base import Event
 from controlflow.instructions import get_instructions
 from controlflow.llm.messages import AIMessage, BaseMessage
 from controlflow.llm.rules import LLMRules
-from controlflow.tools.tools import handle_tool_call, handle_tool_call_async
+from controlflow.tools.tools import handle_tool_calls, handle_tool_calls_async
+from controlflow.utilities.caching import IdentityKey, LRUCache
 from controlflow.utilities.context import ctx
 from controlflow.utilities.types import ControlFlowModel
 
@@ -28,6 +31,8 @@ from .memory import Memory
 from .names import AGENTS
 
 if TYPE_CHECKING:
+    from controlflow.llm.cache import CachedModelCall
+    from controlflow.llm.tokenizers import Tokenizer
     from controlflow.orchestration.agent_context import AgentContext
     from controlflow.tasks.task import Task
     from controlflow.tools.tools import Tool
@@ -35,6 +40,51 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class BoundModel:
+    model: BaseChatModel
+    tools: list["Tool"]
+    bound_model: BaseChatModel
+    llm_rules: LLMRules
+
+
+class BoundModelCache:
+    """
+    A bounded cache of models with tools bound to them, so that turns with the
+    same model and tools don't serialize the tool schemas and bind them again.
+    Entries are keyed by the identity of the model and of each tool.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self._entries: LRUCache[tuple, BoundModel] = LRUCache(max_size=max_size)
+
+    def get(self, model: BaseChatModel, tools: list["Tool"] = None) -> BoundModel:
+        tools = list(tools or [])
+        key = (IdentityKey(model), tuple(IdentityKey(t) for t in tools))
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        if tools:
+            bound_model = model.bind_tools([t.to_lc_tool() for t in tools])
+        else:
+            bound_model = model
+        entry = BoundModel(
+            model=model,
+            tools=tools,
+            bound_model=bound_model,
+            llm_rules=controlflow.llm.rules.rules_for_model(model),
+        )
+        self._entries.set(key, entry)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+
+bound_model_cache = BoundModelCache()
+
+
 class BaseAgent(ControlFlowModel, abc.ABC):
     """
     A base class for agents, which are entities that can complete tasks.
@@ -53,6 +103,9 @@ class BaseAgent(ControlFlowModel, abc.ABC):
         "Prompts are formatted as jinja templates, with keywords `agent: Agent` and `context: AgentContext`.",
     )
 
+    # the most recently rendered prompt, with the key it was rendered for
+    _prompt_cache: Optional[tuple] = PrivateAttr(None)
+
     def serialize_for_prompt(self) -> dict:
         return self.model_dump()
 
@@ -118,6 +171,7 @@ class Agent(BaseAgent):
     )
 
     _cm_stack: list[contextmanager] = []
+    _cache_content_fields: ClassVar[tuple[str, ...]] = ("tools",)
 
     @field_serializer("tools")
     def _serialize_tools(self, tools: list[Callable]):
@@ -150,20 +204,27 @@ class Agent(BaseAgent):
         """
         Retrieve the LLM model for this agent
         """
+        return self._get_bound_model(tools=tools).bound_model
+
+    def get_llm_rules(self) -> LLMRules:
+        """
+        Retrieve the LLM rules for this agent's model
+        """
+        return self._get_bound_model().llm_rules
+
+    def _get_bound_model(self, tools: list["Tool"] = None) -> BoundModel:
         model = self.model or controlflow.defaults.model
         if model is None:
             raise ValueError(
                 f"Agent {self.name}: No model provided and no default model could be loaded."
             )
-        if tools:
-            model = model.bind_tools([t.to_lc_tool() for t in tools])
-        return model
+        return bound_model_cache.get(model, tools=tools)
 
-    def get_llm_rules(self) -> LLMRules:
+    def get_tokenizer(self) -> "Tokenizer":
         """
-        Retrieve the LLM rules for this agent's model
+        Retrieve the tokenizer used to count tokens for this agent's model
         """
-        return controlflow.llm.rules.rules_for_model(self.get_model())
+        return controlflow.llm.tokenizers.tokenizer_for_model(self.get_model())
 
     def get_tools(self) -> list[Callable]:
         from controlflow.tools.talk_to_user import talk_to_user
@@ -199,23 +260,71 @@ class Agent(BaseAgent):
         context.add_tools(self.get_tools())
         context.add_instructions(get_instructions())
         messages = context.compile_messages(agent=self)
-        for event in self._run_model(messages=messages, tools=context.tools):
+        for event in self._run_model(
+            messages=messages,
+            tools=context.tools,
+            cache_ids=context.get_cache_ids(agent=self),
+        ):
             context.handle_event(event)
 
     async def _run_async(self, context: "AgentContext"):
         context.add_tools(self.get_tools())
         context.add_instructions(get_instructions())
         messages = context.compile_messages(agent=self)
-        async for event in await self._run_model(
-            messages=messages, tools=context.tools
+        async for event in self._run_model_async(
+            messages=messages,
+            tools=context.tools,
+            cache_ids=context.get_cache_ids(agent=self),
         ):
             context.handle_event(event)
 
+    def _get_cached_response(
+        self,
+        bound_model: BoundModel,
+        messages: list[BaseMessage],
+        stream: bool,
+        cache_ids: list[str] = None,
+    ) -> tuple[Optional["CachedModelCall"], Optional[BaseMessage], list[Event]]:
+        """
+        Look up a model call in the response cache. Returns the cache entry
+        (None if the cache is disabled), the cached response (None if there
+        isn't one), and the events that replay it.
+        """
+        from controlflow.events.events import AgentMessageDelta
+
+        cache = controlflow.llm.cache.get_response_cache()
+        if cache is None:
+            return None, None, []
+
+        cached_call = controlflow.llm.cache.CachedModelCall(
+            cache,
+            bound_model.model,
+            messages=messages,
+            tools=bound_model.tools,
+            ids=cache_ids or [],
+        )
+        response = cached_call.get()
+        if response is None or not stream:
+            return cached_call, response, []
+
+        # replay the cached response as deltas so handlers see the same events
+        # as a live response
+        events = []
+        response = None
+        for delta in controlflow.llm.cache.replay_deltas(cached_call.response):
+            if response is None:
+                response = delta
+            else:
+                response += delta
+            events.append(AgentMessageDelta(agent=self, delta=delta, snapshot=response))
+        return cached_call, response, events
+
     def _run_model(
         self,
         messages: list[BaseMessage],
         tools: list["Tool"],
         stream: bool = True,
+        cache_ids: list[str] = None,
     ) -> Generator[Event, None, None]:
         from controlflow.events.events import (
             AgentMessage,
@@ -224,9 +333,16 @@ class Agent(BaseAgent):
             ToolResultEvent,
         )
 
-        model = self.get_model(tools=tools)
+        bound_model = self._get_bound_model(tools=tools)
+        model = bound_model.bound_model
 
-        if stream:
+        cached_call, response, replay_events = self._get_cached_response(
+            bound_model, messages=messages, stream=stream, cache_ids=cache_ids
+        )
+        if response is not None:
+            yield from replay_events
+
+        elif stream:
             response = None
             for delta in model.stream(messages):
                 if response is None:
@@ -239,11 +355,17 @@ class Agent(BaseAgent):
         else:
             response: AIMessage = model.invoke(messages)
 
+        if cached_call is not None:
+            cached_call.set(response)
+
         yield AgentMessage(agent=self, message=response)
 
-        for tool_call in response.tool_calls + response.invalid_tool_calls:
+        # run the tool calls in parallel, but emit their events in order
+        tool_calls = response.tool_calls + response.invalid_tool_calls
+        for tool_call in tool_calls:
             yield ToolCallEvent(agent=self, tool_call=tool_call)
-            result = handle_tool_call(tool_call, tools=tools)
+        results = handle_tool_calls(tool_calls, tools=tools)
+        for tool_call, result in zip(tool_calls, results):
             yield ToolResultEvent(agent=self, tool_call=tool_call, tool_result=result)
 
     async def _run_model_async(
@@ -251,6 +373,7 @@ class Agent(BaseAgent):
         messages: list[BaseMessage],
         tools: list["Tool"],
         stream: bool = True,
+        cache_ids: list[str] = None,
     ) -> AsyncGenerator[Event, None]:
         from controlflow.events.events import (
             AgentMessage,
@@ -259,9 +382,17 @@ class Agent(BaseAgent):
             ToolResultEvent,
         )
 
-        model = self.get_model(tools=tools)
+        bound_model = self._get_bound_model(tools=tools)
+        model = bound_model.bound_model
 
-        if stream:
+        cached_call, response, replay_events = self._get_cached_response(
+            bound_model, messages=messages, stream=stream, cache_ids=cache_ids
+        )
+        if response is not None:
+            for event in replay_events:
+                yield event
+
+        elif stream:
             response = None
             async for delta in model.astream(messages):
                 if response is None:
@@ -274,11 +405,17 @@ class Agent(BaseAgent):
         else:
             response: AIMessage = await model.ainvoke(messages)
 
+        if cached_call is not None:
+            cached_call.set(response)
+
         yield AgentMessage(agent=self, message=response)
 
-        for tool_call in response.tool_calls + response.invalid_tool_calls:
-            yield ToolCallEvent(agent=self, tool_call=tool_call, message=response)
-            result = await handle_tool_call_async(tool_call, tools=tools)
+        # run the tool calls concurrently, but emit their events in order
+        tool_calls = response.tool_calls + response.invalid_tool_calls
+        for tool_call in tool_calls:
+            yield ToolCallEvent(agent=self, tool_call=tool_call)
+        results = await handle_tool_calls_async(tool_calls, tools=tools)
+        for tool_call, result in zip(tool_calls, results):
             yield ToolResultEvent(agent=self, tool_call=tool_call, tool_result=result)
 
 
@@ -1,7 +1,7 @@
 import abc
 import logging
 import random
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, ClassVar, Optional
 
 from pydantic import Field, field_validator
 
@@ -34,6 +34,7 @@ class Team(BaseAgent):
         default_factory=list,
     )
     _iterations: int = 0
+    _cache_content_fields: ClassVar[tuple[str, ...]] = ("agents",)
 
     @field_validator("agents", mode="before")
     def validate_agents(cls, v):
@@ -41,6 +42,10 @@ class Team(BaseAgent):
             raise ValueError("A team must have at least one agent.")
         return v
 
+    def _cache_key(self) -> tuple:
+        # the team is rendered with its agents' details
+        return (*super()._cache_key(), *(a._cache_key() for a in self.agents))
+
     def serialize_for_prompt(self) -> dict:
         data = self.model_dump(exclude={"agents"})
         data["agents"] = [agent.serialize_for_prompt() for agent in self.agents]
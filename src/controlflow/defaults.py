@@ -1,6 +1,6 @@
-from typing import Any, Optional
+from typing import Annotated, Any, Optional
 
-from pydantic import field_validator
+from pydantic import AfterValidator, PrivateAttr, TypeAdapter
 
 import controlflow
 import controlflow.utilities
@@ -17,6 +17,17 @@ __all__ = ["defaults"]
 logger = controlflow.utilities.logging.get_logger(__name__)
 
 
+def _validate_model(v: Any) -> Optional[BaseChatModel]:
+    if isinstance(v, str):
+        v = model_from_string(v)
+    elif v is not None and not isinstance(v, BaseChatModel):
+        raise ValueError("Input must be an instance of BaseChatModel")
+    return v
+
+
+_model_adapter = TypeAdapter(Annotated[Any, AfterValidator(_validate_model)])
+
+
 class Defaults(ControlFlowModel):
     """
     This class holds the default values for various parts of the ControlFlow
@@ -27,26 +38,46 @@ class Defaults(ControlFlowModel):
     is imported, and then used as a singleton.
     """
 
-    model: Optional[Any]
     history: History
     agent: Agent
     # add more defaults here
 
+    # the model set by the user, if any
+    _model: Optional[BaseChatModel] = PrivateAttr(default=None)
+    # models created from settings, keyed by model string and temperature
+    _settings_models: dict[tuple[str, float], Optional[BaseChatModel]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    def __init__(self, model: Any = None, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+
     def __repr__(self) -> str:
-        fields = ", ".join(self.model_fields.keys())
+        fields = ", ".join(["model", *self.model_fields.keys()])
         return f"<ControlFlow Defaults: {fields}>"
 
-    @field_validator("model")
-    def _model(cls, v):
-        if isinstance(v, str):
-            v = model_from_string(v)
-        elif v is not None and not isinstance(v, BaseChatModel):
-            raise ValueError("Input must be an instance of BaseChatModel")
-        return v
+    @property
+    def model(self) -> Optional[BaseChatModel]:
+        """
+        The default LLM model. If no model has been set, one is created from
+        `controlflow.settings.llm_model` the first time it's needed and reused
+        until that setting changes. If it can't be created, this is None.
+        """
+        if self._model is not None:
+            return self._model
+
+        key = (controlflow.settings.llm_model, controlflow.settings.llm_temperature)
+        if key not in self._settings_models:
+            self._settings_models[key] = _get_initial_default_model()
+        return self._settings_models[key]
+
+    @model.setter
+    def model(self, model: Any):
+        self._model = _model_adapter.validate_python(model)
 
 
 defaults = Defaults(
-    model=_get_initial_default_model(),
     history=InMemoryHistory(),
     agent=Agent(name="Marvin"),
 )
@@ -1,11 +1,14 @@
 import abc
 import json
 import math
+import os
+import sqlite3
+import threading
 from functools import cache
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterable, Iterator, Optional, Union
 
-from pydantic import Field, TypeAdapter, field_validator
+from pydantic import Field, PrivateAttr, TypeAdapter, field_validator, model_validator
 
 import controlflow
 from controlflow.events.base import Event
@@ -25,9 +28,8 @@ from controlflow.utilities.types import ControlFlowModel
 IN_MEMORY_STORE = {}
 
 
-@cache
-def get_event_validator() -> TypeAdapter:
-    types = Union[
+def _event_types():
+    return Union[
         TaskReadyEvent,
         TaskCompleteEvent,
         SelectAgent,
@@ -38,7 +40,16 @@ def get_event_validator() -> TypeAdapter:
         ToolResultEvent,
         Event,
     ]
-    return TypeAdapter(list[types])
+
+
+@cache
+def get_event_validator() -> TypeAdapter:
+    return TypeAdapter(list[_event_types()])
+
+
+@cache
+def get_single_event_validator() -> TypeAdapter:
+    return TypeAdapter(_event_types())
 
 
 def filter_events(
@@ -64,11 +75,38 @@ def filter_events(
     Returns:
         list[Event]: The filtered list of events.
     """
+    return filter_events_reversed(
+        reversed(events),
+        agent_ids=agent_ids,
+        task_ids=task_ids,
+        types=types,
+        before_id=before_id,
+        after_id=after_id,
+        limit=limit,
+    )
+
+
+def filter_events_reversed(
+    events: Iterable[Event],
+    agent_ids: Optional[list[str]] = None,
+    task_ids: Optional[list[str]] = None,
+    types: Optional[list[str]] = None,
+    before_id: Optional[str] = None,
+    after_id: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> list[Event]:
+    """
+    Filters events that are provided newest-first, returning the matches in
+    chronological order. The iterable is consumed lazily, so backends that can
+    produce events from the end of a thread only load as many as are needed.
+
+    Accepts the same criteria as `filter_events`.
+    """
     new_events = []
     seen_before_id = True if not before_id else False
-    seen_after_id = False if not after_id else True
+    seen_after_id = False
 
-    for event in reversed(events):
+    for event in events:
         if event.id == before_id:
             seen_before_id = True
         if event.id == after_id:
@@ -135,12 +173,152 @@ class History(ControlFlowModel, abc.ABC):
 
 
 class InMemoryHistory(History):
+    """
+    A history that keeps events in memory.
+
+    By default, every event is kept for the life of the process. For
+    long-lived processes, the history can be bounded: `max_events_per_thread`
+    and `max_bytes_per_thread` keep only each thread's most recent events, and
+    `max_threads` evicts the least recently used threads.
+
+    If a `spill_history` is provided, evicted threads and dropped events are
+    written to it, and evicted threads are loaded back in when they're used
+    again.
+
+    Unbounded histories share a global store by default. Bounded histories
+    use their own store unless one is provided, so they don't evict threads
+    that other histories are using.
+    """
+
     history: dict[str, list[Event]] = Field(
         default_factory=lambda: IN_MEMORY_STORE, repr=False
     )
+    max_threads: Optional[int] = Field(
+        None,
+        ge=1,
+        description="The maximum number of threads to keep in memory. If more "
+        "threads are used, the least recently used ones are evicted.",
+    )
+    max_events_per_thread: Optional[int] = Field(
+        None,
+        ge=1,
+        description="The maximum number of events to keep in memory for each "
+        "thread. Older events are dropped.",
+    )
+    max_bytes_per_thread: Optional[int] = Field(
+        None,
+        ge=1,
+        description="The maximum size of each thread's events in memory, "
+        "measured as serialized JSON. Older events are dropped.",
+    )
+    spill_history: Optional[History] = Field(
+        None,
+        description="A history, such as a SQLiteHistory, that evicted threads "
+        "and dropped events are written to, and that evicted threads are loaded "
+        "from. If None, evicted threads and dropped events are discarded.",
+    )
+
+    # the serialized size of each in-memory event, if sizes are bounded
+    _event_sizes: dict[str, list[int]] = PrivateAttr(default_factory=dict)
+    # the number of a thread's leading events that are already stored in the
+    # spill history
+    _spilled_counts: dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _private_store_when_bounded(cls, data):
+        if isinstance(data, dict) and "history" not in data:
+            limits = ("max_threads", "max_events_per_thread", "max_bytes_per_thread")
+            if any(data.get(limit) is not None for limit in limits):
+                data = {**data, "history": {}}
+        return data
+
+    @property
+    def _is_bounded(self) -> bool:
+        return (
+            self.max_threads is not None
+            or self.max_events_per_thread is not None
+            or self.max_bytes_per_thread is not None
+        )
 
     def add_events(self, thread_id: str, events: list[Event]):
-        self.history.setdefault(thread_id, []).extend(events)
+        if not self._is_bounded:
+            self.history.setdefault(thread_id, []).extend(events)
+            return
+
+        with self._lock:
+            thread_events = self._load_thread(thread_id, create=True)
+            if self.max_bytes_per_thread is not None:
+                self._event_sizes.setdefault(thread_id, []).extend(
+                    _event_size(e) for e in events
+                )
+            thread_events.extend(events)
+            self._trim_thread(thread_id)
+            self._evict_threads()
+
+    def _load_thread(self, thread_id: str, create: bool = False) -> list[Event]:
+        """
+        Get a thread's events, loading them from the spill history if the
+        thread was evicted, and mark the thread as recently used.
+        """
+        if thread_id in self.history:
+            # move the thread to the end of the LRU order
+            events = self.history[thread_id] = self.history.pop(thread_id)
+            return events
+
+        events = []
+        if self.spill_history is not None:
+            events = self.spill_history.get_events(
+                thread_id, limit=self.max_events_per_thread
+            )
+        if not events and not create:
+            return events
+
+        self.history[thread_id] = events
+        self._spilled_counts[thread_id] = len(events)
+        self._trim_thread(thread_id)
+        self._evict_threads()
+        return events
+
+    def _trim_thread(self, thread_id: str):
+        events = self.history[thread_id]
+        drop = 0
+        if self.max_events_per_thread is not None:
+            drop = max(0, len(events) - self.max_events_per_thread)
+        if self.max_bytes_per_thread is not None:
+            sizes = self._event_sizes.get(thread_id)
+            if sizes is None or len(sizes) != len(events):
+                sizes = self._event_sizes[thread_id] = [_event_size(e) for e in events]
+            total = sum(sizes[drop:])
+            # always keep the most recent event, even if it's too big
+            while total > self.max_bytes_per_thread and drop < len(events) - 1:
+                total -= sizes[drop]
+                drop += 1
+            del sizes[:drop]
+        if drop:
+            spilled = self._spilled_counts.get(thread_id, 0)
+            # write dropped events to the spill history so it has no gaps
+            if self.spill_history is not None and drop > spilled:
+                self.spill_history.add_events(thread_id, events[spilled:drop])
+            del events[:drop]
+            self._spilled_counts[thread_id] = max(0, spilled - drop)
+
+    def _evict_threads(self):
+        if self.max_threads is None:
+            return
+        # threads are kept in LRU order, so evict from the front
+        for thread_id in list(self.history):
+            if len(self.history) <= self.max_threads:
+                break
+            self._evict_thread(thread_id)
+
+    def _evict_thread(self, thread_id: str):
+        events = self.history.pop(thread_id)
+        self._event_sizes.pop(thread_id, None)
+        spilled = self._spilled_counts.pop(thread_id, 0)
+        if self.spill_history is not None and events[spilled:]:
+            self.spill_history.add_events(thread_id, events[spilled:])
 
     def get_events(
         self,
@@ -167,7 +345,11 @@ class InMemoryHistory(History):
             list[Event]: A list of events that match the specified criteria.
 
         """
-        events = self.history.get(thread_id, [])
+        if not self._is_bounded:
+            events = self.history.get(thread_id, [])
+        else:
+            with self._lock:
+                events = list(self._load_thread(thread_id))
         return filter_events(
             events=events,
             agent_ids=agent_ids,
@@ -179,6 +361,10 @@ class InMemoryHistory(History):
         )
 
 
+def _event_size(event: Event) -> int:
+    return len(event.model_dump_json().encode())
+
+
 class FileHistory(History):
     base_path: Path = Field(
         default_factory=lambda: controlflow.settings.home_path / "filestore_events"
@@ -246,3 +432,396 @@ class FileHistory(History):
         all_events.extend([event.model_dump(mode="json") for event in events])
         with open(self.path(thread_id), "w") as f:
             json.dump(all_events, f)
+
+
+def _read_lines_reversed(path: Path, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Yields the complete lines of a file from last to first, reading it
+    backwards in fixed-size blocks. Only newline-terminated lines are
+    yielded; a trailing partial line (e.g. from an interrupted write) is
+    ignored.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        # the first segment we see is everything after the final newline,
+        # which is either empty or an incomplete write
+        tail_skipped = False
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # the first segment may be the end of a line that started in an
+            # earlier block, so hold on to it until we read that block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if not tail_skipped:
+                    tail_skipped = True
+                elif line:
+                    yield line
+
+        if tail_skipped and remainder:
+            yield remainder
+
+
+def _truncate_partial_tail(path: Path, block_size: int = 64 * 1024) -> None:
+    """
+    If a file does not end with a newline, truncate it after its last newline
+    so that an interrupted write can't corrupt the next appended line.
+    """
+    with open(path, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+
+        position = end
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            index = f.read(read_size).rfind(b"\n")
+            if index != -1:
+                f.truncate(position + index + 1)
+                return
+        f.truncate(0)
+
+
+class JSONLHistory(History):
+    """
+    An append-only history that stores each thread as a JSON Lines file, with
+    one event per line.
+
+    Adding events appends to the end of the file without reading it, and
+    retrieving events parses the file from the end, so a request like
+    `limit=50` only validates the last 50 matching events.
+
+    Writes are flushed immediately but only fsynced to disk every
+    `fsync_batch_size` events. If a write is interrupted, the incomplete final
+    line is ignored on read and removed before the next append.
+    """
+
+    base_path: Path = Field(
+        default_factory=lambda: controlflow.settings.home_path / "filestore_events"
+    )
+    fsync_batch_size: Optional[int] = Field(
+        100,
+        description="The number of events to write before forcing them to disk with "
+        "fsync. If None, durability is left to the operating system.",
+    )
+
+    _unsynced_events: dict[str, int] = PrivateAttr(default_factory=dict)
+    _checked_tails: set[str] = PrivateAttr(default_factory=set)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def path(self, thread_id: str) -> Path:
+        return self.base_path / f"{thread_id}.jsonl"
+
+    @field_validator("base_path", mode="before")
+    def _validate_path(cls, v):
+        v = Path(v).expanduser()
+        if not v.exists():
+            v.mkdir(parents=True, exist_ok=True)
+        return v
+
+    def _iter_events_reversed(self, thread_id: str) -> Iterator[Event]:
+        validator = get_single_event_validator()
+        for line in _read_lines_reversed(self.path(thread_id)):
+            yield validator.validate_json(line)
+
+    def get_events(
+        self,
+        thread_id: str,
+        types: Optional[list[str]] = None,
+        agent_ids: Optional[list[str]] = None,
+        task_ids: Optional[list[str]] = None,
+        before_id: Optional[str] = None,
+        after_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[Event]:
+        """
+        Retrieves a list of events based on the specified criteria, reading the
+        thread's file from the end and stopping as soon as enough events have
+        been found.
+
+        Args:
+            thread_id (str): The ID of the thread to retrieve events from.
+            types (Optional[list[str]]): The list of event types to filter by (default: None).
+            before_id (Optional[str]): The ID of the event before which to stop retrieving events (default: None).
+            after_id (Optional[str]): The ID of the event after which to start retrieving events (default: None).
+            limit (Optional[int]): The maximum number of events to retrieve (default: None).
+
+        Returns:
+            list[Event]: A list of events that match the specified criteria.
+        """
+        if not self.path(thread_id).exists():
+            return []
+
+        return filter_events_reversed(
+            self._iter_events_reversed(thread_id),
+            agent_ids=agent_ids,
+            task_ids=task_ids,
+            types=types,
+            before_id=before_id,
+            after_id=after_id,
+            limit=limit,
+        )
+
+    def add_events(self, thread_id: str, events: list[Event]):
+        if not events:
+            return
+
+        data = "".join(event.model_dump_json() + "\n" for event in events)
+        path = self.path(thread_id)
+
+        with self._lock:
+            if thread_id not in self._checked_tails:
+                if path.exists():
+                    _truncate_partial_tail(path)
+                self._checked_tails.add(thread_id)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+
+                unsynced = self._unsynced_events.get(thread_id, 0) + len(events)
+                if (
+                    self.fsync_batch_size is not None
+                    and unsynced >= self.fsync_batch_size
+                ):
+                    os.fsync(f.fileno())
+                    unsynced = 0
+                self._unsynced_events[thread_id] = unsynced
+
+    def sync(self, thread_id: Optional[str] = None):
+        """
+        Force any events that haven't been fsynced yet to disk. If no thread ID
+        is provided, all threads with pending events are synced.
+        """
+        with self._lock:
+            thread_ids = [thread_id] if thread_id else list(self._unsynced_events)
+            for tid in thread_ids:
+                if self._unsynced_events.get(tid) and self.path(tid).exists():
+                    with open(self.path(tid), "a", encoding="utf-8") as f:
+                        os.fsync(f.fileno())
+                self._unsynced_events[tid] = 0
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    task_count INTEGER NOT NULL,
+    agent_count INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (thread_id, id)
+);
+CREATE INDEX IF NOT EXISTS ix_events_thread_seq
+    ON events (thread_id, seq);
+CREATE INDEX IF NOT EXISTS ix_events_thread_event_timestamp
+    ON events (thread_id, event, timestamp);
+CREATE INDEX IF NOT EXISTS ix_events_thread_untasked
+    ON events (thread_id, seq) WHERE task_count = 0;
+CREATE INDEX IF NOT EXISTS ix_events_thread_unassigned
+    ON events (thread_id, seq) WHERE agent_count = 0;
+
+CREATE TABLE IF NOT EXISTS event_task_ids (
+    event_seq INTEGER NOT NULL REFERENCES events (seq) ON DELETE CASCADE,
+    thread_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    PRIMARY KEY (thread_id, task_id, event_seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS event_agent_ids (
+    event_seq INTEGER NOT NULL REFERENCES events (seq) ON DELETE CASCADE,
+    thread_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    PRIMARY KEY (thread_id, agent_id, event_seq)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteHistory(History):
+    """
+    A history stored in a SQLite database.
+
+    Each event's task and agent IDs are stored in indexed join tables, so
+    filtering by task, agent, or event type only visits matching events
+    instead of scanning the whole thread. `before_id` and `after_id` are
+    resolved to insertion positions and applied as range conditions.
+    """
+
+    path: Path = Field(
+        default_factory=lambda: controlflow.settings.home_path / "history.db"
+    )
+
+    _connection: Optional[sqlite3.Connection] = PrivateAttr(None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @field_validator("path", mode="before")
+    def _validate_path(cls, v):
+        v = Path(v).expanduser()
+        if not v.parent.exists():
+            v.parent.mkdir(parents=True, exist_ok=True)
+        return v
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(SQLITE_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def add_events(self, thread_id: str, events: list[Event]):
+        with self._lock, self.connection as connection:
+            for event in events:
+                cursor = connection.execute(
+                    """
+                    INSERT INTO events
+                        (id, thread_id, event, timestamp, task_count, agent_count, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (thread_id, id) DO NOTHING
+                    """,
+                    (
+                        event.id,
+                        thread_id,
+                        event.event,
+                        event.timestamp.isoformat(),
+                        len(event.task_ids),
+                        len(event.agent_ids),
+                        event.model_dump_json(),
+                    ),
+                )
+                # the event was already stored in this thread
+                if not cursor.rowcount:
+                    continue
+                seq = cursor.lastrowid
+                connection.executemany(
+                    "INSERT INTO event_task_ids (event_seq, thread_id, task_id) VALUES (?, ?, ?)",
+                    [(seq, thread_id, task_id) for task_id in event.task_ids],
+                )
+                connection.executemany(
+                    "INSERT INTO event_agent_ids (event_seq, thread_id, agent_id) VALUES (?, ?, ?)",
+                    [(seq, thread_id, agent_id) for agent_id in event.agent_ids],
+                )
+
+    def _get_seq(self, thread_id: str, event_id: str) -> Optional[int]:
+        row = self.connection.execute(
+            "SELECT seq FROM events WHERE thread_id = ? AND id = ?",
+            (thread_id, event_id),
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_events(
+        self,
+        thread_id: str,
+        types: Optional[list[str]] = None,
+        agent_ids: Optional[list[str]] = None,
+        task_ids: Optional[list[str]] = None,
+        before_id: Optional[str] = None,
+        after_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[Event]:
+        """
+        Retrieve a list of events based on the specified criteria.
+
+        Args:
+            thread_id (str): The ID of the thread to retrieve events from.
+            types (Optional[list[str]]): The list of event types to filter by (default: None).
+            agent_ids (Optional[list[str]]): Only include events for these agents, or events without agents (default: None).
+            task_ids (Optional[list[str]]): Only include events for these tasks, or events without tasks (default: None).
+            before_id (Optional[str]): The ID of the most recent event to include (default: None).
+            after_id (Optional[str]): The ID of the event after which to start including events (default: None).
+            limit (Optional[int]): The maximum number of events to retrieve (default: None).
+
+        Returns:
+            list[Event]: A list of events that match the specified criteria.
+        """
+        with self._lock:
+            # when filtering by task or agent, the unary + stops SQLite from
+            # scanning the thread index so it reads only the matching rows
+            if task_ids or agent_ids:
+                conditions = ["+e.thread_id = ?"]
+            else:
+                conditions = ["e.thread_id = ?"]
+            params = [thread_id]
+
+            if before_id:
+                before_seq = self._get_seq(thread_id, before_id)
+                if before_seq is None:
+                    return []
+                conditions.append("e.seq <= ?")
+                params.append(before_seq)
+
+            if after_id:
+                after_seq = self._get_seq(thread_id, after_id)
+                if after_seq is not None:
+                    conditions.append("e.seq > ?")
+                    params.append(after_seq)
+
+            if types:
+                conditions.append(f"e.event IN ({', '.join('?' * len(types))})")
+                params.extend(types)
+
+            # events match if they share an ID with the filter or have no IDs
+            # of that kind at all. The first filter selects candidate rows from
+            # its index; any others are checked per candidate, so the cost
+            # follows the most selective filter rather than the thread size.
+            driver_selected = False
+            for ids, table, column, count in [
+                (task_ids, "event_task_ids", "task_id", "task_count"),
+                (agent_ids, "event_agent_ids", "agent_id", "agent_count"),
+            ]:
+                if not ids:
+                    continue
+                placeholders = ", ".join("?" * len(ids))
+                if not driver_selected:
+                    conditions.append(
+                        f"""e.seq IN (
+                            SELECT event_seq FROM {table}
+                            WHERE thread_id = ? AND {column} IN ({placeholders})
+                            UNION
+                            SELECT seq FROM events WHERE thread_id = ? AND {count} = 0
+                        )"""
+                    )
+                    params.extend([thread_id, *ids, thread_id])
+                    driver_selected = True
+                else:
+                    conditions.append(
+                        f"""(e.{count} = 0 OR EXISTS (
+                            SELECT 1 FROM {table} x
+                            WHERE x.thread_id = e.thread_id
+                            AND x.{column} IN ({placeholders})
+                            AND x.event_seq = e.seq
+                        ))"""
+                    )
+                    params.extend(ids)
+
+            query = f"SELECT e.data FROM events e WHERE {' AND '.join(conditions)} ORDER BY e.seq DESC"
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit)
+
+            rows = self.connection.execute(query, params).fetchall()
+
+        validator = get_single_event_validator()
+        return [validator.validate_json(data) for (data,) in reversed(rows)]
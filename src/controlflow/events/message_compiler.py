@@ -1,9 +1,8 @@
+import bisect
 import re
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Literal, Optional
 
-import tiktoken
-
 import controlflow
 from controlflow.events.base import Event, UnpersistedEvent
 from controlflow.events.events import (
@@ -18,6 +17,8 @@ from controlflow.llm.messages import (
     SystemMessage,
 )
 from controlflow.llm.rules import LLMRules
+from controlflow.llm.tokenizers import DEFAULT_TOKENIZER, Tokenizer
+from controlflow.utilities.caching import LRUCache
 from controlflow.utilities.logging import get_logger
 
 if TYPE_CHECKING:
@@ -97,14 +98,11 @@ def break_up_consecutive_ai_messages(
     if not messages or rules.allow_consecutive_ai_messages:
         return messages
 
-    new_messages = messages.copy()
-    i = 1
-    while i < len(new_messages):
-        if isinstance(new_messages[i], AIMessage) and isinstance(
-            new_messages[i - 1], AIMessage
-        ):
-            new_messages.insert(i, SystemMessage(content="Continue."))
-        i += 1
+    new_messages = [messages[0]]
+    for message in messages[1:]:
+        if isinstance(message, AIMessage) and isinstance(new_messages[-1], AIMessage):
+            new_messages.append(SystemMessage(content="Continue."))
+        new_messages.append(message)
 
     return new_messages
 
@@ -144,31 +142,42 @@ def format_message_name(
     return messages
 
 
-def count_tokens(message: BaseMessage) -> int:
-    # always use gpt-3.5 token counter with the entire message object; we only need to be approximate here
-    return len(tiktoken.encoding_for_model("gpt-3.5-turbo").encode(message.json()))
+def count_tokens(message: BaseMessage, tokenizer: Optional[Tokenizer] = None) -> int:
+    # count the entire message object, not just its content
+    return (tokenizer or DEFAULT_TOKENIZER).count(message.json())
+
+
+def count_message_tokens(
+    messages: list[BaseMessage], tokenizer: Optional[Tokenizer] = None
+) -> list[int]:
+    """
+    Counts the tokens in each message, encoding them as a single batch.
+    """
+    return (tokenizer or DEFAULT_TOKENIZER).count_batch([m.json() for m in messages])
 
 
 def trim_messages(
-    messages: list[BaseMessage], max_tokens: Optional[int]
+    messages: list[BaseMessage],
+    max_tokens: Optional[int],
+    tokenizer: Optional[Tokenizer] = None,
 ) -> list[BaseMessage]:
     """
-    Trims messages to a maximum number of tokens while keeping the system message at the front.
+    Trims messages to a maximum number of tokens, keeping the most recent
+    messages that fit.
     """
 
     if not messages or max_tokens is None:
         return messages
 
-    new_messages = []
     budget = max_tokens
-
-    for message in reversed(messages):
-        if count_tokens(message) > budget:
+    start = len(messages)
+    for count in reversed(count_message_tokens(messages, tokenizer=tokenizer)):
+        if count > budget:
             break
-        new_messages.append(message)
-        budget -= count_tokens(message)
+        budget -= count
+        start -= 1
 
-    return list(reversed(new_messages))
+    return messages[start:]
 
 
 @dataclass
@@ -177,67 +186,225 @@ class CompileContext:
     agent: Optional["Agent"]
 
 
-class MessageCompiler:
+class CompiledMessages:
+    """
+    The messages compiled from a thread's events for one agent.
+
+    Compilation is incremental: if the events passed to `update` extend the
+    events compiled last time, only the new events are converted to messages.
+    If the events don't extend the previous list (for example, because the
+    tasks being worked on changed), everything is recompiled. Only the LLM
+    rules that apply to each message on its own (like formatting names) are
+    applied here.
+
+    Messages are not trimmed, and the rules that depend on the final message
+    window are not applied; that happens after each update since the token
+    budget can change between compiles. Token counts are cached alongside the
+    messages as running totals, so trimming is a binary search over them and
+    only messages added since the last trim are encoded with the tokenizer.
+    """
+
     def __init__(
         self,
-        events: list[Event],
-        system_prompt: Optional[str] = None,
-        llm_rules: Optional[LLMRules] = None,
-        max_tokens: Optional[int] = None,
+        agent: "Agent",
+        llm_rules: LLMRules,
+        tokenizer: Optional[Tokenizer] = None,
     ):
-        self.events = events
-        self.system_prompt = system_prompt
+        self.agent_name = agent.name
         self.llm_rules = llm_rules
-        self.max_tokens = max_tokens or controlflow.settings.max_input_tokens
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
+        self.reset()
+
+    def reset(self):
+        self.event_ids: list[str] = []
+        # events after combining agent messages with their tool results
+        self.organized_events: list[Event] = []
+        # the index in `messages` where each organized event's messages start
+        self.offsets: list[int] = []
+        self.messages: list[BaseMessage] = []
+        self.tool_calls: dict[str, int] = {}
+        # cumulative_tokens[i] is the number of tokens in messages[:i]
+        self.cumulative_tokens: list[int] = [0]
+
+    def matches(
+        self, agent: "Agent", llm_rules: LLMRules, tokenizer: Optional[Tokenizer] = None
+    ) -> bool:
+        return (
+            self.agent_name == agent.name
+            and self.llm_rules == llm_rules
+            and self.tokenizer == (tokenizer or DEFAULT_TOKENIZER)
+        )
 
-    def organize_events(self, context: CompileContext) -> list[Event]:
-        organized_events = []
-        tool_calls = {}
+    def update(self, events: list[Event], context: CompileContext) -> list[BaseMessage]:
+        n_compiled = len(self.event_ids)
+        if len(events) < n_compiled or any(
+            event.id != event_id for event, event_id in zip(events, self.event_ids)
+        ):
+            self.reset()
+            n_compiled = 0
 
-        for event in self.events:
+        # the first organized event whose messages need to be (re)compiled
+        first_dirty = len(self.organized_events)
+
+        for event in events[n_compiled:]:
             # combine all agent messages and tool results
             if isinstance(event, AgentMessage):
                 # add a combined agent message
-                combined_event = CombinedAgentMessage(agent_message=event)
-                organized_events.append(combined_event)
+                self.organized_events.append(CombinedAgentMessage(agent_message=event))
                 # register the combined message under each tool call id
                 for tc in (
                     event.ai_message.tool_calls + event.ai_message.invalid_tool_calls
                 ):
-                    tool_calls[tc["id"]] = combined_event
+                    self.tool_calls[tc["id"]] = len(self.organized_events) - 1
             elif isinstance(event, ToolResultEvent):
-                combined_event: CombinedAgentMessage = tool_calls.get(
-                    event.tool_call["id"]
-                )
-                if combined_event:
-                    combined_event.tool_results.append(event)
+                index = self.tool_calls.get(event.tool_call["id"])
+                if index is not None:
+                    self.organized_events[index].tool_results.append(event)
+                    first_dirty = min(first_dirty, index)
 
             # all other events are added as-is
             else:
-                organized_events.append(event)
+                self.organized_events.append(event)
+
+            self.event_ids.append(event.id)
+
+        self._truncate(first_dirty)
+        for event in self.organized_events[first_dirty:]:
+            self.offsets.append(len(self.messages))
+            self.messages.extend(
+                format_message_name(event.to_messages(context), rules=self.llm_rules)
+            )
+
+        return self.messages
+
+    def _truncate(self, index: int):
+        """
+        Remove the messages of the organized events from `index` onward.
+        """
+        if index >= len(self.offsets):
+            return
+        offset = self.offsets[index]
+        del self.messages[offset:]
+        del self.offsets[index:]
+        del self.cumulative_tokens[offset + 1 :]
+
+    def count_tokens(self) -> list[int]:
+        """
+        Returns the cumulative token counts of the compiled messages, counting
+        any messages that haven't been counted yet as a single batch.
+        """
+        n_counted = len(self.cumulative_tokens) - 1
+        if n_counted < len(self.messages):
+            total = self.cumulative_tokens[-1]
+            for count in count_message_tokens(
+                self.messages[n_counted:], tokenizer=self.tokenizer
+            ):
+                total += count
+                self.cumulative_tokens.append(total)
+        return self.cumulative_tokens
+
+    def trim(self, max_tokens: int) -> tuple[list[BaseMessage], int]:
+        """
+        Returns the most recent messages that fit within `max_tokens`, along
+        with their token count.
+        """
+        cumulative_tokens = self.count_tokens()
+        total = cumulative_tokens[-1]
+        # the earliest message whose suffix fits in the budget
+        start = bisect.bisect_left(cumulative_tokens, total - max_tokens)
+        start = min(start, len(self.messages))
+        return self.messages[start:], total - cumulative_tokens[start]
+
+
+class CompiledMessageCache:
+    """
+    A bounded cache of compiled messages, keyed by thread and agent, so that
+    each turn only compiles the events added since the agent's last turn.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self._entries: LRUCache[tuple[str, str], CompiledMessages] = LRUCache(
+            max_size=max_size
+        )
+
+    def get(
+        self,
+        thread_id: str,
+        agent: "Agent",
+        llm_rules: LLMRules,
+        tokenizer: Optional[Tokenizer] = None,
+    ) -> CompiledMessages:
+        return self._entries.get_or_create(
+            (thread_id, agent.id),
+            create=lambda: CompiledMessages(
+                agent=agent, llm_rules=llm_rules, tokenizer=tokenizer
+            ),
+            is_valid=lambda compiled: compiled.matches(agent, llm_rules, tokenizer),
+        )
+
+    def clear(self):
+        self._entries.clear()
+
+
+compiled_message_cache = CompiledMessageCache()
+
+
+class MessageCompiler:
+    def __init__(
+        self,
+        events: list[Event],
+        system_prompt: Optional[str] = None,
+        llm_rules: Optional[LLMRules] = None,
+        max_tokens: Optional[int] = None,
+        thread_id: Optional[str] = None,
+        tokenizer: Optional[Tokenizer] = None,
+    ):
+        """
+        If a `thread_id` is provided, compiled messages are cached for the
+        thread and agent, and reused by later compiles of the same events.
 
-        return organized_events
+        If no `llm_rules` or `tokenizer` are provided, the agent's are used.
+        """
+        self.events = events
+        self.system_prompt = system_prompt
+        self.llm_rules = llm_rules
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens or controlflow.settings.max_input_tokens
+        self.thread_id = thread_id
+        # the number of input tokens in the most recently compiled messages
+        self.token_count: Optional[int] = None
 
     def compile_to_messages(self, agent: "Agent") -> list[BaseMessage]:
         context = CompileContext(
             agent=agent, llm_rules=self.llm_rules or agent.get_llm_rules()
         )
+        tokenizer = self.tokenizer or agent.get_tokenizer()
 
         if self.system_prompt:
             system_prompt = [SystemMessage(content=self.system_prompt)]
-            max_tokens = self.max_tokens - count_tokens(system_prompt[0])
+            system_prompt_tokens = count_tokens(system_prompt[0], tokenizer=tokenizer)
         else:
             system_prompt = []
-            max_tokens = self.max_tokens
-
-        events = self.organize_events(context=context)
-
-        messages = []
-        for event in events:
-            messages.extend(event.to_messages(context))
+            system_prompt_tokens = 0
+
+        if self.thread_id is not None:
+            compiled = compiled_message_cache.get(
+                thread_id=self.thread_id,
+                agent=agent,
+                llm_rules=context.llm_rules,
+                tokenizer=tokenizer,
+            )
+        else:
+            compiled = CompiledMessages(
+                agent=agent, llm_rules=context.llm_rules, tokenizer=tokenizer
+            )
+        compiled.update(self.events, context=context)
 
-        # trim messages
-        messages = trim_messages(messages, max_tokens=max_tokens)
+        # trim messages (this returns a copy, so the cached list isn't modified below)
+        messages, token_count = compiled.trim(
+            max_tokens=self.max_tokens - system_prompt_tokens
+        )
+        self.token_count = system_prompt_tokens + token_count
 
         # apply LLM rules
         messages = ensure_at_least_one_message(messages, rules=context.llm_rules)
@@ -245,7 +412,6 @@ class MessageCompiler:
         messages = add_user_message_to_end(messages, rules=context.llm_rules)
         messages = remove_duplicate_messages(messages)
         messages = break_up_consecutive_ai_messages(messages, rules=context.llm_rules)
-        messages = format_message_name(messages, rules=context.llm_rules)
 
         # this should go last
         messages = convert_system_messages(messages, rules=context.llm_rules)
@@ -1,8 +1,8 @@
 import uuid
 from contextlib import contextmanager, nullcontext
-from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Optional, Union
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 import controlflow
 from controlflow.agents import Agent
@@ -44,6 +44,9 @@ class Flow(ControlFlowModel):
     context: dict[str, Any] = {}
     graph: Graph = Field(default_factory=Graph, repr=False, exclude=True)
     _cm_stack: list[contextmanager] = []
+    # the most recently rendered prompt, with the key it was rendered for
+    _prompt_cache: Optional[tuple] = PrivateAttr(None)
+    _cache_content_fields: ClassVar[tuple[str, ...]] = ("context", "tools")
 
     def __init__(self, *, copy_parent: bool = True, **kwargs):
         """
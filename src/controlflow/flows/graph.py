@@ -1,6 +1,8 @@
+import heapq
+import itertools
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, TypeVar
+from typing import Literal, Optional, TypeVar
 
 from controlflow.tasks.task import Task
 
@@ -48,7 +50,16 @@ class Graph:
     def __init__(self, tasks: list[Task] = None, edges: list[Edge] = None):
         self.tasks: set[Task] = set()
         self.edges: set[Edge] = set()
-        self._cache: dict[str[dict[Task, list[Task]]]] = {}
+        # incremented whenever a task or edge is added
+        self.version = 0
+        # adjacency lists, maintained as tasks and edges are added
+        self._upstream_edges: dict[Task, list[Edge]] = {}
+        self._downstream_edges: dict[Task, list[Edge]] = {}
+        # topological sorts, keyed by the tasks sorted (None for all tasks)
+        self._sort_cache: dict[Optional[frozenset[Task]], list[Task]] = {}
+        # traversals, keyed by (direction, immediate, start tasks), with the
+        # set of tasks visited
+        self._traversal_cache: dict[tuple, tuple[set[Task], list[Task]]] = {}
         if tasks:
             for task in tasks:
                 self.add_task(task)
@@ -57,14 +68,40 @@ class Graph:
                 self.add_edge(edge)
 
     def add_task(self, task: Task):
-        if task in self.tasks:
-            return
+        self._add_tasks([task])
 
-        self.tasks.add(task)
+    def add_edge(self, edge: Edge):
+        if edge in self.edges:
+            return
+        self._insert_edge(edge)
+        self._add_tasks([edge.upstream, edge.downstream])
+
+    def _add_tasks(self, tasks: list[Task]):
+        # adding a task adds its parent, subtasks, and dependencies, which can
+        # add their own; use a stack so deep graphs don't hit the recursion limit
+        stack = list(tasks)
+        while stack:
+            task = stack.pop()
+            if task in self.tasks:
+                continue
+
+            self.tasks.add(task)
+            self._upstream_edges.setdefault(task, [])
+            self._downstream_edges.setdefault(task, [])
+            self._sort_cache.pop(None, None)
+            self.version += 1
+
+            for edge in self._task_edges(task):
+                if edge not in self.edges:
+                    self._insert_edge(edge)
+                    stack.extend([edge.downstream, edge.upstream])
+
+    def _task_edges(self, task: Task) -> list[Edge]:
+        edges = []
 
         # add the task's parent
         if task.parent:
-            self.add_edge(
+            edges.append(
                 Edge(
                     upstream=task,
                     downstream=task.parent,
@@ -74,7 +111,7 @@ class Graph:
 
         # add the task's subtasks
         for subtask in task._subtasks:
-            self.add_edge(
+            edges.append(
                 Edge(
                     upstream=subtask,
                     downstream=task,
@@ -85,42 +122,41 @@ class Graph:
         # add the task's dependencies
         for upstream in task.depends_on:
             if upstream not in task._subtasks:
-                self.add_edge(
+                edges.append(
                     Edge(
                         upstream=upstream,
                         downstream=task,
                         type=EdgeType.DEPENDENCY,
                     )
                 )
-        self._cache.clear()
+        return edges
 
-    def add_edge(self, edge: Edge):
-        if edge in self.edges:
-            return
+    def _insert_edge(self, edge: Edge):
         self.edges.add(edge)
-        self.add_task(edge.upstream)
-        self.add_task(edge.downstream)
-        self._cache.clear()
+        self._upstream_edges.setdefault(edge.downstream, []).append(edge)
+        self._downstream_edges.setdefault(edge.upstream, []).append(edge)
+        self.version += 1
+
+        # invalidate the sorts that include both ends of the edge
+        for key in list(self._sort_cache):
+            if key is None or (edge.upstream in key and edge.downstream in key):
+                del self._sort_cache[key]
+
+        # invalidate the traversals that reached the edge: upstream traversals
+        # that visited its downstream task, and vice versa
+        for key, (visited, _) in list(self._traversal_cache.items()):
+            if key[0] == "upstream":
+                affected = edge.downstream in visited
+            else:
+                affected = edge.upstream in visited
+            if affected:
+                del self._traversal_cache[key]
 
     def upstream_edges(self) -> dict[Task, list[Edge]]:
-        if "upstream_edges" not in self._cache:
-            graph = {}
-            for task in self.tasks:
-                graph[task] = []
-            for edge in self.edges:
-                graph[edge.downstream].append(edge)
-            self._cache["upstream_edges"] = graph
-        return self._cache["upstream_edges"]
+        return self._upstream_edges
 
     def downstream_edges(self) -> dict[Task, list[Edge]]:
-        if "downstream_edges" not in self._cache:
-            graph = {}
-            for task in self.tasks:
-                graph[task] = []
-            for edge in self.edges:
-                graph[edge.upstream].append(edge)
-            self._cache["downstream_edges"] = graph
-        return self._cache["downstream_edges"]
+        return self._downstream_edges
 
     def upstream_tasks(
         self, start_tasks: list[Task], immediate: bool = False
@@ -136,31 +172,7 @@ class Graph:
         Returns:
             list[Task]: A list of upstream tasks in topological order.
         """
-        cache_key = (
-            f"upstream_{'immediate' if immediate else 'all'}_{tuple(start_tasks)}"
-        )
-        if cache_key not in self._cache:
-            result = set(start_tasks)
-            visited = set()
-
-            def _upstream(task):
-                if task in visited:
-                    return
-                visited.add(task)
-                for edge in self.upstream_edges().get(task, []):
-                    if edge.upstream not in visited:
-                        result.add(edge.upstream)
-                        if not immediate:
-                            _upstream(edge.upstream)
-
-            for task in start_tasks:
-                _upstream(task)
-
-            # Perform a focused topological sort on the result
-            sorted_tasks = self.topological_sort(list(result))
-            self._cache[cache_key] = sorted_tasks
-
-        return self._cache[cache_key]
+        return self._traverse(start_tasks, "upstream", immediate)
 
     def downstream_tasks(
         self, start_tasks: list[Task], immediate: bool = False
@@ -176,31 +188,43 @@ class Graph:
         Returns:
             list[Task]: A list of downstream tasks in topological order.
         """
-        cache_key = (
-            f"downstream_{'immediate' if immediate else 'all'}_{tuple(start_tasks)}"
-        )
-        if cache_key not in self._cache:
-            result = set(start_tasks)
-            visited = set()
-
-            def _downstream(task):
-                if task in visited:
-                    return
-                visited.add(task)
-                for edge in self.downstream_edges().get(task, []):
-                    if edge.downstream not in visited:
-                        result.add(edge.downstream)
-                        if not immediate:
-                            _downstream(edge.downstream)
-
-            for task in start_tasks:
-                _downstream(task)
-
-            # Perform a focused topological sort on the result
-            sorted_tasks = self.topological_sort(list(result))
-            self._cache[cache_key] = sorted_tasks
-
-        return self._cache[cache_key]
+        return self._traverse(start_tasks, "downstream", immediate)
+
+    def _traverse(
+        self,
+        start_tasks: list[Task],
+        direction: Literal["upstream", "downstream"],
+        immediate: bool,
+    ) -> list[Task]:
+        cache_key = (direction, immediate, tuple(start_tasks))
+        if cache_key in self._traversal_cache:
+            return self._traversal_cache[cache_key][1]
+
+        if direction == "upstream":
+            edges = self._upstream_edges
+        else:
+            edges = self._downstream_edges
+
+        # iterative, so long chains of tasks don't hit the recursion limit
+        result = set(start_tasks)
+        visited = set()
+        stack = list(start_tasks)
+        while stack:
+            task = stack.pop()
+            if task in visited:
+                continue
+            visited.add(task)
+            for edge in edges.get(task, []):
+                neighbor = getattr(edge, direction)
+                if neighbor not in visited:
+                    result.add(neighbor)
+                    if not immediate:
+                        stack.append(neighbor)
+
+        # Perform a focused topological sort on the result
+        sorted_tasks = self.topological_sort(list(result))
+        self._traversal_cache[cache_key] = (visited | result, sorted_tasks)
+        return sorted_tasks
 
     def topological_sort(self, tasks: Optional[list[Task]] = None) -> list[Task]:
         """
@@ -213,44 +237,56 @@ class Graph:
         Returns:
             list[Task]: A list of tasks in topological order (upstream tasks first).
         """
-        # Create a cache key based on the input tasks
-        cache_key = (
-            f"topo_sort_{tuple(sorted(task.id for task in (tasks or self.tasks)))}"
-        )
+        if tasks is None:
+            cache_key = None
+            tasks_to_sort = self.tasks
+        else:
+            cache_key = tasks_to_sort = frozenset(tasks)
 
         # Check if the result is already in the cache
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        if cache_key in self._sort_cache:
+            return self._sort_cache[cache_key]
 
+        upstream_edges = self._upstream_edges
+        downstream_edges = self._downstream_edges
+
+        # Count the dependencies of each task within tasks_to_sort
         if tasks is None:
-            tasks_to_sort = self.tasks
+            in_degree = {task: len(upstream_edges[task]) for task in tasks_to_sort}
         else:
-            tasks_to_sort = set(tasks)
+            in_degree = {}
+            for task in tasks_to_sort:
+                in_degree[task] = sum(
+                    1
+                    for edge in upstream_edges.get(task, [])
+                    if edge.upstream in tasks_to_sort
+                )
 
-        # Create a dictionary of tasks and their dependencies within tasks_to_sort
-        dependencies = {task: set() for task in tasks_to_sort}
-        for edge in self.edges:
-            if edge.downstream in tasks_to_sort and edge.upstream in tasks_to_sort:
-                dependencies[edge.downstream].add(edge.upstream)
+        # Kahn's algorithm, taking the earliest-created ready task each time so
+        # the order is deterministic (the counter breaks ties)
+        counter = itertools.count()
+        no_incoming = [
+            (task.created_at, next(counter), task)
+            for task, degree in in_degree.items()
+            if degree == 0
+        ]
+        heapq.heapify(no_incoming)
 
-        # Kahn's algorithm for topological sorting
         result = []
-        no_incoming = [task for task in tasks_to_sort if not dependencies[task]]
-        # sort to create a deterministic order
-        no_incoming.sort(key=lambda t: t.created_at)
-
         while no_incoming:
-            task = no_incoming.pop(0)
+            _, _, task = heapq.heappop(no_incoming)
             result.append(task)
 
             # Remove the task from the dependencies of its neighbors
-            for dependent_task in tasks_to_sort:
-                if task in dependencies[dependent_task]:
-                    dependencies[dependent_task].remove(task)
-                    if not dependencies[dependent_task]:
-                        no_incoming.append(dependent_task)
-                        # resort to maintain deterministic order
-                        no_incoming.sort(key=lambda t: t.created_at)
+            for edge in downstream_edges.get(task, []):
+                dependent_task = edge.downstream
+                if dependent_task in in_degree:
+                    in_degree[dependent_task] -= 1
+                    if in_degree[dependent_task] == 0:
+                        heapq.heappush(
+                            no_incoming,
+                            (dependent_task.created_at, next(counter), dependent_task),
+                        )
 
         # Check for cycles
         if len(result) != len(tasks_to_sort):
@@ -259,5 +295,5 @@ class Graph:
             )
 
         # Cache the result before returning
-        self._cache[cache_key] = result
+        self._sort_cache[cache_key] = result
         return result
@@ -1 +1 @@
-from controlflow.llm import models, messages, rules
+from controlflow.llm import cache, models, messages, rules, tokenizers
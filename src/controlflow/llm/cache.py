@@ -0,0 +1,279 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+import controlflow
+from controlflow.llm.messages import AIMessage, AIMessageChunk, BaseMessage
+from controlflow.utilities.caching import LRUCache
+
+if TYPE_CHECKING:
+    from controlflow.tools.tools import Tool
+
+# fields that providers return but that aren't sent back to them, so they
+# don't change the response
+_UNSENT_MESSAGE_FIELDS = {"id", "response_metadata", "usage_metadata"}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _request_data(
+    model: BaseChatModel, messages: list[BaseMessage], tools: list["Tool"] = None
+) -> str:
+    payload = dict(
+        model_class=f"{type(model).__module__}.{type(model).__qualname__}",
+        model=getattr(model, "model_name", None) or getattr(model, "model", None),
+        temperature=getattr(model, "temperature", None),
+        tools=[t.to_lc_tool() for t in tools or []],
+        messages=[
+            {"type": m.type, **m.dict(exclude=_UNSENT_MESSAGE_FIELDS)} for m in messages
+        ],
+    )
+    return json.dumps(payload, sort_keys=True, default=str)
+
+
+def _id_placeholders(data: str, ids: Iterable[str]) -> dict[str, str]:
+    """
+    Map each ID that appears in the data to a placeholder, numbered in the
+    order the IDs first appear, so the same request made with different IDs
+    gets the same placeholders.
+    """
+    positions = {i: data.find(i) for i in set(ids) if i and i in data}
+    ordered = sorted(positions, key=lambda i: (positions[i], -len(i)))
+    return {i: f"<id-{n}>" for n, i in enumerate(ordered)}
+
+
+def _replace_all(data: str, replacements: dict[str, str]) -> str:
+    if not replacements:
+        return data
+    # longest first, so an ID that contains another is replaced whole
+    pattern = "|".join(
+        re.escape(k) for k in sorted(replacements, key=len, reverse=True)
+    )
+    return re.sub(pattern, lambda match: replacements[match.group()], data)
+
+
+def get_cache_key(
+    model: BaseChatModel,
+    messages: list[BaseMessage],
+    tools: list["Tool"] = None,
+    ids: Iterable[str] = (),
+) -> str:
+    """
+    Hash everything that determines an LLM's response: the model, its
+    temperature, the tool schemas bound to it, and the messages sent to it.
+
+    Task and agent IDs are generated randomly unless they're set explicitly,
+    so any `ids` are replaced with placeholders before hashing. Otherwise a
+    rerun of the same workflow would never match the earlier requests.
+    """
+    data = _request_data(model, messages, tools)
+    data = _replace_all(data, _id_placeholders(data, ids))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def replay_deltas(
+    message: Union[AIMessage, AIMessageChunk],
+) -> list[AIMessageChunk]:
+    """
+    Split a complete response into the deltas a streaming model would have
+    produced: one with the message content, followed by one for each tool call.
+    Adding the deltas together recreates the response.
+    """
+    if isinstance(message, AIMessageChunk):
+        tool_call_chunks = message.tool_call_chunks
+    else:
+        tool_call_chunks = [
+            dict(
+                name=tc["name"],
+                args=json.dumps(tc["args"]),
+                id=tc["id"],
+            )
+            for tc in message.tool_calls
+        ] + [
+            dict(name=tc["name"], args=tc["args"], id=tc["id"])
+            for tc in message.invalid_tool_calls
+        ]
+        tool_call_chunks = [tc | dict(index=i) for i, tc in enumerate(tool_call_chunks)]
+
+    deltas = [
+        AIMessageChunk(
+            **message.dict(
+                exclude={
+                    "type",
+                    "tool_calls",
+                    "invalid_tool_calls",
+                    "tool_call_chunks",
+                }
+            )
+        )
+    ]
+    for tool_call_chunk in tool_call_chunks:
+        deltas.append(
+            AIMessageChunk(
+                content="", id=message.id, tool_call_chunks=[tool_call_chunk]
+            )
+        )
+    return deltas
+
+
+class ResponseCache:
+    """
+    A cache of LLM responses, so that sending the same messages to the same
+    model with the same tools reuses the earlier response instead of calling
+    the provider again. This is useful when rerunning flows for regression
+    tests or retries.
+
+    Responses are kept in an in-memory LRU of `max_size` entries. If a `path`
+    is provided, they are also stored in a SQLite database at that path, so
+    they persist between processes.
+    """
+
+    def __init__(self, max_size: int = 1000, path: Optional[Path] = None):
+        self.path = Path(path).expanduser() if path is not None else None
+        self._entries: LRUCache[str, str] = LRUCache(max_size=max_size)
+        self._connection: Optional[sqlite3.Connection] = None
+        # guards the database connection
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        return self._entries.max_size
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SQLITE_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        data = self._entries.get(key)
+        if data is None and self.path is not None:
+            with self._lock:
+                row = self.connection.execute(
+                    "SELECT data FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                data = row[0]
+                self._entries.set(key, data)
+
+        if data is None:
+            return None
+        [message] = messages_from_dict([json.loads(data)])
+        return message
+
+    def set(self, key: str, message: BaseMessage):
+        data = json.dumps(message_to_dict(message))
+        self._entries.set(key, data)
+        with self._lock:
+            if self.connection is not None:
+                with self.connection as connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO responses (key, data) VALUES (?, ?)",
+                        (key, data),
+                    )
+
+    def clear(self):
+        self._entries.clear()
+        with self._lock:
+            if self.connection is not None:
+                with self.connection as connection:
+                    connection.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class CachedModelCall:
+    """
+    A model call's entry in a response cache.
+
+    IDs are replaced with placeholders in the key (see `get_cache_key`) and in
+    the stored response, and the placeholders in a cached response are
+    replaced with the current IDs. This way a response that calls a tool like
+    `mark_task_<id>_successful` still calls the right tool when it's reused by
+    a rerun with new IDs.
+    """
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        model: BaseChatModel,
+        messages: list[BaseMessage],
+        tools: list["Tool"] = None,
+        ids: Iterable[str] = (),
+    ):
+        self.cache = cache
+        data = _request_data(model, messages, tools)
+        self._placeholders = _id_placeholders(data, ids)
+        self._ids = {v: k for k, v in self._placeholders.items()}
+        self.key = hashlib.sha256(
+            _replace_all(data, self._placeholders).encode()
+        ).hexdigest()
+        self.response: Optional[BaseMessage] = None
+
+    def _replace_ids(self, message: BaseMessage, replacements: dict[str, str]):
+        if not replacements:
+            return message
+        data = _replace_all(json.dumps(message_to_dict(message)), replacements)
+        [message] = messages_from_dict([json.loads(data)])
+        return message
+
+    def get(self) -> Optional[BaseMessage]:
+        """
+        Look up the cached response, with the current IDs in place of its
+        placeholders.
+        """
+        response = self.cache.get(self.key)
+        if response is not None:
+            self.response = self._replace_ids(response, self._ids)
+        return self.response
+
+    def set(self, response: BaseMessage):
+        """
+        Store a response, unless it came from the cache.
+        """
+        if self.response is None:
+            self.cache.set(self.key, self._replace_ids(response, self._placeholders))
+
+
+_response_caches: dict[tuple, ResponseCache] = {}
+_response_caches_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get the response cache configured by ControlFlow's settings, or None if
+    `enable_llm_response_cache` is False.
+    """
+    settings = controlflow.settings
+    if not settings.enable_llm_response_cache:
+        return None
+    key = (settings.llm_response_cache_size, settings.llm_response_cache_path)
+    with _response_caches_lock:
+        if key not in _response_caches:
+            _response_caches[key] = ResponseCache(
+                max_size=settings.llm_response_cache_size,
+                path=settings.llm_response_cache_path,
+            )
+        return _response_caches[key]
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import httpx
+
+from controlflow.utilities.caching import IdentityKey
+
+
+class LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    An async transport that keeps a separate connection pool for each event
+    loop. Pooled connections can only be used by the loop that opened them, so
+    an async client that is shared across loops (for example, by successive
+    calls to `asyncio.run`) would otherwise reuse connections from closed
+    loops. Pools belonging to closed loops are discarded.
+    """
+
+    def __init__(self, **transport_kwargs):
+        self.transport_kwargs = transport_kwargs
+        self._transports: dict[IdentityKey, httpx.AsyncHTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    def get_transport(self) -> httpx.AsyncHTTPTransport:
+        key = IdentityKey(asyncio.get_running_loop())
+        with self._lock:
+            for other_key in list(self._transports):
+                if other_key.obj.is_closed():
+                    del self._transports[other_key]
+            if key not in self._transports:
+                self._transports[key] = httpx.AsyncHTTPTransport(
+                    **self.transport_kwargs
+                )
+            return self._transports[key]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.get_transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        key = IdentityKey(asyncio.get_running_loop())
+        with self._lock:
+            transport = self._transports.pop(key, None)
+        if transport is not None:
+            await transport.aclose()
@@ -1,5 +1,6 @@
 import inspect
-from typing import Any, Optional
+import threading
+from typing import Any, Hashable, Optional
 
 from langchain_core.language_models import BaseChatModel
 from pydantic import ValidationError
@@ -20,6 +21,11 @@ def get_default_model() -> BaseChatModel:
 def model_from_string(
     model: str, temperature: Optional[float] = None, **kwargs: Any
 ) -> BaseChatModel:
+    """
+    Load a model from a string like "openai/gpt-4o". Models are shared through
+    the model registry, so loading the same model with the same arguments
+    twice returns the same object.
+    """
     if "/" not in model:
         provider, model = "openai", model
     provider, model = model.split("/")
@@ -27,6 +33,10 @@ def model_from_string(
     if temperature is None:
         temperature = controlflow.settings.llm_temperature
 
+    return model_registry.get(provider, model, temperature=temperature, **kwargs)
+
+
+def _get_model_class(provider: str) -> type[BaseChatModel]:
     if provider == "openai":
         from langchain_openai import ChatOpenAI
 
@@ -59,8 +69,95 @@ def model_from_string(
         raise ValueError(
             f"Could not load provider automatically: {provider}. Please create your model manually."
         )
+    return cls
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    elif isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+class ModelRegistry:
+    """
+    A process-wide registry of models loaded from strings, keyed by provider,
+    model, and arguments, so that agents using the same model share one client
+    instead of each opening their own connections.
+
+    Models from providers that accept an HTTP client (OpenAI and Azure OpenAI)
+    also share connection pools across models. The pools' size and idle
+    timeout come from `controlflow.settings.llm_connection_pool_size` and
+    `llm_connection_idle_timeout`. Async requests use a separate pool for each
+    event loop, since connections can't be shared between loops.
+
+    Because registered models are shared, they shouldn't be modified.
+    """
+
+    def __init__(self):
+        self._models: dict[Hashable, BaseChatModel] = {}
+        self._http_clients: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str, **kwargs: Any) -> BaseChatModel:
+        try:
+            key = (provider, model, _freeze(kwargs))
+            hash(key)
+        except TypeError:
+            # arguments that can't be compared (like client objects) get their
+            # own model
+            return self._create(provider, model, **kwargs)
+
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = self._create(provider, model, **kwargs)
+            return self._models[key]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._http_clients.clear()
+
+    def _create(self, provider: str, model: str, **kwargs: Any) -> BaseChatModel:
+        cls = _get_model_class(provider)
+        if provider in ("openai", "azure-openai"):
+            kwargs.setdefault("http_client", self._get_http_client(is_async=False))
+            kwargs.setdefault("http_async_client", self._get_http_client(is_async=True))
+        return cls(model=model, **kwargs)
+
+    def _get_http_client(self, is_async: bool):
+        import httpx
+        from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+        from controlflow.llm.http import LoopLocalAsyncTransport
+
+        pool_size = controlflow.settings.llm_connection_pool_size
+        idle_timeout = controlflow.settings.llm_connection_idle_timeout
+        key = (is_async, pool_size, idle_timeout)
+        if key not in self._http_clients:
+            limits = httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=idle_timeout,
+            )
+            # the OpenAI SDK's client classes keep its defaults (like its
+            # timeout and following redirects)
+            if is_async:
+                # the async client is shared by every event loop, so each loop
+                # gets its own pool
+                client = DefaultAsyncHttpxClient(
+                    transport=LoopLocalAsyncTransport(limits=limits)
+                )
+            else:
+                client = DefaultHttpxClient(limits=limits)
+            self._http_clients[key] = client
+        return self._http_clients[key]
+
 
-    return cls(model=model, temperature=temperature, **kwargs)
+model_registry = ModelRegistry()
 
 
 def _get_initial_default_model() -> BaseChatModel:
@@ -1,8 +1,5 @@
 from typing import Optional
 
-from langchain_anthropic import ChatAnthropic
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
-
 from controlflow.llm.models import BaseChatModel
 from controlflow.utilities.types import ControlFlowModel
 
@@ -54,10 +51,17 @@ class AnthropicRules(LLMRules):
     allow_consecutive_ai_messages: bool = False
 
 
+# rules are looked up by model class name, so that provider packages don't
+# need to be imported
+RULES: dict[str, type[LLMRules]] = {
+    "ChatOpenAI": OpenAIRules,
+    "AzureChatOpenAI": OpenAIRules,
+    "ChatAnthropic": AnthropicRules,
+}
+
+
 def rules_for_model(model: BaseChatModel) -> LLMRules:
-    if isinstance(model, (ChatOpenAI, AzureChatOpenAI)):
-        return OpenAIRules()
-    elif isinstance(model, ChatAnthropic):
-        return AnthropicRules()
-    else:
-        return LLMRules()
+    for cls in type(model).__mro__:
+        if cls.__name__ in RULES:
+            return RULES[cls.__name__]()
+    return LLMRules()
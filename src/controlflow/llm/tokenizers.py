@@ -0,0 +1,132 @@
+import abc
+import math
+from functools import cache, lru_cache
+from typing import Callable, Optional, Union
+
+import tiktoken
+from langchain_core.language_models import BaseChatModel
+
+from controlflow.utilities.logging import get_logger
+from controlflow.utilities.types import ControlFlowModel
+
+logger = get_logger(__name__)
+
+
+class Tokenizer(ControlFlowModel, abc.ABC):
+    """
+    Tokenizers count tokens for context-window budgeting. Counts only need to
+    be close to the provider's own count, so tokenizers work offline and can
+    approximate providers that don't publish a local tokenizer.
+    """
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        raise NotImplementedError()
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        return [self.count(text) for text in texts]
+
+
+class ApproximateTokenizer(Tokenizer):
+    """
+    Estimates tokens from the number of characters in the text.
+    """
+
+    chars_per_token: float = 4.0
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+class TiktokenTokenizer(Tokenizer):
+    """
+    Counts tokens with a tiktoken encoding. If the encoding can't be loaded
+    (for example, because it hasn't been downloaded and there's no network
+    access), tokens are approximated instead.
+    """
+
+    encoding_name: str = "cl100k_base"
+
+    def count(self, text: str) -> int:
+        encoding = _get_encoding(self.encoding_name)
+        if encoding is None:
+            return _FALLBACK_TOKENIZER.count(text)
+        return _count_tiktoken_tokens(self.encoding_name, text)
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        encoding = _get_encoding(self.encoding_name)
+        if encoding is None:
+            return _FALLBACK_TOKENIZER.count_batch(texts)
+        if not texts:
+            return []
+        return [len(tokens) for tokens in encoding.encode_batch(texts)]
+
+
+_FALLBACK_TOKENIZER = ApproximateTokenizer()
+
+
+@cache
+def _get_encoding(encoding_name: str) -> Optional[tiktoken.Encoding]:
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as exc:
+        logger.warning(
+            f"Could not load the {encoding_name!r} tiktoken encoding; token "
+            f"counts will be approximated. The error was: {exc}"
+        )
+        return None
+
+
+@lru_cache(maxsize=128)
+def _count_tiktoken_tokens(encoding_name: str, text: str) -> int:
+    return len(_get_encoding(encoding_name).encode(text))
+
+
+def _openai_tokenizer(model: BaseChatModel) -> Tokenizer:
+    model_name = getattr(model, "model_name", None) or ""
+    try:
+        encoding_name = tiktoken.encoding_name_for_model(model_name)
+    except KeyError:
+        # unknown models (including Azure deployment names) use the gpt-4 encoding
+        encoding_name = "cl100k_base"
+    return TiktokenTokenizer(encoding_name=encoding_name)
+
+
+# tokenizers are registered by model class name, so that providers whose
+# packages are optional don't need to be imported
+TOKENIZERS: dict[str, Callable[[BaseChatModel], Tokenizer]] = {
+    "ChatOpenAI": _openai_tokenizer,
+    "AzureChatOpenAI": _openai_tokenizer,
+    # Anthropic doesn't publish a local tokenizer for Claude 3; its tokens
+    # are shorter than OpenAI's, especially for code and JSON
+    "ChatAnthropic": lambda model: ApproximateTokenizer(chars_per_token=3.5),
+    # Google documents a token as about four characters
+    "ChatGoogleGenerativeAI": lambda model: ApproximateTokenizer(chars_per_token=4.0),
+    # Groq's default Llama 3 models use a superset of the gpt-4 encoding
+    "ChatGroq": lambda model: TiktokenTokenizer(encoding_name="cl100k_base"),
+}
+
+DEFAULT_TOKENIZER = TiktokenTokenizer(encoding_name="cl100k_base")
+
+
+def register_tokenizer(
+    model_class: Union[type[BaseChatModel], str],
+    tokenizer: Union[Tokenizer, Callable[[BaseChatModel], Tokenizer]],
+):
+    """
+    Register the tokenizer used to count tokens for a model class (or class
+    name). The tokenizer can be a `Tokenizer` or a function that takes the
+    model and returns one.
+    """
+    name = model_class if isinstance(model_class, str) else model_class.__name__
+    if isinstance(tokenizer, Tokenizer):
+        TOKENIZERS[name] = lambda model: tokenizer
+    else:
+        TOKENIZERS[name] = tokenizer
+
+
+def tokenizer_for_model(model: BaseChatModel) -> Tokenizer:
+    for cls in type(model).__mro__:
+        if cls.__name__ in TOKENIZERS:
+            return TOKENIZERS[cls.__name__](model)
+    return DEFAULT_TOKENIZER
@@ -37,6 +37,10 @@ class AgentContext(ControlFlowModel):
     )
     handlers: list[Handler] = []
     instructions: list[str] = []
+    input_tokens: Optional[int] = Field(
+        None,
+        description="The number of tokens in the most recently compiled messages, including the system prompt",
+    )
     _context: Optional[ExitStack] = None
 
     def add_agent(self, agent: BaseAgent):
@@ -91,10 +95,33 @@ class AgentContext(ControlFlowModel):
             events=events,
             llm_rules=agent.get_llm_rules(),
             system_prompt=self.compile_prompt(agent=agent),
+            thread_id=self.flow.thread_id,
         )
         messages = compiler.compile_to_messages(agent=agent)
+        self.input_tokens = compiler.token_count
         return messages
 
+    def get_cache_ids(self, agent: Agent) -> list[str]:
+        """
+        The IDs of the flow's tasks and of the agents that can appear in the
+        agent's messages, and the names of those agents that weren't named.
+        They're generated for each run unless they're set explicitly, so
+        they're left out of response cache keys.
+        """
+        agents = [agent, *self.agents]
+        ids = []
+        for task in self.flow.graph.tasks:
+            ids.append(task.id)
+            if task.agent is not None:
+                agents.append(task.agent)
+        # include the members of teams
+        agents.extend(m for a in agents for m in getattr(a, "agents", []))
+        for a in agents:
+            ids.append(a.id)
+            if "name" not in a.model_fields_set:
+                ids.append(a.name)
+        return ids
+
     def __enter__(self):
         self._context = ExitStack()
         self._context.enter_context(ctx(agent_context=self))
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import math
 from collections import defaultdict
@@ -11,6 +12,7 @@ from controlflow.events.base import Event
 from controlflow.flows import Flow
 from controlflow.orchestration.agent_context import AgentContext
 from controlflow.orchestration.handler import Handler
+from controlflow.orchestration.ready_tasks import ReadyTaskTracker
 from controlflow.tasks.task import Task
 from controlflow.tools.orchestration import (
     create_task_fail_tool,
@@ -52,6 +54,7 @@ class Orchestrator(ControlFlowModel):
         default_factory=lambda: defaultdict(int)
     )
     _ready_task_counter: int = 0
+    _ready_task_tracker: Optional[ReadyTaskTracker] = PrivateAttr(None)
 
     @field_validator("handlers", mode="before")
     def _handlers(cls, v):
@@ -72,6 +75,9 @@ class Orchestrator(ControlFlowModel):
         self.tasks = self.tasks or self.flow.tasks
         for task in self.tasks:
             self.flow.add_task(task)
+        self._ready_task_tracker = ReadyTaskTracker(
+            graph=self.flow.graph, tasks=self.tasks
+        )
 
     def handle_event(
         self, event: Event, tasks: list[Task] = None, agent: BaseAgent = None
@@ -112,6 +118,7 @@ class Orchestrator(ControlFlowModel):
                 )
                 with context:
                     agent._run(context=context)
+                self.log_context_utilization(agent=agent, context=context)
 
             except Exception as exc:
                 self.handle_event(OrchestratorError(orchestrator=self, error=exc))
@@ -120,9 +127,111 @@ class Orchestrator(ControlFlowModel):
                 self.handle_event(OrchestratorEnd(orchestrator=self))
                 i += 1
 
+    async def run_async(self, steps: Optional[int] = None):
+        """
+        Runs the orchestrator asynchronously. At each step, every agent whose
+        ready tasks share no graph edges with the tasks of the agents already
+        selected takes a turn concurrently, up to
+        `settings.max_concurrent_agents` at a time.
+        """
+        from controlflow.events.orchestrator_events import (
+            OrchestratorEnd,
+            OrchestratorError,
+            OrchestratorStart,
+        )
+
+        semaphore = asyncio.Semaphore(controlflow.settings.max_concurrent_agents)
+
+        i = 0
+        while any(t.is_incomplete() for t in self.tasks) and i < (steps or math.inf):
+            self.handle_event(OrchestratorStart(orchestrator=self))
+
+            try:
+                ready_tasks = self.get_ready_tasks()
+                if not ready_tasks:
+                    return
+
+                turns = []
+                for agent in self.get_concurrent_agents(ready_tasks=ready_tasks):
+                    tasks = self.get_agent_tasks(agent=agent, ready_tasks=ready_tasks)
+                    if tasks:
+                        turns.append(
+                            self._run_agent_async(
+                                agent=agent, tasks=tasks, semaphore=semaphore
+                            )
+                        )
+
+                # let every turn finish before raising, so none are left running
+                results = await asyncio.gather(*turns, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+
+            except Exception as exc:
+                self.handle_event(OrchestratorError(orchestrator=self, error=exc))
+                raise
+            finally:
+                self.handle_event(OrchestratorEnd(orchestrator=self))
+                i += 1
+
+    async def _run_agent_async(
+        self, agent: BaseAgent, tasks: list[Task], semaphore: asyncio.Semaphore
+    ):
+        async with semaphore:
+            context = AgentContext(
+                flow=self.flow,
+                tasks=tasks,
+                agents=[agent],
+                tools=self.get_tools(tasks=tasks),
+                handlers=self.handlers,
+            )
+            with context:
+                await agent._run_async(context=context)
+            self.log_context_utilization(agent=agent, context=context)
+
+    def get_concurrent_agents(self, ready_tasks: list[Task]) -> list[BaseAgent]:
+        """
+        Get the agents that can take turns at the same time. Agents are
+        considered in the order of their first ready task, and an agent is
+        selected if none of its ready tasks share an edge with a task of an
+        agent selected before it. The first ready task's agent is always
+        selected, as in the synchronous loop.
+        """
+        upstream_edges = self.flow.graph.upstream_edges()
+        downstream_edges = self.flow.graph.downstream_edges()
+
+        agents = []
+        seen_agents = []
+        selected_tasks = set()
+        for task in ready_tasks:
+            agent = self.get_agent(task)
+            if any(agent is a for a in seen_agents):
+                continue
+            seen_agents.append(agent)
+
+            agent_tasks = [t for t in ready_tasks if self.get_agent(t) is agent]
+            neighbors = set()
+            for t in agent_tasks:
+                neighbors.update(e.upstream for e in upstream_edges.get(t, []))
+                neighbors.update(e.downstream for e in downstream_edges.get(t, []))
+            if neighbors & selected_tasks:
+                continue
+
+            agents.append(agent)
+            selected_tasks.update(agent_tasks)
+        return agents
+
+    def log_context_utilization(self, agent: BaseAgent, context: AgentContext):
+        if context.input_tokens is None:
+            return
+        max_tokens = controlflow.settings.max_input_tokens
+        logger.debug(
+            f"Agent {agent.name} sent {context.input_tokens:,} of {max_tokens:,} "
+            f"input tokens ({context.input_tokens / max_tokens:.0%} of the context window)"
+        )
+
     def get_ready_tasks(self) -> list[Task]:
-        all_tasks = self.flow.graph.upstream_tasks(self.tasks)
-        ready_tasks = [t for t in all_tasks if t.is_ready()]
+        ready_tasks = self._ready_task_tracker.get_ready_tasks()
         if not ready_tasks:
             self._ready_task_counter += 1
             if self._ready_task_counter >= 3:
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, ClassVar, Optional
 
 from pydantic import model_validator
 
@@ -7,7 +7,7 @@ from controlflow.agents.teams import Team
 from controlflow.flows import Flow
 from controlflow.orchestration.agent_context import AgentContext
 from controlflow.tasks.task import Task
-from controlflow.utilities.jinja import prompt_env
+from controlflow.utilities.jinja import get_template, template_from_string
 from controlflow.utilities.types import ControlFlowModel
 
 
@@ -22,29 +22,70 @@ class Template(ControlFlowModel):
             raise ValueError("Template or template_path must be provided.")
         return self
 
+    # the field holding the object that caches this template's output
+    cache_owner_field: ClassVar[Optional[str]] = None
+
     def render(self, **kwargs) -> str:
         if not self.should_render():
             return ""
 
+        # custom templates can use anything in their context, so only the
+        # built-in templates are cached
+        owner = None
+        if self.template is None and self.cache_owner_field is not None:
+            dependencies = self.get_cache_dependencies(**kwargs)
+        else:
+            dependencies = None
+        if dependencies is not None:
+            owner = getattr(self, self.cache_owner_field)
+            key = [_cache_key(d) for d in dependencies]
+            cached = owner._prompt_cache
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
         render_kwargs = dict(self)
         del render_kwargs["template"]
         del render_kwargs["template_path"]
 
         if self.template is not None:
-            template = prompt_env.from_string(self.template)
+            template = template_from_string(self.template)
         else:
-            template = prompt_env.get_template(self.template_path)
-        return template.render(**render_kwargs | kwargs)
+            template = get_template(self.template_path)
+        prompt = template.render(**render_kwargs | kwargs)
+
+        if owner is not None:
+            owner._prompt_cache = (key, prompt)
+        return prompt
 
     def should_render(self) -> bool:
         return True
 
+    def get_cache_dependencies(self, **kwargs) -> Optional[list[Any]]:
+        """
+        The objects and values that the rendered template depends on. It is
+        rerendered when a model is replaced, one of its fields is assigned, or
+        the contents of its mutable fields (like its context) change, or when
+        another value changes. If this returns None, the template isn't cached.
+        """
+        return None
+
+
+def _cache_key(value: Any) -> Any:
+    if isinstance(value, ControlFlowModel):
+        return value._cache_key()
+    return value
+
 
 class AgentTemplate(Template):
     template_path: str = "agent.md.jinja"
     agent: Agent
     context: AgentContext
 
+    cache_owner_field: ClassVar[str] = "agent"
+
+    def get_cache_dependencies(self, **kwargs) -> list[Any]:
+        return [self.agent]
+
 
 class TaskTemplate(Template):
     """
@@ -55,12 +96,19 @@ class TaskTemplate(Template):
     task: Task
     context: AgentContext
 
+    cache_owner_field: ClassVar[str] = "task"
+
+    def get_cache_dependencies(self, **kwargs) -> list[Any]:
+        return _task_dependencies(self.task)
+
 
 class FlowTemplate(Template):
     template_path: str = "flow.md.jinja"
     flow: Flow
     context: AgentContext
 
+    cache_owner_field: ClassVar[str] = "flow"
+
     def render(self, **kwargs):
         upstream_tasks = set(self.flow.graph.upstream_tasks(self.context.tasks))
         downstream_tasks = set(self.flow.graph.downstream_tasks(self.context.tasks))
@@ -71,12 +119,25 @@ class FlowTemplate(Template):
             **kwargs,
         )
 
+    def get_cache_dependencies(
+        self, upstream_tasks: set[Task], downstream_tasks: set[Task], **kwargs
+    ) -> list[Any]:
+        dependencies = [self.flow, *self.context.tasks]
+        for task in [*upstream_tasks, *downstream_tasks]:
+            dependencies.extend(_task_dependencies(task))
+        return dependencies
+
 
 class TeamTemplate(Template):
     template_path: str = "team.md.jinja"
     team: Team
     context: AgentContext
 
+    cache_owner_field: ClassVar[str] = "team"
+
+    def get_cache_dependencies(self, **kwargs) -> list[Any]:
+        return [self.team, *self.team.agents]
+
 
 class InstructionsTemplate(Template):
     template_path: str = "instructions.md.jinja"
@@ -85,3 +146,11 @@ class InstructionsTemplate(Template):
 
     def should_render(self) -> bool:
         return bool(self.instructions)
+
+
+def _task_dependencies(task: Task) -> list[Any]:
+    # tasks are rendered with their agent, dependencies, and parent
+    dependencies = [task, task.get_agent(), *task.depends_on]
+    if task.parent is not None:
+        dependencies.append(task.parent)
+    return dependencies
@@ -0,0 +1,92 @@
+import threading
+from collections import defaultdict
+
+from controlflow.flows.graph import Graph
+from controlflow.tasks.task import COMPLETE_STATUSES, Task, TaskStatus
+
+
+class ReadyTaskTracker:
+    """
+    Tracks which of a set of tasks (and their upstream tasks) are ready to
+    run.
+
+    Each task has a counter of its incomplete dependencies, which is updated
+    as tasks change status, so finding the ready tasks doesn't require
+    checking every task's dependencies. The counters are rebuilt if the graph
+    changes, a tracked task's dependencies change, or a completed task becomes
+    incomplete again.
+    """
+
+    def __init__(self, graph: Graph, tasks: list[Task]):
+        self.graph = graph
+        self.tasks = tasks
+        self._lock = threading.RLock()
+        self._graph_version = None
+        self._stale = True
+
+    def _rebuild(self):
+        tasks = self.graph.upstream_tasks(self.tasks)
+        # the position of each task in topological order
+        self._order: dict[Task, int] = {t: i for i, t in enumerate(tasks)}
+        self._unmet: dict[Task, int] = {}
+        self._dependents: dict[Task, list[Task]] = defaultdict(list)
+        self._ready: set[Task] = set()
+        self._dependency_keys: dict[Task, tuple[int, int]] = {}
+
+        for task in tasks:
+            self._dependency_keys[task] = self._dependency_key(task)
+            task._status_listeners.add(self)
+            unmet = 0
+            for upstream in task.depends_on:
+                upstream._status_listeners.add(self)
+                self._dependents[upstream].append(task)
+                if upstream.is_incomplete():
+                    unmet += 1
+            self._unmet[task] = unmet
+            if unmet == 0 and task.is_incomplete():
+                self._ready.add(task)
+
+        self._graph_version = self.graph.version
+        self._stale = False
+
+    @staticmethod
+    def _dependency_key(task: Task) -> tuple[int, int]:
+        # dependencies are added with `add_dependency` or `add_subtask`, which
+        # don't change the graph, or by assigning a new set
+        return (id(task.depends_on), len(task.depends_on))
+
+    def _dependencies_changed(self) -> bool:
+        return any(
+            self._dependency_key(task) != key
+            for task, key in self._dependency_keys.items()
+        )
+
+    def get_ready_tasks(self) -> list[Task]:
+        """
+        Returns the ready tasks in topological order.
+        """
+        with self._lock:
+            if (
+                self._stale
+                or self._graph_version != self.graph.version
+                or self._dependencies_changed()
+            ):
+                self._rebuild()
+            return sorted(self._ready, key=self._order.__getitem__)
+
+    def on_status_change(self, task: Task, old_status: TaskStatus):
+        with self._lock:
+            if self._stale:
+                return
+            was_complete = old_status in COMPLETE_STATUSES
+            if was_complete == task.is_complete():
+                return
+            elif was_complete:
+                self._stale = True
+                return
+
+            self._ready.discard(task)
+            for dependent in self._dependents.get(task, []):
+                self._unmet[dependent] -= 1
+                if self._unmet[dependent] == 0 and dependent.is_incomplete():
+                    self._ready.add(dependent)
@@ -1,11 +1,10 @@
 import copy
 import os
+import sys
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Literal, Optional, Union
 
-import prefect.logging.configuration
-import prefect.settings
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -63,6 +62,12 @@ class Settings(ControlFlowSettings):
         description="If False, calling Task.run() outside a flow context will automatically "
         "create a flow and run the task within it. If True, an error will be raised.",
     )
+    max_concurrent_agents: int = Field(
+        default=20,
+        ge=1,
+        description="The maximum number of agents that can take turns at the same "
+        "time when tasks are run asynchronously.",
+    )
 
     # ------------ LLM settings ------------
 
@@ -72,6 +77,45 @@ class Settings(ControlFlowSettings):
         100_000, description="The maximum number of tokens to send to an LLM."
     )
 
+    llm_connection_pool_size: int = Field(
+        default=100,
+        ge=1,
+        description="The maximum number of connections to keep open to each LLM "
+        "provider API, shared by all models loaded from strings.",
+    )
+    llm_connection_idle_timeout: float = Field(
+        default=30.0,
+        ge=0,
+        description="The number of seconds an idle connection to an LLM provider "
+        "API is kept alive for reuse.",
+    )
+
+    enable_llm_response_cache: bool = Field(
+        default=False,
+        description="If True, LLM responses are cached and reused when the same "
+        "messages are sent to the same model with the same tools. Task and "
+        "agent IDs (and agent names that weren't set) are ignored, since "
+        "they're generated for each run. Useful for rerunning flows in "
+        "regression tests.",
+    )
+    llm_response_cache_size: int = Field(
+        default=1000,
+        ge=0,
+        description="The maximum number of LLM responses to keep in memory.",
+    )
+    llm_response_cache_path: Optional[Path] = Field(
+        default=None,
+        description="If set, cached LLM responses are also stored in a SQLite "
+        "database at this path, so they can be reused by other processes.",
+    )
+
+    prompt_template_auto_reload: bool = Field(
+        default=False,
+        description="If True, prompt template files are checked for changes "
+        "every time they're used. Useful when editing templates, but adds a "
+        "file system check to every prompt.",
+    )
+
     # ------------ Flow visualization settings ------------
 
     enable_print_handler: bool = Field(
@@ -99,6 +143,32 @@ class Settings(ControlFlowSettings):
         default=False, description="If True, tools will log additional information."
     )
 
+    max_parallel_tool_calls: int = Field(
+        default=8,
+        ge=1,
+        description="The maximum number of tool calls from a single LLM response "
+        "that can run at the same time. Set to 1 to run them one at a time.",
+    )
+
+    enable_prefect_tracking: bool = Field(
+        default=True,
+        description="If True, task runs, tool calls, and flows are tracked as "
+        "Prefect task and flow runs. Disable to call them directly, without any "
+        "Prefect overhead.",
+    )
+    enable_background_prefect_export: bool = Field(
+        default=True,
+        description="If True, artifacts and task states are sent to Prefect from "
+        "a background thread so that agents don't wait on the Prefect API.",
+    )
+    background_prefect_export_timeout: Optional[float] = Field(
+        default=30.0,
+        ge=0,
+        description="The maximum number of seconds a flow waits for its "
+        "background Prefect exports to finish before it completes. If None, "
+        "the flow waits indefinitely.",
+    )
+
     # ------------ Prefect settings ------------
     #
     # Default settings for Prefect when used with ControlFlow. They can be
@@ -121,10 +191,20 @@ class Settings(ControlFlowSettings):
 
     @model_validator(mode="after")
     def _apply_prefect_settings(self):
+        # Prefect is slow to import, so if it hasn't been imported yet, its
+        # settings are applied when ControlFlow loads it
+        if "prefect" in sys.modules:
+            self.apply_prefect_settings()
+        return self
+
+    def apply_prefect_settings(self):
         """
         Prefect settings are set at runtime by opening a settings context.
         We check if any prefect-specific settings have been changed and apply them.
         """
+        import prefect.logging.configuration
+        import prefect.settings
+
         if self._prefect_context is not None:
             self._prefect_context.__exit__(None, None, None)
             self._prefect_context = None
@@ -148,8 +228,6 @@ class Settings(ControlFlowSettings):
         # Configure logging
         prefect.logging.configuration.setup_logging()
 
-        return self
-
 
 settings = Settings()
 
@@ -1,11 +1,13 @@
 import datetime
 import uuid
+import weakref
 from contextlib import ExitStack, contextmanager
 from enum import Enum
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    ClassVar,
     GenericAlias,
     Literal,
     Optional,
@@ -14,11 +16,10 @@ from typing import (
     _LiteralGenericAlias,
 )
 
-from prefect.context import TaskRunContext
 from pydantic import (
     Field,
+    PrivateAttr,
     PydanticSchemaGenerationError,
-    TypeAdapter,
     field_serializer,
     field_validator,
 )
@@ -37,6 +38,7 @@ from controlflow.utilities.tasks import (
     collect_tasks,
     visit_task_collection,
 )
+from controlflow.utilities.type_adapters import get_json_schema, get_type_adapter
 from controlflow.utilities.types import (
     NOTSET,
     ControlFlowModel,
@@ -50,7 +52,20 @@ T = TypeVar("T")
 logger = get_logger(__name__)
 
 
+def get_result_type_schema(result_type: Any) -> Union[dict, str]:
+    """
+    Returns the JSON schema of a result type, or a placeholder if one can't be
+    generated. Schemas are cached by type, so callers must not modify them.
+    """
+    try:
+        return get_json_schema(result_type)
+    except PydanticSchemaGenerationError:
+        return "<schema could not be generated>"
+
+
 def get_task_run_name() -> str:
+    from prefect.context import TaskRunContext
+
     context = TaskRunContext.get()
     return f'Run {context.parameters["self"].friendly_name()}'
 
@@ -138,6 +153,20 @@ class Task(ControlFlowModel):
     _iteration: int = 0
     _cm_stack: list[contextmanager] = []
     _prefect_task: Optional[PrefectTrackingTask] = None
+    # objects notified of status changes through `on_status_change(task, old_status)`
+    _status_listeners: weakref.WeakSet = PrivateAttr(default_factory=weakref.WeakSet)
+    # orchestration tools (e.g. for marking the task successful), cached by name
+    _orchestration_tools: dict[str, tuple[Any, Tool]] = PrivateAttr(
+        default_factory=dict
+    )
+    # the most recently rendered prompt, with the key it was rendered for
+    _prompt_cache: Optional[tuple] = PrivateAttr(None)
+    _serialized_for_prompt: Optional[tuple] = PrivateAttr(None)
+    _cache_content_fields: ClassVar[tuple[str, ...]] = (
+        "context",
+        "tools",
+        "depends_on",
+    )
 
     model_config = dict(extra="forbid", arbitrary_types_allowed=True)
 
@@ -208,19 +237,13 @@ class Task(ControlFlowModel):
 
     def __eq__(self, other):
         """
-        Tasks have set attributes and set equality is based on id() of their
-        contents, not equality of objects. This means that two tasks are not
-        equal unless their set attributes satisfy an identity criteria, which is
-        too strict.
+        Tasks are only equal to themselves. Comparing their fields would
+        recursively compare their dependencies, which makes set and list
+        operations on large graphs slow, and IDs are too short to be unique
+        in large graphs. To compare fields, use
+        `controlflow.utilities.testing.tasks_are_structurally_equal`.
         """
-        if type(self) == type(other):
-            d1 = dict(self)
-            d2 = dict(other)
-            # conver sets to lists for comparison
-            d1["depends_on"] = list(d1["depends_on"])
-            d2["depends_on"] = list(d2["depends_on"])
-            return d1 == d2
-        return False
+        return self is other
 
     def __repr__(self) -> str:
         serialized = self.model_dump(include={"id", "objective"})
@@ -260,12 +283,7 @@ class Task(ControlFlowModel):
     def _serialize_result_type(self, result_type: list["Task"]):
         if result_type is None:
             return None
-        try:
-            schema = TypeAdapter(result_type).json_schema()
-        except PydanticSchemaGenerationError:
-            schema = "<schema could not be generated>"
-
-        return dict(type=repr(result_type), schema=schema)
+        return dict(type=repr(result_type), schema=get_result_type_schema(result_type))
 
     @field_serializer("agent")
     def _serialize_agents(self, agent: Optional["Agent"]):
@@ -282,11 +300,20 @@ class Task(ControlFlowModel):
             objective = f'"{self.objective}"'
         return f"Task {self.id} ({objective})"
 
-    def serialize_for_prompt(self) -> dict:
+    def serialize_for_prompt(self) -> str:
         """
         Generate a prompt to share information about the task, for use in another object's prompt (like Flow)
+
+        The result is cached until a field of the task or its agent is assigned,
+        or the contents of their mutable fields (like context and tools) change.
         """
-        return self.model_dump_json()
+        agent = self.get_agent()
+        key = (self._cache_key(), agent._cache_key())
+        cached = self._serialized_for_prompt
+        if cached is None or cached[0] != key:
+            cached = (key, self.model_dump_json())
+            self._serialized_for_prompt = cached
+        return cached[1]
 
     @property
     def subtasks(self) -> list["Task"]:
@@ -304,6 +331,7 @@ class Task(ControlFlowModel):
             raise ValueError(f"{self.friendly_name()} already has a parent.")
         self._subtasks.add(task)
         self.depends_on.add(task)
+        self._version += 1
 
     def add_dependency(self, task: "Task"):
         """
@@ -311,6 +339,7 @@ class Task(ControlFlowModel):
         """
         self.depends_on.add(task)
         task._downstreams.add(self)
+        self._version += 1
 
     @prefect_task(task_run_name=get_task_run_name)
     def run(
@@ -468,8 +497,15 @@ class Task(ControlFlowModel):
         return template.render()
 
     def set_status(self, status: TaskStatus):
+        old_status = self.status
         self.status = status
 
+        if self.is_complete():
+            self._orchestration_tools.clear()
+
+        for listener in list(self._status_listeners):
+            listener.on_status_change(task=self, old_status=old_status)
+
         # update TUI
         if tui := ctx.get("tui"):
             tui.update_task(self)
@@ -537,7 +573,7 @@ def validate_result(result: Any, result_type: type[T]) -> T:
         raise ValueError("Task has result_type=None, but a result was provided.")
     elif result_type is not None:
         try:
-            result = TypeAdapter(result_type).validate_python(result)
+            result = get_type_adapter(result_type).validate_python(result)
         except PydanticSchemaGenerationError:
             if isinstance(result, dict):
                 result = result_type(**result)
@@ -1,10 +1,11 @@
-from typing import TypeVar
+from typing import Any, Callable, TypeVar
 
-from pydantic import PydanticSchemaGenerationError, TypeAdapter
+from pydantic import PydanticSchemaGenerationError
 
 from controlflow.agents import Agent
 from controlflow.tasks.task import Task
 from controlflow.tools.tools import Tool, tool
+from controlflow.utilities.type_adapters import get_type_adapter
 
 T = TypeVar("T")
 
@@ -16,7 +17,7 @@ def generate_result_schema(result_type: type[T]) -> type[T]:
     result_schema = None
     # try loading pydantic-compatible schemas
     try:
-        TypeAdapter(result_type)
+        get_type_adapter(result_type)
         result_schema = result_type
     except PydanticSchemaGenerationError:
         pass
@@ -38,23 +39,49 @@ def generate_result_schema(result_type: type[T]) -> type[T]:
     return result_schema
 
 
+def _get_cached_tool(
+    task: Task, name: str, create_tool: Callable[[], Tool], key: Any = None
+) -> Tool:
+    """
+    Orchestration tools are cached on their task until it completes, so that
+    each turn doesn't rebuild their schemas. The cached tool is replaced if the
+    task's id or the `key` (e.g. the result type) changes.
+    """
+    if task.is_complete():
+        task._orchestration_tools.clear()
+        return create_tool()
+
+    key = (task.id, key)
+    cached = task._orchestration_tools.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    new_tool = create_tool()
+    task._orchestration_tools[name] = (key, new_tool)
+    return new_tool
+
+
 def create_task_success_tool(task: Task) -> Tool:
     """
     Create an agent-compatible tool for marking this task as successful.
     """
 
-    result_schema = generate_result_schema(task.result_type)
+    def create_tool() -> Tool:
+        result_schema = generate_result_schema(task.result_type)
+
+        @tool(
+            name=f"mark_task_{task.id}_successful",
+            description=f"Mark task {task.id} as successful.",
+            private=True,
+            parallel=False,
+        )
+        def succeed(result: result_schema) -> str:  # type: ignore
+            task.mark_successful(result=result)
+            return f"{task.friendly_name()} marked successful."
 
-    @tool(
-        name=f"mark_task_{task.id}_successful",
-        description=f"Mark task {task.id} as successful.",
-        private=True,
-    )
-    def succeed(result: result_schema) -> str:  # type: ignore
-        task.mark_successful(result=result)
-        return f"{task.friendly_name()} marked successful."
+        return succeed
 
-    return succeed
+    return _get_cached_tool(task, "success", create_tool, key=task.result_type)
 
 
 def create_task_fail_tool(task: Task) -> Tool:
@@ -62,18 +89,22 @@ def create_task_fail_tool(task: Task) -> Tool:
     Create an agent-compatible tool for failing this task.
     """
 
-    @tool(
-        name=f"mark_task_{task.id}_failed",
-        description=(
-            f"Mark task {task.id} as failed. Only use when technical errors prevent success. Provide a detailed reason for the failure."
-        ),
-        private=True,
-    )
-    def fail(reason: str) -> str:
-        task.mark_failed(reason=reason)
-        return f"{task.friendly_name()} marked failed."
+    def create_tool() -> Tool:
+        @tool(
+            name=f"mark_task_{task.id}_failed",
+            description=(
+                f"Mark task {task.id} as failed. Only use when technical errors prevent success. Provide a detailed reason for the failure."
+            ),
+            private=True,
+            parallel=False,
+        )
+        def fail(reason: str) -> str:
+            task.mark_failed(reason=reason)
+            return f"{task.friendly_name()} marked failed."
+
+        return fail
 
-    return fail
+    return _get_cached_tool(task, "fail", create_tool)
 
 
 def create_end_turn_tool(agent: Agent) -> Tool:
@@ -86,7 +117,7 @@ def create_end_turn_tool(agent: Agent) -> Tool:
     tool to let another agent speak.
     """
 
-    @tool(private=True)
+    @tool(private=True, parallel=False)
     def end_turn(next_agent_name: str = None) -> str:
         """
         End your turn so another agent can work. You can optionally choose
@@ -1,8 +1,6 @@
 import asyncio
 import contextlib
 
-from prefect.context import FlowRunContext
-from prefect.input.run_input import receive_input
 from rich.prompt import Prompt as RichPrompt
 
 import controlflow
@@ -48,13 +46,16 @@ async def get_terminal_input(message: str):
 
 
 async def get_flow_run_input(message: str):
+    from prefect.context import FlowRunContext
+    from prefect.input.run_input import receive_input
+
     async for response in receive_input(
         str, flow_run_id=FlowRunContext.get().flow_run.id, poll_interval=0.2
     ):
         return response
 
 
-@tool
+@tool(parallel=False)
 async def talk_to_user(message: str, wait_for_response: bool = True) -> str:
     """
     If a task requires you to interact with a user, it will show
@@ -79,6 +80,8 @@ async def talk_to_user(message: str, wait_for_response: bool = True) -> str:
     """
 
     if wait_for_response:
+        from prefect.context import FlowRunContext
+
         tasks = []
         # if running in a Prefect flow, listen for a remote input
         if (frc := FlowRunContext.get()) and frc.flow_run and frc.flow_run.id:
@@ -1,18 +1,22 @@
+import asyncio
+import concurrent.futures
+import contextvars
 import functools
 import inspect
 import json
 import typing
+import weakref
 from typing import Annotated, Any, Callable, Optional, Union
 
 import langchain_core.tools
 import pydantic
 import pydantic.v1
 from langchain_core.messages import InvalidToolCall, ToolCall
-from prefect.utilities.asyncutils import run_coro_as_sync
 from pydantic import Field, PydanticSchemaGenerationError, TypeAdapter
 
 import controlflow
 from controlflow.utilities.prefect import create_markdown_artifact, prefect_task
+from controlflow.utilities.type_adapters import get_type_adapter
 from controlflow.utilities.types import ControlFlowModel
 
 TOOL_CALL_FUNCTION_RESULT_TEMPLATE = """
@@ -44,6 +48,12 @@ class Tool(ControlFlowModel):
     )
     metadata: dict = {}
     private: bool = False
+    parallel: bool = Field(
+        True,
+        description="If False, calls to this tool never run at the same time as "
+        "other tool calls, for tools that interact with the user or change "
+        "the state of the workflow.",
+    )
 
     fn: Callable = Field(None, exclude=True)
 
@@ -51,13 +61,10 @@ class Tool(ControlFlowModel):
         payload = self.model_dump(include={"name", "description", "parameters"})
         return dict(type="function", function=payload)
 
-    @prefect_task(task_run_name="Tool call: {self.name}")
-    def run(self, input: dict):
-        result = self.fn(**input)
-        if inspect.isawaitable(result):
-            result = run_coro_as_sync(result)
+    def _create_result_artifact(self, input: dict, result: Any):
+        if not controlflow.settings.enable_prefect_tracking:
+            return
 
-        # prepare artifact
         passed_args = inspect.signature(self.fn).bind(**input).arguments
         try:
             # try to pretty print the args
@@ -73,6 +80,16 @@ class Tool(ControlFlowModel):
             ),
             key="tool-result",
         )
+
+    @prefect_task(task_run_name="Tool call: {self.name}")
+    def run(self, input: dict):
+        result = self.fn(**input)
+        if inspect.isawaitable(result):
+            from prefect.utilities.asyncutils import run_coro_as_sync
+
+            result = run_coro_as_sync(result)
+
+        self._create_result_artifact(input=input, result=result)
         return result
 
     @prefect_task(task_run_name="Tool call: {self.name}")
@@ -81,22 +98,7 @@ class Tool(ControlFlowModel):
         if inspect.isawaitable(result):
             result = await result
 
-        # prepare artifact
-        passed_args = inspect.signature(self.fn).bind(**input).arguments
-        try:
-            # try to pretty print the args
-            passed_args = json.dumps(passed_args, indent=2)
-        except Exception:
-            pass
-        create_markdown_artifact(
-            markdown=TOOL_CALL_FUNCTION_RESULT_TEMPLATE.format(
-                name=self.name,
-                description=self.description or "(none provided)",
-                args=passed_args,
-                result=result,
-            ),
-            key="tool-result",
-        )
+        self._create_result_artifact(input=input, result=result)
         return result
 
     @classmethod
@@ -106,41 +108,17 @@ class Tool(ControlFlowModel):
         name = name or fn.__name__
         description = description or fn.__doc__ or ""
 
-        signature = inspect.signature(fn)
         try:
-            parameters = TypeAdapter(fn).json_schema()
+            parameters, return_schema = get_function_schemas(fn)
         except PydanticSchemaGenerationError:
             raise ValueError(
                 f'Could not generate a schema for tool "{name}". '
                 "Tool functions must have type hints that are compatible with Pydantic."
             )
 
-        # load parameter descriptions
-        for param in signature.parameters.values():
-            # handle Annotated type hints
-            if typing.get_origin(param.annotation) is Annotated:
-                param_description = " ".join(
-                    str(a) for a in typing.get_args(param.annotation)[1:]
-                )
-            # handle pydantic Field descriptions
-            elif param.default is not inspect.Parameter.empty and isinstance(
-                param.default, pydantic.fields.FieldInfo
-            ):
-                param_description = param.default.description
-            else:
-                param_description = None
-
-            if param_description:
-                parameters["properties"][param.name]["description"] = param_description
-
         # Handle return type description
-        return_type = signature.return_annotation
-        if return_type is not inspect._empty:
-            try:
-                return_schema = TypeAdapter(return_type).json_schema()
-                description += f"\n\nReturn value schema: {return_schema}"
-            except PydanticSchemaGenerationError:
-                pass
+        if return_schema is not None:
+            description += f"\n\nReturn value schema: {return_schema}"
 
         if not description:
             description = "(No description provided)"
@@ -170,6 +148,100 @@ class Tool(ControlFlowModel):
         return self.model_dump(include={"name", "description"})
 
 
+# The schemas of functions converted to tools are cached in a weak-keyed
+# dictionary. The tools that `as_tools` creates from plain functions refer to
+# the function, so they would keep a weak key alive; instead they are stored
+# as an attribute of the function. Both are ignored if the function changes.
+_function_schema_cache = weakref.WeakKeyDictionary()
+_TOOL_ATTR = "__controlflow_tool__"
+
+
+def _function_fingerprint(fn: Callable) -> tuple:
+    return (
+        getattr(fn, "__name__", None),
+        getattr(fn, "__doc__", None),
+        getattr(fn, "__code__", None),
+        getattr(fn, "__defaults__", None),
+        getattr(fn, "__kwdefaults__", None),
+        tuple(getattr(fn, "__annotations__", {}).items()),
+    )
+
+
+def _get_cached(cache: weakref.WeakKeyDictionary, fn: Callable) -> Any:
+    try:
+        fingerprint, value = cache[fn]
+    except (KeyError, TypeError):
+        return None
+    if fingerprint != _function_fingerprint(fn):
+        return None
+    return value
+
+
+def _set_cached(cache: weakref.WeakKeyDictionary, fn: Callable, value: Any):
+    try:
+        cache[fn] = (_function_fingerprint(fn), value)
+    except TypeError:
+        # the callable can't be weakly referenced or hashed
+        pass
+
+
+def _get_function_tool(fn: Callable) -> Optional["Tool"]:
+    fingerprint, tool = getattr(fn, _TOOL_ATTR, (None, None))
+    if fingerprint != _function_fingerprint(fn):
+        return None
+    return tool
+
+
+def _set_function_tool(fn: Callable, tool: "Tool"):
+    try:
+        setattr(fn, _TOOL_ATTR, (_function_fingerprint(fn), tool))
+    except AttributeError:
+        pass
+
+
+def get_function_schemas(fn: Callable) -> tuple[dict, Optional[dict]]:
+    """
+    Returns the JSON schema of a function's parameters and the schema of its
+    return value (None if it has no return annotation Pydantic can handle).
+    Callers must not modify the returned schemas.
+    """
+    if (schemas := _get_cached(_function_schema_cache, fn)) is not None:
+        return schemas
+
+    signature = inspect.signature(fn)
+    parameters = TypeAdapter(fn).json_schema()
+
+    # load parameter descriptions
+    for param in signature.parameters.values():
+        # handle Annotated type hints
+        if typing.get_origin(param.annotation) is Annotated:
+            param_description = " ".join(
+                str(a) for a in typing.get_args(param.annotation)[1:]
+            )
+        # handle pydantic Field descriptions
+        elif param.default is not inspect.Parameter.empty and isinstance(
+            param.default, pydantic.fields.FieldInfo
+        ):
+            param_description = param.default.description
+        else:
+            param_description = None
+
+        if param_description:
+            parameters["properties"][param.name]["description"] = param_description
+
+    return_schema = None
+    return_type = signature.return_annotation
+    if return_type is not inspect._empty:
+        try:
+            return_schema = TypeAdapter(return_type).json_schema()
+        except PydanticSchemaGenerationError:
+            pass
+
+    schemas = (parameters, return_schema)
+    _set_cached(_function_schema_cache, fn, schemas)
+    return schemas
+
+
 def tool(
     fn: Optional[Callable] = None,
     *,
@@ -194,6 +266,9 @@ def as_tools(
 
     If duplicate tools are found, where the name, function, and coroutine are
     the same, only one is kept.
+
+    Tools created from plain functions are cached, so converting the same
+    function again returns the same Tool.
     """
     seen = set()
     new_tools = []
@@ -203,7 +278,11 @@ def as_tools(
         elif isinstance(t, langchain_core.tools.BaseTool):
             t = Tool.from_lc_tool(t)
         elif inspect.isfunction(t):
-            t = Tool.from_function(t)
+            fn = t
+            t = _get_function_tool(fn)
+            if t is None:
+                t = Tool.from_function(fn)
+                _set_function_tool(fn, t)
         elif isinstance(t, dict):
             t = Tool(**t)
         else:
@@ -225,7 +304,7 @@ def output_to_string(output: Any) -> str:
     elif isinstance(output, str):
         return output
     try:
-        return pydantic.TypeAdapter(type(output)).dump_json(output).decode()
+        return get_type_adapter(type(output)).dump_json(output).decode()
     except Exception:
         return str(output)
 
@@ -320,3 +399,78 @@ async def handle_tool_call_async(tool_call: ToolCall, tools: list[Tool]) -> Any:
         is_error=is_error,
         is_private=getattr(tool, "private", is_private),
     )
+
+
+def _batch_tool_calls(
+    tool_calls: list[Union[ToolCall, InvalidToolCall]], tools: list[Tool]
+) -> list[list[Union[ToolCall, InvalidToolCall]]]:
+    """
+    Split tool calls into batches that can run in parallel, in their original
+    order. Calls to tools with `parallel=False` are always in a batch of their
+    own, so they run after the calls before them and before the calls after
+    them.
+    """
+    tool_lookup = {t.name: t for t in tools}
+    batches = []
+    batch = []
+    for tool_call in tool_calls:
+        if getattr(tool_lookup.get(tool_call["name"]), "parallel", True):
+            batch.append(tool_call)
+        else:
+            if batch:
+                batches.append(batch)
+                batch = []
+            batches.append([tool_call])
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def handle_tool_calls(
+    tool_calls: list[Union[ToolCall, InvalidToolCall]], tools: list[Tool]
+) -> list[ToolResult]:
+    """
+    Runs several tool calls in a bounded thread pool and returns their
+    ToolResults in the same order as the tool calls. Calls to tools with
+    `parallel=False` run on their own.
+    """
+    results = []
+    for batch in _batch_tool_calls(tool_calls, tools=tools):
+        max_workers = min(len(batch), controlflow.settings.max_parallel_tool_calls)
+        if max_workers <= 1:
+            results.extend(
+                handle_tool_call(tool_call, tools=tools) for tool_call in batch
+            )
+            continue
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # each call runs in a copy of the current context, so tools can still
+            # load the flow and agent context
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, handle_tool_call, tool_call, tools
+                )
+                for tool_call in batch
+            ]
+            results.extend(future.result() for future in futures)
+    return results
+
+
+async def handle_tool_calls_async(
+    tool_calls: list[Union[ToolCall, InvalidToolCall]], tools: list[Tool]
+) -> list[ToolResult]:
+    """
+    Runs several tool calls concurrently and returns their ToolResults in the
+    same order as the tool calls. Calls to tools with `parallel=False` run on
+    their own.
+    """
+    semaphore = asyncio.Semaphore(controlflow.settings.max_parallel_tool_calls)
+
+    async def _handle_tool_call(tool_call):
+        async with semaphore:
+            return await handle_tool_call_async(tool_call, tools=tools)
+
+    results = []
+    for batch in _batch_tool_calls(tool_calls, tools=tools):
+        results.extend(await asyncio.gather(*[_handle_tool_call(t) for t in batch]))
+    return results
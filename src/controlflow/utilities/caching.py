@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class IdentityKey:
+    """
+    A hashable key for an object that compares by the object's identity, for
+    caching values derived from objects that can't be hashed or compared
+    cheaply.
+
+    The key holds a reference to its object. Otherwise the object could be
+    garbage collected while the key is cached, and a new object could reuse
+    its id and be mistaken for it.
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __hash__(self) -> int:
+        return id(self.obj)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, IdentityKey) and other.obj is self.obj
+
+    def __repr__(self) -> str:
+        return f"IdentityKey({self.obj!r})"
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A bounded, thread-safe cache that evicts its least recently used entries
+    once it holds more than `max_size`.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def get_or_create(
+        self,
+        key: K,
+        create: Callable[[], V],
+        is_valid: Optional[Callable[[V], bool]] = None,
+    ) -> V:
+        """
+        Get the value for a key, or create it if it's missing or `is_valid`
+        rejects it. The value is created while the cache is locked, so
+        concurrent callers get the same value; values that are slow to create
+        should use `get` and `set` instead.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None or (is_valid is not None and not is_valid(value)):
+                value = create()
+            self._set(key, value)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _set(self, key: K, value: V) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -1,10 +1,14 @@
 import inspect
 import os
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 from jinja2 import Environment as JinjaEnvironment
 from jinja2 import PackageLoader, StrictUndefined, select_autoescape
+from jinja2 import Template as JinjaTemplate
+
+from controlflow.settings import settings
 
 global_fns = {
     "now": lambda: datetime.now(ZoneInfo("UTC")),
@@ -18,8 +22,27 @@ prompt_env = JinjaEnvironment(
     autoescape=select_autoescape(default_for_string=False),
     trim_blocks=True,
     lstrip_blocks=True,
-    auto_reload=True,
+    auto_reload=False,
     undefined=StrictUndefined,
 )
 
 prompt_env.globals.update(global_fns)
+
+
+def get_template(path: str) -> JinjaTemplate:
+    """
+    Load a prompt template file. Templates are compiled once and, unless
+    `controlflow.settings.prompt_template_auto_reload` is True, never checked
+    for changes.
+    """
+    prompt_env.auto_reload = settings.prompt_template_auto_reload
+    return prompt_env.get_template(path)
+
+
+@lru_cache(maxsize=256)
+def template_from_string(source: str) -> JinjaTemplate:
+    """
+    Compile a prompt template from a string. Compiled templates are cached by
+    their source, so custom prompts are only compiled once.
+    """
+    return prompt_env.from_string(source)
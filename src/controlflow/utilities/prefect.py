@@ -1,65 +1,330 @@
-from contextlib import contextmanager
+import asyncio
+import atexit
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import cache
 from typing import (
+    TYPE_CHECKING,
     Any,
+    Callable,
     Optional,
 )
 from uuid import UUID
 
-import prefect
-import prefect.cache_policies
-import prefect.serializers
-import prefect.tasks
-from prefect import get_client as get_prefect_client
-from prefect.artifacts import ArtifactRequest
-from prefect.client.orchestration import SyncPrefectClient, get_client
-from prefect.client.schemas import State, TaskRun
-from prefect.context import (
-    FlowRunContext,
-    TaskRunContext,
-)
-from prefect.events.schemas.events import Event
-from prefect.results import ResultFactory
-from prefect.states import (
-    Cancelled,
-    Completed,
-    Failed,
-    Running,
-    return_value_to_state,
-)
-from prefect.utilities.asyncutils import run_coro_as_sync
-from prefect.utilities.engine import (
-    emit_task_run_state_change_event,
-    propose_state_sync,
-)
-from pydantic import TypeAdapter
-
 import controlflow
+from controlflow.utilities.logging import get_logger
+from controlflow.utilities.type_adapters import get_type_adapter
 from controlflow.utilities.types import ControlFlowModel
 
+# Prefect takes seconds to import, so it's only imported when it's first needed
+if TYPE_CHECKING:
+    import prefect
+    from prefect.client.orchestration import SyncPrefectClient
+    from prefect.client.schemas import State, TaskRun
+    from prefect.events.schemas.events import Event
+
+logger = get_logger(__name__)
+
+
+_load_prefect_lock = threading.Lock()
+
+
+@cache
+def _load_prefect():
+    import prefect
+
+    # if Prefect was already imported, settings are applied as they change and
+    # the settings context can only be exited from the context that opened it
+    if controlflow.settings._prefect_context is None:
+        controlflow.settings.apply_prefect_settings()
+    return prefect
+
+
+def load_prefect():
+    """
+    Import Prefect and apply ControlFlow's Prefect settings. Safe to call from
+    several threads at once, as concurrent tool calls do.
+    """
+    with _load_prefect_lock:
+        return _load_prefect()
+
+
+# Functions called with the name and duration (in seconds) of each task that
+# runs while Prefect tracking is disabled, for lightweight timing
+untracked_run_hooks: list[Callable[[str, float], None]] = []
+
+
+class PrefectTask:
+    """
+    Runs a function as a Prefect task. The Prefect task is only created when
+    the function is first called with Prefect tracking enabled; otherwise the
+    function is called directly.
+    """
+
+    def __init__(self, fn: Callable, **task_kwargs):
+        self.fn = fn
+        self.task_kwargs = task_kwargs
+        self.name = task_kwargs.get("name") or fn.__name__
+        self.isasync = inspect.iscoroutinefunction(fn)
+        self._task: Optional["prefect.Task"] = None
+
+    @property
+    def task(self) -> "prefect.Task":
+        if self._task is None:
+            prefect = load_prefect()
+            kwargs = self.task_kwargs.copy()
+            kwargs.setdefault("cache_policy", prefect.cache_policies.NONE)
+            self._task = prefect.Task(fn=self.fn, **kwargs)
+        return self._task
+
+    def __call__(self, *args, **kwargs):
+        if not controlflow.settings.enable_prefect_tracking:
+            return self._run_untracked(*args, **kwargs)
+        return self.task(*args, **kwargs)
+
+    def _run_untracked(self, *args, **kwargs):
+        if not untracked_run_hooks:
+            return self.fn(*args, **kwargs)
+        elif self.isasync:
+            return self._run_untracked_async(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self._call_untracked_run_hooks(args, kwargs, time.perf_counter() - start)
+
+    async def _run_untracked_async(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self.fn(*args, **kwargs)
+        finally:
+            self._call_untracked_run_hooks(args, kwargs, time.perf_counter() - start)
+
+    def _call_untracked_run_hooks(self, args: tuple, kwargs: dict, duration: float):
+        name = self.name
+        task_run_name = self.task_kwargs.get("task_run_name")
+        if isinstance(task_run_name, str):
+            try:
+                parameters = inspect.signature(self.fn).bind(*args, **kwargs)
+                name = task_run_name.format(**parameters.arguments)
+            except Exception:
+                pass
+
+        for hook in untracked_run_hooks:
+            try:
+                hook(name, duration)
+            except Exception:
+                logger.exception(f"Error in untracked run hook {hook!r}")
+
 
 def prefect_task(*args, **kwargs):
     """
-    A decorator that creates a Prefect task with ControlFlow defaults
+    A decorator that creates a Prefect task with ControlFlow defaults. The
+    decorated function keeps its `PrefectTask` as `fn.prefect_task`.
+
+    The result is a plain function, so it can be used as a method: the
+    instance is passed to the Prefect task as its `self` parameter. (Prefect's
+    own method binding stores the instance on the task's shared function, so
+    concurrent calls, like parallel tool calls, could run with the wrong one.)
     """
 
     # TODO: only open in Flow context?
 
     kwargs.setdefault("log_prints", controlflow.settings.log_prints)
-    kwargs.setdefault("cache_policy", prefect.cache_policies.NONE)
     kwargs.setdefault("result_serializer", "json")
 
-    return prefect.task(*args, **kwargs)
+    def decorator(fn: Callable) -> Callable:
+        task = PrefectTask(fn=fn, **kwargs)
+
+        if task.isasync:
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await task(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return task(*args, **kwargs)
+
+        wrapper.prefect_task = task
+        return wrapper
+
+    if args:
+        return decorator(*args)
+    return decorator
+
+
+class PrefectFlow:
+    """
+    Runs a function as a Prefect flow. Like `PrefectTask`, the Prefect flow is
+    only created when the function is first called with Prefect tracking
+    enabled; otherwise the function is called directly.
+
+    Before a tracked flow run completes, it waits for the exporter to send its
+    task states and artifacts.
+    """
+
+    def __init__(self, fn: Callable, **flow_kwargs):
+        self.fn = fn
+        self.flow_kwargs = flow_kwargs
+        self.isasync = inspect.iscoroutinefunction(fn)
+        self._flow: Optional["prefect.Flow"] = None
+
+    @property
+    def flow(self) -> "prefect.Flow":
+        if self._flow is None:
+            prefect = load_prefect()
+            self._flow = prefect.flow(self._fn_with_flush(), **self.flow_kwargs)
+        return self._flow
+
+    def _fn_with_flush(self) -> Callable:
+        fn = self.fn
+        # generators (like `prefect_flow_context`) flush when they finish
+        if inspect.isgeneratorfunction(fn) or inspect.isasyncgenfunction(fn):
+            return fn
+        elif self.isasync:
+
+            @functools.wraps(fn)
+            async def fn_with_flush(*args, **kwargs):
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    await asyncio.to_thread(flush_prefect_exporter)
+
+        else:
+
+            @functools.wraps(fn)
+            def fn_with_flush(*args, **kwargs):
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    flush_prefect_exporter()
+
+        return fn_with_flush
+
+    def __call__(self, *args, **kwargs):
+        if not controlflow.settings.enable_prefect_tracking:
+            return self.fn(*args, **kwargs)
+        return self.flow(*args, **kwargs)
 
 
 def prefect_flow(*args, **kwargs):
     """
-    A decorator that creates a Prefect flow with ControlFlow defaults
+    A decorator that creates a Prefect flow with ControlFlow defaults. The
+    decorated function keeps its `PrefectFlow` as `fn.prefect_flow`.
     """
 
     kwargs.setdefault("log_prints", controlflow.settings.log_prints)
     kwargs.setdefault("result_serializer", "json")
 
-    return prefect.flow(*args, **kwargs)
+    def decorator(fn: Callable) -> Callable:
+        flow = PrefectFlow(fn=fn, **kwargs)
+
+        if flow.isasync:
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await flow(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return flow(*args, **kwargs)
+
+        wrapper.prefect_flow = flow
+        return wrapper
+
+    if args:
+        return decorator(*args)
+    return decorator
+
+
+class PrefectExporter:
+    """
+    Sends artifacts and task run states to Prefect from a background thread, so
+    that agents never wait on the Prefect API.
+
+    Jobs are functions that receive a sync Prefect client. They run in the
+    order they were submitted and in the context they were submitted from (so
+    Prefect settings like the API URL are respected), in batches that share a
+    client. Errors are logged rather than raised.
+
+    If `controlflow.settings.enable_background_prefect_export` is False, jobs run
+    immediately instead.
+    """
+
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+        self._jobs: deque[tuple[contextvars.Context, Callable]] = deque()
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._clients: dict[str, "SyncPrefectClient"] = {}
+
+    def submit(self, fn: Callable[["SyncPrefectClient"], Any]) -> None:
+        context = contextvars.copy_context()
+        if not controlflow.settings.enable_background_prefect_export:
+            context.run(self._run_job, fn, {})
+            return
+
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="controlflow-prefect-exporter", daemon=True
+                )
+                self._thread.start()
+            self._jobs.append((context, fn))
+            self._pending += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for all submitted jobs to finish. Returns False if the timeout
+        expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending == 0, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs)
+                batch = [
+                    self._jobs.popleft()
+                    for _ in range(min(self.batch_size, len(self._jobs)))
+                ]
+            for context, fn in batch:
+                context.run(self._run_job, fn, self._clients)
+            with self._condition:
+                self._pending -= len(batch)
+                self._condition.notify_all()
+
+    @staticmethod
+    def _run_job(fn: Callable, clients: dict[str, "SyncPrefectClient"]):
+        from prefect.client.orchestration import get_client
+        from prefect.settings import PREFECT_API_URL
+
+        try:
+            # clients are reused across batches, one per Prefect API
+            api_url = str(PREFECT_API_URL.value())
+            if api_url not in clients:
+                clients[api_url] = get_client(sync_client=True)
+            fn(clients[api_url])
+        except Exception:
+            logger.exception("Error exporting to Prefect")
+
+
+prefect_exporter = PrefectExporter()
+atexit.register(prefect_exporter.flush, timeout=5)
 
 
 def create_markdown_artifact(
@@ -72,6 +337,13 @@ def create_markdown_artifact(
     """
     Create a Markdown artifact.
     """
+    if not controlflow.settings.enable_prefect_tracking:
+        return
+
+    load_prefect()
+    from prefect.artifacts import ArtifactRequest
+    from prefect.context import FlowRunContext, TaskRunContext
+
     tr_context = TaskRunContext.get()
     fr_context = FlowRunContext.get()
 
@@ -80,17 +352,20 @@ def create_markdown_artifact(
     if fr_context:
         flow_run_id = flow_run_id or fr_context.flow_run.id
 
-    client = get_prefect_client()
-    run_coro_as_sync(
-        client.create_artifact(
-            artifact=ArtifactRequest(
-                key=key,
-                data=markdown,
-                description=description,
-                type="markdown",
-                task_run_id=task_run_id,
-                flow_run_id=flow_run_id,
-            )
+    artifact = ArtifactRequest(
+        key=key,
+        data=markdown,
+        description=description,
+        type="markdown",
+        task_run_id=task_run_id,
+        flow_run_id=flow_run_id,
+    )
+
+    # SyncPrefectClient.create_artifact encodes the artifact twice in this
+    # version of Prefect, so the exporter's client sends the request directly
+    prefect_exporter.submit(
+        lambda client: client._client.post(
+            "/artifacts/", json=artifact.model_dump(mode="json", exclude_unset=True)
         )
     )
 
@@ -107,7 +382,7 @@ def create_json_artifact(
     """
 
     try:
-        markdown = TypeAdapter(type(data)).dump_json(data, indent=2).decode()
+        markdown = get_type_adapter(type(data)).dump_json(data, indent=2).decode()
         markdown = f"```json\n{markdown}\n```"
     except Exception:
         markdown = str(data)
@@ -165,10 +440,9 @@ class PrefectTrackingTask(ControlFlowModel):
     task_run_id: Optional[str] = None
     tags: Optional[list[str]] = None
 
-    _task: prefect.Task = None
-    _task_run: TaskRun = None
-    _client: SyncPrefectClient = None
-    _last_event: Optional[Event] = None
+    _task: "prefect.Task" = None
+    _task_run: "TaskRun" = None
+    _last_event: Optional["Event"] = None
     is_started: bool = False
 
     _context: list = []
@@ -176,14 +450,21 @@ class PrefectTrackingTask(ControlFlowModel):
     def start(self, depends_on: list = None):
         if self.is_started:
             raise ValueError("Task already started")
+        if not controlflow.settings.enable_prefect_tracking:
+            return
         self.is_started = True
-        self._client = get_client(sync_client=True)
+
+        load_prefect()
+        from prefect.context import FlowRunContext
+        from prefect.states import Running
+        from prefect.utilities.asyncutils import run_coro_as_sync
+        from prefect.utilities.engine import emit_task_run_state_change_event
 
         self._task = prefect_task(
             name=self.name,
             description=self.description,
             tags=self.tags,
-        )(lambda: None)
+        )(lambda: None).prefect_task.task
 
         self._task_run = run_coro_as_sync(
             self._task.create_run(
@@ -201,24 +482,38 @@ class PrefectTrackingTask(ControlFlowModel):
 
         self.set_state(Running())
 
-    def set_state(self, state: State) -> State:
+    def set_state(self, state: "State") -> "State":
         if not self.is_started:
             raise ValueError("Task not started")
 
-        new_state = propose_state_sync(
-            self._client, state, task_run_id=self._task_run.id, force=True
+        from prefect.utilities.engine import (
+            emit_task_run_state_change_event,
+            propose_state_sync,
+        )
+
+        # states are forced, so the proposed state is the one Prefect will
+        # accept and doesn't need to be waited for
+        task_run_id = self._task_run.id
+        prefect_exporter.submit(
+            lambda client: propose_state_sync(
+                client, state, task_run_id=task_run_id, force=True
+            )
         )
 
         self._last_event = emit_task_run_state_change_event(
             task_run=self._task_run,
             initial_state=self._task_run.state,
-            validated_state=new_state,
+            validated_state=state,
             follows=self._last_event,
         )
-        self._task_run.state = new_state
-        return new_state
+        self._task_run.state = state
+        return state
 
     def succeed(self, result: Any):
+        from prefect.results import ResultFactory
+        from prefect.states import Completed, return_value_to_state
+        from prefect.utilities.asyncutils import run_coro_as_sync
+
         if result is not None:
             terminal_state = run_coro_as_sync(
                 return_value_to_state(
@@ -233,9 +528,13 @@ class PrefectTrackingTask(ControlFlowModel):
         self.set_state(terminal_state)
 
     def fail(self, error: Optional[str] = None):
+        from prefect.states import Failed
+
         self.set_state(Failed(message=error))
 
     def skip(self):
+        from prefect.states import Cancelled
+
         self.set_state(Cancelled(message="Task skipped"))
 
 
@@ -264,6 +563,9 @@ def prefect_task_context(**kwargs):
             f"{unsupported_kwargs}. Consider using a @task-decorated function instead."
         )
 
+    if not controlflow.settings.enable_prefect_tracking:
+        return nullcontext()
+
     @contextmanager
     @prefect_task(**kwargs)
     def task_context():
@@ -272,6 +574,23 @@ def prefect_task_context(**kwargs):
     return task_context()
 
 
+def flush_prefect_exporter() -> bool:
+    """
+    Waits for the exporter to send the task states and artifacts submitted so
+    far, for up to `controlflow.settings.background_prefect_export_timeout`
+    seconds. Flows call this before they complete.
+    """
+    timeout = controlflow.settings.background_prefect_export_timeout
+    if not prefect_exporter.flush(timeout=timeout):
+        logger.warning(
+            f"Timed out after {timeout} seconds waiting to send task "
+            "states and artifacts to Prefect; they will be sent in "
+            "the background."
+        )
+        return False
+    return True
+
+
 def prefect_flow_context(**kwargs):
     """
     Creates a Prefect flow that starts when the context is entered and ends when
@@ -298,9 +617,15 @@ def prefect_flow_context(**kwargs):
             f"{unsupported_kwargs}. Consider using a @flow-decorated function instead."
         )
 
+    if not controlflow.settings.enable_prefect_tracking:
+        return nullcontext()
+
     @contextmanager
     @prefect_flow(**kwargs)
     def flow_context():
-        yield
+        try:
+            yield
+        finally:
+            flush_prefect_exporter()
 
     return flow_context()
@@ -28,6 +28,23 @@ class FakeLLM(FakeMessagesListChatModel):
         return len(str(messages))
 
 
+def tasks_are_structurally_equal(task1: Task, task2: Task) -> bool:
+    """
+    Compare two tasks field by field, useful for testing. Related tasks (like
+    dependencies and parents) are compared by ID.
+    """
+    if type(task1) is not type(task2):
+        return False
+    d1 = dict(task1)
+    d2 = dict(task2)
+    # compare dependencies by ID, regardless of order
+    d1["depends_on"] = {t.id for t in d1["depends_on"]}
+    d2["depends_on"] = {t.id for t in d2["depends_on"]}
+    d1["parent"] = d1["parent"].id if d1["parent"] is not None else None
+    d2["parent"] = d2["parent"].id if d2["parent"] is not None else None
+    return d1 == d2
+
+
 @contextmanager
 def record_events():
     """
@@ -0,0 +1,85 @@
+from typing import Any, Hashable
+
+from pydantic import TypeAdapter
+
+from controlflow.utilities.caching import IdentityKey, LRUCache
+
+
+class TypeAdapterCache:
+    """
+    A bounded, thread-safe cache of pydantic TypeAdapters, so that validating
+    or serializing the same type repeatedly only builds its adapter once.
+
+    Types are keyed by equality, so equal generic aliases like `list[int]`
+    share an adapter. Types that can't be hashed (like generic aliases with
+    unhashable metadata) are keyed by identity instead.
+
+    Adapters that fail to build aren't cached, so errors are raised every time.
+    Each adapter's JSON schema is also generated once and cached with it.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.hits = 0
+        self.misses = 0
+        # entries hold their adapter and, once it's generated, their JSON schema
+        self._entries: LRUCache[Hashable, list] = LRUCache(max_size=max_size)
+
+    @property
+    def max_size(self) -> int:
+        return self._entries.max_size
+
+    def get(self, type_: Any) -> TypeAdapter:
+        return self._get_entry(type_)[0]
+
+    def get_json_schema(self, type_: Any) -> dict:
+        """
+        Get the JSON schema of a type. Schemas are shared, so callers must not
+        modify them.
+        """
+        entry = self._get_entry(type_)
+        if entry[1] is None:
+            entry[1] = entry[0].json_schema()
+        return entry[1]
+
+    def _get_entry(self, type_: Any) -> list:
+        try:
+            key = ("type", type_)
+            hash(key)
+        except TypeError:
+            key = ("id", IdentityKey(type_))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+
+        # adapters are built without holding the lock, since they can be slow
+        entry = [TypeAdapter(type_), None]
+        self._entries.set(key, entry)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+type_adapter_cache = TypeAdapterCache()
+
+
+def get_type_adapter(type_: Any) -> TypeAdapter:
+    """
+    Get a TypeAdapter for a type from the global cache.
+    """
+    return type_adapter_cache.get(type_)
+
+
+def get_json_schema(type_: Any) -> dict:
+    """
+    Get the JSON schema of a type from the global cache.
+    """
+    return type_adapter_cache.get_json_schema(type_)
@@ -1,7 +1,8 @@
-from typing import Optional, Union
+from typing import Any, ClassVar, Optional, Union
 
-import prefect
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from controlflow.utilities.caching import IdentityKey
 
 # flag for unset defaults
 NOTSET = "__NOTSET__"
@@ -11,9 +12,57 @@ class ControlFlowModel(BaseModel):
     model_config = ConfigDict(
         validate_assignment=True,
         extra="forbid",
-        ignored_types=(prefect.Flow, prefect.Task),
     )
 
+    # incremented whenever a field is assigned, so that values derived from
+    # the model's fields can be cached until it changes
+    _version: int = PrivateAttr(0)
+    # mutable fields (like context dicts and tool lists) that can be changed in
+    # place without incrementing the version, so cache keys compare their
+    # contents instead
+    _cache_content_fields: ClassVar[tuple[str, ...]] = ()
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in self.model_fields:
+            self._version += 1
+
+    def _cache_key(self) -> tuple:
+        """
+        A key for caching values derived from the model's fields. It changes
+        when a field is assigned or the contents of a mutable field change.
+        """
+        return (
+            IdentityKey(self),
+            self._version,
+            *(_content_key(getattr(self, f)) for f in self._cache_content_fields),
+        )
+
+
+_PRIMITIVE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def _content_key(value: Any) -> Any:
+    """
+    A snapshot of a value's contents that can be compared to a later snapshot.
+    Containers and primitives are compared by value, and models by identity
+    and version. Other objects are compared by identity, since comparing their
+    contents would mean serializing them on every turn, so changing them in
+    place isn't detected; assign a new object instead.
+    """
+    if isinstance(value, _PRIMITIVE_TYPES):
+        return (type(value), value)
+    elif isinstance(value, ControlFlowModel):
+        return (IdentityKey(value), value._version)
+    elif isinstance(value, dict):
+        return (
+            dict,
+            tuple((_content_key(k), _content_key(v)) for k, v in value.items()),
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return (type(value), tuple(_content_key(v) for v in value))
+    return (type(value), IdentityKey(value))
+
 
 class PandasDataFrame(ControlFlowModel):
     """Schema for a pandas dataframe"""
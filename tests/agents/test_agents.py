@@ -4,8 +4,11 @@ from controlflow.agents import Agent
 from controlflow.agents.names import AGENTS
 from controlflow.flows import Flow
 from controlflow.instructions import instructions
+from controlflow.llm.rules import OpenAIRules
 from controlflow.orchestration.agent_context import AgentContext
 from controlflow.tasks.task import Task
+from controlflow.tools.tools import Tool
+from controlflow.utilities.testing import FakeLLM
 from langchain_openai import ChatOpenAI
 
 
@@ -95,3 +98,41 @@ class TestAgentPrompt:
         agent = Agent(prompt="{{ agent.name }}", name="abc")
         prompt = agent.get_prompt(context=agent_context)
         assert prompt == "abc"
+
+
+class TestGetModel:
+    @pytest.fixture
+    def bind_calls(self, monkeypatch) -> list:
+        calls = []
+
+        def bind_tools(self, tools, **kwargs):
+            calls.append(tools)
+            return self
+
+        monkeypatch.setattr(FakeLLM, "bind_tools", bind_tools)
+        return calls
+
+    def test_bound_model_is_reused_for_same_tools(self, bind_calls):
+        agent = Agent(model=FakeLLM(responses=[]))
+        tools = [Tool.from_function(lambda: 1, name="one")]
+
+        model = agent.get_model(tools=tools)
+        assert agent.get_model(tools=list(tools)) is model
+        assert len(bind_calls) == 1
+
+    def test_new_tools_are_bound(self, bind_calls):
+        agent = Agent(model=FakeLLM(responses=[]))
+        one = Tool.from_function(lambda: 1, name="one")
+        two = Tool.from_function(lambda: 2, name="two")
+
+        agent.get_model(tools=[one])
+        agent.get_model(tools=[one, two])
+        assert [[t["function"]["name"] for t in call] for call in bind_calls] == [
+            ["one"],
+            ["one", "two"],
+        ]
+
+    def test_llm_rules_are_cached(self):
+        agent = Agent(model=ChatOpenAI(model="gpt-3.5-turbo"))
+        assert isinstance(agent.get_llm_rules(), OpenAIRules)
+        assert agent.get_llm_rules() is agent.get_llm_rules()
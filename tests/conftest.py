@@ -1,6 +1,7 @@
 import pytest
 from controlflow.llm.messages import BaseMessage
 from controlflow.settings import temporary_settings
+from controlflow.utilities.prefect import prefect_exporter
 from prefect.testing.utilities import prefect_test_harness
 
 from .fixtures import *
@@ -25,3 +26,4 @@ def prefect_test_fixture():
     """
     with prefect_test_harness():
         yield
+        prefect_exporter.flush()
@@ -0,0 +1,303 @@
+import pytest
+from controlflow.events.events import UserMessage
+from controlflow.events.history import (
+    IN_MEMORY_STORE,
+    InMemoryHistory,
+    JSONLHistory,
+    SQLiteHistory,
+    filter_events,
+)
+
+
+@pytest.fixture
+def history(tmp_path) -> JSONLHistory:
+    return JSONLHistory(base_path=tmp_path)
+
+
+@pytest.fixture
+def sqlite_history(tmp_path) -> SQLiteHistory:
+    history = SQLiteHistory(path=tmp_path / "history.db")
+    yield history
+    history.close()
+
+
+def make_events(n: int, **kwargs) -> list[UserMessage]:
+    return [UserMessage(content=f"message {i}", **kwargs) for i in range(n)]
+
+
+class TestJSONLHistory:
+    def test_get_events_empty_thread(self, history: JSONLHistory):
+        assert history.get_events("missing") == []
+
+    def test_add_and_get_events(self, history: JSONLHistory):
+        events = make_events(3)
+        history.add_events("t1", events[:2])
+        history.add_events("t1", events[2:])
+
+        loaded = history.get_events("t1")
+        assert [e.id for e in loaded] == [e.id for e in events]
+        assert all(isinstance(e, UserMessage) for e in loaded)
+
+    def test_add_events_appends(self, history: JSONLHistory):
+        history.add_events("t1", make_events(2))
+        history.add_events("t1", make_events(3))
+        lines = history.path("t1").read_text().splitlines()
+        assert len(lines) == 5
+
+    def test_limit_returns_most_recent(self, history: JSONLHistory):
+        events = make_events(10)
+        history.add_events("t1", events)
+        loaded = history.get_events("t1", limit=3)
+        assert [e.id for e in loaded] == [e.id for e in events[-3:]]
+
+    def test_limit_spans_read_blocks(self, history: JSONLHistory, monkeypatch):
+        import controlflow.events.history
+
+        original = controlflow.events.history._read_lines_reversed
+        monkeypatch.setattr(
+            controlflow.events.history,
+            "_read_lines_reversed",
+            lambda path: original(path, block_size=16),
+        )
+        events = make_events(20)
+        history.add_events("t1", events)
+        loaded = history.get_events("t1")
+        assert [e.id for e in loaded] == [e.id for e in events]
+
+    def test_before_id_matches_in_memory_history(self, history: JSONLHistory):
+        events = make_events(6)
+        history.add_events("t1", events)
+        in_memory = InMemoryHistory(history={})
+        in_memory.add_events("t1", events)
+
+        loaded = history.get_events("t1", before_id=events[3].id, limit=2)
+        expected = in_memory.get_events("t1", before_id=events[3].id, limit=2)
+        assert [e.id for e in loaded] == [e.id for e in expected]
+
+    def test_filter_by_task_ids(self, history: JSONLHistory):
+        e1 = UserMessage(content="a", task_ids={"x"})
+        e2 = UserMessage(content="b", task_ids={"y"})
+        history.add_events("t1", [e1, e2])
+        assert [e.id for e in history.get_events("t1", task_ids=["y"])] == [e2.id]
+
+    def test_partial_tail_is_ignored(self, history: JSONLHistory):
+        events = make_events(2)
+        history.add_events("t1", events)
+        with open(history.path("t1"), "a") as f:
+            f.write('{"event": "user-message", "cont')
+
+        loaded = history.get_events("t1")
+        assert [e.id for e in loaded] == [e.id for e in events]
+
+    def test_partial_tail_is_repaired_before_append(self, tmp_path):
+        events = make_events(2)
+        JSONLHistory(base_path=tmp_path).add_events("t1", events[:1])
+        history = JSONLHistory(base_path=tmp_path)
+        with open(history.path("t1"), "a") as f:
+            f.write('{"event": "user-message", "cont')
+
+        history.add_events("t1", events[1:])
+        loaded = history.get_events("t1")
+        assert [e.id for e in loaded] == [e.id for e in events]
+
+    def test_fsync_batching(self, history: JSONLHistory, monkeypatch):
+        import os
+
+        calls = []
+        monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd))
+        history.fsync_batch_size = 3
+
+        history.add_events("t1", make_events(2))
+        assert len(calls) == 0
+        history.add_events("t1", make_events(2))
+        assert len(calls) == 1
+        history.add_events("t1", make_events(1))
+        assert len(calls) == 1
+        history.sync()
+        assert len(calls) == 2
+
+
+class TestFilterEvents:
+    def test_after_id_is_exclusive(self):
+        events = make_events(5)
+        filtered = filter_events(events, after_id=events[1].id)
+        assert [e.id for e in filtered] == [e.id for e in events[2:]]
+
+    def test_before_id_is_inclusive(self):
+        events = make_events(5)
+        filtered = filter_events(events, before_id=events[3].id)
+        assert [e.id for e in filtered] == [e.id for e in events[:4]]
+
+
+class TestSQLiteHistory:
+    @pytest.fixture
+    def events(self) -> list[UserMessage]:
+        return [
+            UserMessage(content="a", task_ids={"t1"}, agent_ids={"a1"}),
+            UserMessage(content="b", task_ids={"t2"}, agent_ids={"a1", "a2"}),
+            UserMessage(content="c"),
+            UserMessage(content="d", task_ids={"t3"}, agent_ids={"a2"}),
+            UserMessage(content="e", task_ids={"t1", "t3"}),
+            UserMessage(content="f", agent_ids={"a3"}),
+        ]
+
+    def test_get_events_empty_thread(self, sqlite_history: SQLiteHistory):
+        assert sqlite_history.get_events("missing") == []
+
+    def test_add_and_get_events(self, sqlite_history: SQLiteHistory, events):
+        sqlite_history.add_events("thread", events[:3])
+        sqlite_history.add_events("thread", events[3:])
+        loaded = sqlite_history.get_events("thread")
+        assert [e.id for e in loaded] == [e.id for e in events]
+        assert all(isinstance(e, UserMessage) for e in loaded)
+
+    def test_threads_are_isolated(self, sqlite_history: SQLiteHistory, events):
+        sqlite_history.add_events("thread-1", events)
+        sqlite_history.add_events("thread-2", events[:2])
+        assert len(sqlite_history.get_events("thread-2")) == 2
+
+    def test_duplicate_events_are_ignored(self, sqlite_history, events):
+        sqlite_history.add_events("thread", events)
+        sqlite_history.add_events("thread", events[:2])
+        assert len(sqlite_history.get_events("thread")) == len(events)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(),
+            dict(task_ids=["t1"]),
+            dict(task_ids=["t1", "t2"]),
+            dict(agent_ids=["a2"]),
+            dict(agent_ids=["a1"], task_ids=["t3"]),
+            dict(types=["user-message"]),
+            dict(types=["agent-message"]),
+            dict(limit=2),
+            dict(task_ids=["t3"], limit=2),
+            dict(before_id=3),
+            dict(after_id=1),
+            dict(before_id=4, after_id=0, agent_ids=["a1"]),
+            dict(before_id="missing"),
+            dict(after_id="missing"),
+        ],
+    )
+    def test_matches_in_memory_history(self, sqlite_history, events, kwargs):
+        for key in ["before_id", "after_id"]:
+            if isinstance(kwargs.get(key), int):
+                kwargs[key] = events[kwargs[key]].id
+
+        in_memory = InMemoryHistory(history={})
+        in_memory.add_events("thread", events)
+        sqlite_history.add_events("thread", events)
+
+        expected = in_memory.get_events("thread", **kwargs)
+        loaded = sqlite_history.get_events("thread", **kwargs)
+        assert [e.id for e in loaded] == [e.id for e in expected]
+
+    def test_persists_across_instances(self, tmp_path, events):
+        history = SQLiteHistory(path=tmp_path / "history.db")
+        history.add_events("thread", events)
+        history.close()
+
+        history = SQLiteHistory(path=tmp_path / "history.db")
+        assert len(history.get_events("thread")) == len(events)
+        history.close()
+
+
+class TestBoundedInMemoryHistory:
+    def test_unbounded_by_default(self):
+        history = InMemoryHistory(history={})
+        history.add_events("t1", make_events(1000))
+        assert len(history.get_events("t1")) == 1000
+
+    def test_max_events_per_thread(self):
+        history = InMemoryHistory(history={}, max_events_per_thread=3)
+        events = make_events(5)
+        history.add_events("t1", events[:2])
+        history.add_events("t1", events[2:])
+        assert [e.id for e in history.get_events("t1")] == [e.id for e in events[2:]]
+
+    def test_max_bytes_per_thread(self):
+        events = make_events(5)
+        size = len(events[0].model_dump_json().encode())
+        history = InMemoryHistory(history={}, max_bytes_per_thread=size * 2 + 1)
+        history.add_events("t1", events)
+        assert [e.id for e in history.get_events("t1")] == [e.id for e in events[3:]]
+
+    def test_max_bytes_keeps_most_recent_event(self):
+        history = InMemoryHistory(history={}, max_bytes_per_thread=1)
+        events = make_events(2)
+        history.add_events("t1", events)
+        assert [e.id for e in history.get_events("t1")] == [events[1].id]
+
+    def test_least_recently_used_threads_are_evicted(self):
+        history = InMemoryHistory(history={}, max_threads=2)
+        history.add_events("t1", make_events(1))
+        history.add_events("t2", make_events(1))
+        history.get_events("t1")
+        history.add_events("t3", make_events(1))
+        assert set(history.history) == {"t1", "t3"}
+        assert history.get_events("t2") == []
+
+    def test_evicted_threads_are_spilled(self, sqlite_history):
+        history = InMemoryHistory(
+            history={}, max_threads=1, spill_history=sqlite_history
+        )
+        events = make_events(4)
+        history.add_events("t1", events[:2])
+        history.add_events("t2", make_events(1))
+        assert set(history.history) == {"t2"}
+
+        # the evicted thread is loaded back in
+        history.add_events("t1", events[2:])
+        assert set(history.history) == {"t1"}
+        assert [e.id for e in history.get_events("t1")] == [e.id for e in events]
+
+        # events are only spilled once
+        history.add_events("t2", make_events(1))
+        assert len(sqlite_history.get_events("t1")) == 4
+        assert [e.id for e in history.get_events("t1")] == [e.id for e in events]
+
+    def test_spilled_threads_are_loaded_with_caps(self, history):
+        bounded = InMemoryHistory(
+            history={}, max_threads=1, max_events_per_thread=2, spill_history=history
+        )
+        events = make_events(4)
+        history.add_events("t1", events)
+        assert [e.id for e in bounded.get_events("t1")] == [e.id for e in events[2:]]
+
+    def test_missing_threads_are_not_added(self, sqlite_history):
+        history = InMemoryHistory(
+            history={}, max_threads=1, spill_history=sqlite_history
+        )
+        history.add_events("t1", make_events(1))
+        assert history.get_events("missing") == []
+        assert set(history.history) == {"t1"}
+
+    def test_dropped_events_are_spilled(self, sqlite_history):
+        history = InMemoryHistory(
+            history={},
+            max_threads=1,
+            max_events_per_thread=5,
+            spill_history=sqlite_history,
+        )
+        events = make_events(20)
+        history.add_events("t1", events[:10])
+        history.add_events("t2", make_events(1))
+
+        # the thread is loaded back in with its last 5 events, and adding
+        # more drops events that were never spilled
+        history.add_events("t1", events[10:])
+        assert [e.id for e in history.get_events("t1")] == [e.id for e in events[15:]]
+        history.add_events("t2", make_events(1))
+        assert [e.id for e in sqlite_history.get_events("t1")] == [e.id for e in events]
+
+    def test_bounded_histories_use_a_private_store(self):
+        IN_MEMORY_STORE["shared"] = make_events(1)
+        try:
+            history = InMemoryHistory(max_threads=1)
+            history.add_events("t1", make_events(1))
+            assert "shared" in IN_MEMORY_STORE
+            assert "t1" not in IN_MEMORY_STORE
+            assert InMemoryHistory().history is IN_MEMORY_STORE
+        finally:
+            IN_MEMORY_STORE.pop("shared")
@@ -0,0 +1,232 @@
+import pytest
+from controlflow.agents import Agent
+from controlflow.events.events import (
+    AgentMessage,
+    OrchestratorMessage,
+    ToolResultEvent,
+    UserMessage,
+)
+from controlflow.events.message_compiler import (
+    CompileContext,
+    CompiledMessageCache,
+    CompiledMessages,
+    MessageCompiler,
+    trim_messages,
+)
+from controlflow.llm.messages import AIMessage, HumanMessage, ToolMessage
+from controlflow.llm.rules import AnthropicRules, LLMRules
+from controlflow.llm.tokenizers import ApproximateTokenizer
+from controlflow.tools.tools import ToolResult
+
+
+class CountingTokenizer(ApproximateTokenizer):
+    """Counts one token per character, recording every batch it counts"""
+
+    chars_per_token: float = 1.0
+    batches: list[list[str]] = []
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        self.batches.append(texts)
+        return super().count_batch(texts)
+
+
+@pytest.fixture
+def tokenizer() -> CountingTokenizer:
+    return CountingTokenizer()
+
+
+@pytest.fixture
+def agent() -> Agent:
+    return Agent(name="Marvin")
+
+
+def agent_message(agent: Agent, content: str, tool_call_ids: list[str] = None):
+    tool_calls = [
+        dict(id=tool_call_id, name="tool", args={})
+        for tool_call_id in tool_call_ids or []
+    ]
+    return AgentMessage(
+        agent=agent, message=AIMessage(content=content, tool_calls=tool_calls)
+    )
+
+
+def tool_result(agent: Agent, tool_call_id: str):
+    return ToolResultEvent(
+        agent=agent,
+        tool_call=dict(id=tool_call_id, name="tool", args={}),
+        tool_result=ToolResult(tool_call_id=tool_call_id, result="ok", str_result="ok"),
+    )
+
+
+def compile_fresh(events, agent, rules):
+    context = CompileContext(agent=agent, llm_rules=rules)
+    return CompiledMessages(agent=agent, llm_rules=rules).update(events, context)
+
+
+def summarize(messages):
+    return [(type(m).__name__, m.content) for m in messages]
+
+
+class TestCompiledMessages:
+    @pytest.mark.parametrize("rules", [LLMRules(), AnthropicRules()])
+    def test_incremental_matches_full_compile(self, agent, rules):
+        events = [
+            UserMessage(content="hello"),
+            agent_message(agent, "thinking"),
+            agent_message(agent, "calling", tool_call_ids=["x"]),
+            tool_result(agent, "x"),
+            UserMessage(content="more"),
+            agent_message(agent, "done"),
+            agent_message(agent, "really done"),
+        ]
+        context = CompileContext(agent=agent, llm_rules=rules)
+        compiled = CompiledMessages(agent=agent, llm_rules=rules)
+        for i in range(1, len(events) + 1):
+            messages = compiled.update(events[:i], context)
+            assert summarize(messages) == summarize(
+                compile_fresh(events[:i], agent, rules)
+            )
+
+    def test_only_new_events_are_compiled(self, agent, monkeypatch):
+        calls = []
+        original = UserMessage.to_messages
+
+        def to_messages(self, context):
+            calls.append(self.id)
+            return original(self, context)
+
+        monkeypatch.setattr(UserMessage, "to_messages", to_messages)
+
+        events = [UserMessage(content=str(i)) for i in range(5)]
+        context = CompileContext(agent=agent, llm_rules=LLMRules())
+        compiled = CompiledMessages(agent=agent, llm_rules=LLMRules())
+
+        compiled.update(events[:3], context)
+        assert len(calls) == 3
+        messages = compiled.update(events, context)
+        assert calls == [e.id for e in events]
+        assert [m.content for m in messages] == [str(i) for i in range(5)]
+
+    def test_tool_result_for_compiled_message(self, agent):
+        events = [
+            agent_message(agent, "calling", tool_call_ids=["x"]),
+            UserMessage(content="interrupt"),
+            tool_result(agent, "x"),
+        ]
+        context = CompileContext(agent=agent, llm_rules=LLMRules())
+        compiled = CompiledMessages(agent=agent, llm_rules=LLMRules())
+        compiled.update(events[:2], context)
+        messages = compiled.update(events, context)
+        assert [type(m) for m in messages] == [AIMessage, ToolMessage, HumanMessage]
+
+    def test_changed_events_are_recompiled(self, agent):
+        events = [UserMessage(content=str(i)) for i in range(4)]
+        context = CompileContext(agent=agent, llm_rules=LLMRules())
+        compiled = CompiledMessages(agent=agent, llm_rules=LLMRules())
+        compiled.update(events, context)
+        messages = compiled.update([events[0], events[2]], context)
+        assert [m.content for m in messages] == ["0", "2"]
+
+
+class TestMessageCompilerRules:
+    def test_user_message_is_added_before_converted_system_message(self, agent):
+        compiler = MessageCompiler(
+            events=[OrchestratorMessage(content="hi")], llm_rules=AnthropicRules()
+        )
+        messages = compiler.compile_to_messages(agent)
+        assert summarize(messages) == [
+            ("HumanMessage", "SYSTEM: Begin."),
+            (
+                "HumanMessage",
+                "ORCHESTRATOR: The following message is from the orchestrator.",
+            ),
+            ("HumanMessage", "hi"),
+        ]
+
+    def test_consecutive_ai_messages_are_broken_up_after_trimming(self, agent):
+        compiler = MessageCompiler(
+            events=[agent_message(agent, "x"), agent_message(agent, "y")],
+            llm_rules=AnthropicRules(),
+        )
+        messages = compiler.compile_to_messages(agent)
+        assert summarize(messages) == [
+            ("HumanMessage", "SYSTEM: Begin."),
+            ("AIMessage", "x"),
+            ("HumanMessage", "ORCHESTRATOR: Continue."),
+            ("AIMessage", "y"),
+            ("HumanMessage", "SYSTEM: Continue."),
+        ]
+
+
+class TestCompiledMessageCache:
+    def test_reuses_entry_for_thread_and_agent(self, agent):
+        cache = CompiledMessageCache()
+        compiled = cache.get("thread", agent, LLMRules())
+        assert cache.get("thread", agent, LLMRules()) is compiled
+        assert cache.get("other-thread", agent, LLMRules()) is not compiled
+        assert cache.get("thread", Agent(), LLMRules()) is not compiled
+
+    def test_new_entry_when_rules_change(self, agent):
+        cache = CompiledMessageCache()
+        compiled = cache.get("thread", agent, LLMRules())
+        assert cache.get("thread", agent, AnthropicRules()) is not compiled
+
+    def test_new_entry_when_tokenizer_changes(self, agent):
+        cache = CompiledMessageCache()
+        compiled = cache.get("thread", agent, LLMRules())
+        assert cache.get("thread", agent, LLMRules(), tokenizer=None) is compiled
+        assert (
+            cache.get("thread", agent, LLMRules(), tokenizer=ApproximateTokenizer())
+            is not compiled
+        )
+
+    def test_evicts_least_recently_used(self, agent):
+        cache = CompiledMessageCache(max_size=2)
+        first = cache.get("t1", agent, LLMRules())
+        cache.get("t2", agent, LLMRules())
+        cache.get("t1", agent, LLMRules())
+        cache.get("t3", agent, LLMRules())
+        assert cache.get("t1", agent, LLMRules()) is first
+        assert len(cache._entries) == 2
+
+
+class TestTokenCounting:
+    def test_trim_messages_keeps_most_recent(self, tokenizer):
+        messages = [HumanMessage(content=str(i)) for i in range(5)]
+        size = len(messages[0].json())
+
+        def trim(max_tokens):
+            return trim_messages(messages, max_tokens=max_tokens, tokenizer=tokenizer)
+
+        assert trim(size * 2) == messages[-2:]
+        assert trim(size * 2 + 1) == messages[-2:]
+        assert trim(size - 1) == []
+        assert trim(None) == messages
+
+    def test_trim_matches_trim_messages(self, agent, tokenizer):
+        events = [UserMessage(content="x" * i) for i in range(10)]
+        context = CompileContext(agent=agent, llm_rules=LLMRules())
+        compiled = CompiledMessages(
+            agent=agent, llm_rules=LLMRules(), tokenizer=tokenizer
+        )
+        messages = compiled.update(events, context)
+        for max_tokens in [-1, 0, 50, 200, 500, 10_000]:
+            trimmed, token_count = compiled.trim(max_tokens)
+            assert trimmed == trim_messages(messages, max_tokens, tokenizer=tokenizer)
+            assert token_count == sum(len(m.json()) for m in trimmed)
+
+    def test_only_new_messages_are_counted(self, agent, tokenizer):
+        events = [UserMessage(content=str(i)) for i in range(6)]
+        context = CompileContext(agent=agent, llm_rules=LLMRules())
+        compiled = CompiledMessages(
+            agent=agent, llm_rules=LLMRules(), tokenizer=tokenizer
+        )
+
+        compiled.update(events[:4], context)
+        compiled.trim(10_000)
+        compiled.trim(10_000)
+        assert [len(batch) for batch in tokenizer.batches] == [4]
+
+        compiled.update(events, context)
+        compiled.trim(10_000)
+        assert [len(batch) for batch in tokenizer.batches] == [4, 2]
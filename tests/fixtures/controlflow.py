@@ -10,7 +10,8 @@ def restore_defaults(monkeypatch):
     Monkeypatch defaults to themselves, which will automatically reset them after every test
     """
     monkeypatch.setattr(controlflow.defaults, "agent", controlflow.defaults.agent)
-    monkeypatch.setattr(controlflow.defaults, "model", controlflow.defaults.model)
+    # patch the model that was set, so that the default model stays lazy
+    monkeypatch.setattr(controlflow.defaults, "_model", controlflow.defaults._model)
     monkeypatch.setattr(controlflow.defaults, "history", controlflow.defaults.history)
     yield
 
@@ -1,4 +1,5 @@
 # test_graph.py
+import pytest
 from controlflow.flows.graph import Edge, EdgeType, Graph
 from controlflow.tasks.task import Task
 
@@ -162,3 +163,94 @@ def test_downstream_tasks():
 
     # never include a start task in the downstream list
     assert graph.downstream_tasks([task1, task3]) == [task1, task2, task3]
+
+
+def test_topological_sort_detects_cycles():
+    task1 = Task(objective="Task 1")
+    task2 = Task(objective="Task 2")
+    graph = Graph(
+        edges=[
+            Edge(upstream=task1, downstream=task2, type=EdgeType.DEPENDENCY),
+            Edge(upstream=task2, downstream=task1, type=EdgeType.DEPENDENCY),
+        ]
+    )
+    with pytest.raises(ValueError, match="cycle"):
+        graph.topological_sort()
+
+
+def test_topological_sort_of_subset():
+    task1 = Task(objective="Task 1")
+    task2 = Task(objective="Task 2", depends_on=[task1])
+    task3 = Task(objective="Task 3", depends_on=[task2])
+    graph = Graph(tasks=[task1, task2, task3])
+    assert graph.topological_sort([task3, task1]) == [task1, task3]
+
+
+def test_topological_sort_cache_is_invalidated_by_new_tasks():
+    task1 = Task(objective="Task 1")
+    graph = Graph(tasks=[task1])
+    assert graph.topological_sort() == [task1]
+    assert graph.topological_sort() is graph.topological_sort()
+
+    task2 = Task(objective="Task 2", depends_on=[task1])
+    graph.add_task(task2)
+    assert graph.topological_sort() == [task1, task2]
+    assert graph.upstream_tasks([task2]) == [task1, task2]
+
+
+def test_long_chains():
+    tasks = [Task(objective="Task 0")]
+    for i in range(1, 2000):
+        tasks.append(Task(objective=f"Task {i}", depends_on=[tasks[-1]]))
+    # adding the last task first adds the whole chain through its dependencies
+    graph = Graph(tasks=list(reversed(tasks)))
+    assert graph.topological_sort() == tasks
+    assert graph.upstream_tasks([tasks[-1]]) == tasks
+    assert graph.downstream_tasks([tasks[0]]) == tasks
+
+
+def test_tasks_with_duplicate_ids():
+    task1 = Task(objective="Task 1")
+    task2 = Task(objective="Task 2", id=task1.id, depends_on=[task1])
+    graph = Graph(tasks=[task2])
+    assert graph.tasks == {task1, task2}
+    assert graph.topological_sort() == [task1, task2]
+
+
+def test_adjacency_is_maintained_incrementally():
+    task1 = Task(objective="Task 1")
+    task2 = Task(objective="Task 2", depends_on=[task1])
+    graph = Graph(tasks=[task1, task2])
+    upstream_edges = graph.upstream_edges()
+
+    task3 = Task(objective="Task 3", depends_on=[task2])
+    graph.add_task(task3)
+    assert graph.upstream_edges() is upstream_edges
+    assert [e.upstream for e in upstream_edges[task3]] == [task2]
+    assert [e.downstream for e in graph.downstream_edges()[task2]] == [task3]
+
+
+def test_traversal_caches_are_invalidated_selectively():
+    task1 = Task(objective="Task 1")
+    task2 = Task(objective="Task 2", depends_on=[task1])
+    graph = Graph(tasks=[task1, task2])
+    upstream = graph.upstream_tasks([task2])
+    downstream = graph.downstream_tasks([task1])
+
+    # unrelated tasks don't invalidate anything
+    graph.add_task(Task(objective="Unrelated"))
+    assert graph.upstream_tasks([task2]) is upstream
+    assert graph.downstream_tasks([task1]) is downstream
+
+    # a new downstream task only invalidates downstream traversals
+    task3 = Task(objective="Task 3", depends_on=[task2])
+    graph.add_task(task3)
+    assert graph.upstream_tasks([task2]) is upstream
+    assert graph.downstream_tasks([task1]) == [task1, task2, task3]
+
+    # a new upstream task only invalidates upstream traversals
+    downstream = graph.downstream_tasks([task1])
+    task0 = Task(objective="Task 0")
+    graph.add_edge(Edge(upstream=task0, downstream=task1, type=EdgeType.DEPENDENCY))
+    assert graph.downstream_tasks([task1]) is downstream
+    assert graph.upstream_tasks([task2]) == [task0, task1, task2]
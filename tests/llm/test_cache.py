@@ -0,0 +1,240 @@
+import pytest
+from controlflow.agents.agent import Agent
+from controlflow.events.events import AgentMessage, AgentMessageDelta
+from controlflow.flows import Flow
+from controlflow.llm.cache import (
+    CachedModelCall,
+    ResponseCache,
+    get_cache_key,
+    get_response_cache,
+    replay_deltas,
+)
+from controlflow.llm.messages import AIMessage, HumanMessage
+from controlflow.settings import temporary_settings
+from controlflow.tasks.task import Task
+from controlflow.tools.tools import tool
+from controlflow.utilities.testing import FakeLLM
+from langchain_openai import ChatOpenAI
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+@pytest.fixture
+def response_cache():
+    with temporary_settings(enable_llm_response_cache=True):
+        cache = get_response_cache()
+        yield cache
+        cache.clear()
+
+
+class TestCacheKey:
+    def test_same_request(self):
+        model = ChatOpenAI(model="gpt-4o")
+        assert get_cache_key(model, [HumanMessage("hi")], [add]) == get_cache_key(
+            ChatOpenAI(model="gpt-4o"), [HumanMessage("hi")], [add]
+        )
+
+    def test_key_depends_on_request(self):
+        key = get_cache_key(ChatOpenAI(model="gpt-4o"), [HumanMessage("hi")], [add])
+        assert key != get_cache_key(
+            ChatOpenAI(model="gpt-4o"), [HumanMessage("hello")], [add]
+        )
+        assert key != get_cache_key(ChatOpenAI(model="gpt-4o"), [HumanMessage("hi")])
+        assert key != get_cache_key(
+            ChatOpenAI(model="gpt-4o-mini"), [HumanMessage("hi")], [add]
+        )
+        assert key != get_cache_key(
+            ChatOpenAI(model="gpt-4o", temperature=0), [HumanMessage("hi")], [add]
+        )
+
+    def test_key_ignores_response_ids(self):
+        model = ChatOpenAI(model="gpt-4o")
+        assert get_cache_key(model, [AIMessage("hi", id="run-1")]) == get_cache_key(
+            model, [AIMessage("hi", id="run-2")]
+        )
+
+    def test_key_ignores_ids(self):
+        model = ChatOpenAI(model="gpt-4o")
+        key = get_cache_key(
+            model, [HumanMessage("tasks abcde and fghij")], ids=["abcde", "fghij"]
+        )
+        assert key == get_cache_key(
+            model, [HumanMessage("tasks 12345 and 67890")], ids=["67890", "12345"]
+        )
+        # the order the IDs appear in still matters
+        assert key != get_cache_key(
+            model, [HumanMessage("tasks 67890 and 67890")], ids=["67890"]
+        )
+        assert key != get_cache_key(model, [HumanMessage("tasks abcde and fghij")])
+
+
+class TestCachedModelCall:
+    def test_cached_responses_use_the_current_ids(self):
+        cache = ResponseCache()
+        model = ChatOpenAI(model="gpt-4o")
+        response = AIMessage(
+            "",
+            tool_calls=[dict(name="mark_task_abcde_successful", args={}, id="c1")],
+        )
+
+        call = CachedModelCall(cache, model, [HumanMessage("abcde")], ids=["abcde"])
+        assert call.get() is None
+        call.set(response)
+
+        call = CachedModelCall(cache, model, [HumanMessage("12345")], ids=["12345"])
+        cached_response = call.get()
+        assert cached_response.tool_calls[0]["name"] == "mark_task_12345_successful"
+
+
+class TestReplayDeltas:
+    def test_replay_message(self):
+        message = AIMessage(
+            "Adding",
+            id="run-1",
+            tool_calls=[
+                dict(name="add", args={"a": 1, "b": 2}, id="call_1"),
+                dict(name="add", args={"a": 3, "b": 4}, id="call_2"),
+            ],
+        )
+        deltas = replay_deltas(message)
+        assert len(deltas) == 3
+
+        response = sum(deltas[1:], deltas[0])
+        assert response.content == "Adding"
+        assert response.id == "run-1"
+        assert response.tool_calls == message.tool_calls
+
+    def test_replay_chunk(self):
+        chunk = replay_deltas(AIMessage("Hi", id="run-1"))[0]
+        [delta] = replay_deltas(chunk)
+        assert delta.content == "Hi"
+        assert delta.id == "run-1"
+
+
+class TestResponseCache:
+    def test_get_and_set(self):
+        cache = ResponseCache()
+        assert cache.get("key") is None
+        cache.set("key", AIMessage("Hi"))
+        assert cache.get("key") == AIMessage("Hi")
+
+    def test_memory_is_bounded(self):
+        cache = ResponseCache(max_size=2)
+        cache.set("a", AIMessage("a"))
+        cache.set("b", AIMessage("b"))
+        cache.get("a")
+        cache.set("c", AIMessage("c"))
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_responses_are_stored_on_disk(self, tmp_path):
+        cache = ResponseCache(max_size=1, path=tmp_path / "cache.db")
+        cache.set("a", AIMessage("a"))
+        cache.set("b", AIMessage("b"))
+        # evicted from memory but loaded from disk
+        assert cache.get("a") == AIMessage("a")
+        cache.close()
+
+        new_cache = ResponseCache(path=tmp_path / "cache.db")
+        assert new_cache.get("b") == AIMessage("b")
+        new_cache.clear()
+        assert new_cache.get("b") is None
+        new_cache.close()
+
+    def test_cache_is_disabled_by_default(self):
+        assert get_response_cache() is None
+
+
+class TestAgentResponseCache:
+    def test_cached_responses_are_reused(self, fake_llm, response_cache):
+        fake_llm.set_responses(["first", "second"])
+        agent = Agent(model=fake_llm)
+        messages = [HumanMessage("hi")]
+
+        events = list(agent._run_model(messages=messages, tools=[]))
+        cached_events = list(agent._run_model(messages=messages, tools=[]))
+
+        assert [type(e) for e in cached_events] == [type(e) for e in events]
+        assert [type(e) for e in cached_events] == [AgentMessageDelta, AgentMessage]
+        assert cached_events[-1].message["content"] == "first"
+        assert fake_llm.i == 1
+
+        # a new request calls the model
+        events = list(agent._run_model(messages=[HumanMessage("hello")], tools=[]))
+        assert events[-1].message["content"] == "second"
+
+    def test_cached_tool_calls_are_run(self, fake_llm, response_cache):
+        fake_llm.set_responses(
+            [
+                AIMessage(
+                    "", tool_calls=[dict(name="add", args={"a": 1, "b": 2}, id="c1")]
+                ),
+                "second",
+            ]
+        )
+        agent = Agent(model=fake_llm)
+        messages = [HumanMessage("add 1 and 2")]
+        list(agent._run_model(messages=messages, tools=[add]))
+        events = list(agent._run_model(messages=messages, tools=[add]))
+        assert events[-1].tool_result.result == 3
+        assert fake_llm.i == 1
+
+    async def test_cached_responses_are_reused_async(self, fake_llm, response_cache):
+        fake_llm.set_responses(["first", "second"])
+        agent = Agent(model=fake_llm)
+        messages = [HumanMessage("hi")]
+
+        for _ in range(2):
+            events = [
+                e
+                async for e in agent._run_model_async(
+                    messages=messages, tools=[], stream=False
+                )
+            ]
+            assert events[-1].message["content"] == "first"
+        assert fake_llm.i == 1
+
+    def test_responses_are_not_cached_when_disabled(self, fake_llm):
+        fake_llm.set_responses(["first", "second"])
+        agent = Agent(model=fake_llm)
+        messages = [HumanMessage("hi")]
+        list(agent._run_model(messages=messages, tools=[]))
+        events = list(agent._run_model(messages=messages, tools=[]))
+        assert events[-1].message["content"] == "second"
+
+
+class TestOrchestratorResponseCache:
+    def run_flow(self, fake_llm: FakeLLM) -> str:
+        # tasks and agents get new IDs for each run
+        with Flow():
+            task = Task("say hello", agents=[Agent(name="a", model=fake_llm)])
+            fake_llm.set_responses(
+                [
+                    AIMessage(
+                        "",
+                        tool_calls=[
+                            dict(
+                                name=f"mark_task_{task.id}_successful",
+                                args={"result": "hello"},
+                                id="c1",
+                            )
+                        ],
+                    ),
+                    "unused",
+                ]
+            )
+            return task.run()
+
+    def test_reruns_reuse_cached_responses(self, response_cache):
+        fake_llm = FakeLLM(responses=[])
+        assert self.run_flow(fake_llm) == "hello"
+        assert fake_llm.i == 1
+
+        fake_llm = FakeLLM(responses=[])
+        assert self.run_flow(fake_llm) == "hello"
+        assert fake_llm.i == 0
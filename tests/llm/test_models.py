@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from controlflow.llm.http import LoopLocalAsyncTransport
+from controlflow.llm.models import ModelRegistry, model_from_string, model_registry
+from controlflow.settings import temporary_settings
+from langchain_openai import AzureChatOpenAI, ChatOpenAI
+
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry()
+    yield registry
+    registry.clear()
+
+
+class TestModelFromString:
+    def test_openai(self):
+        model = model_from_string("openai/gpt-4o-mini")
+        assert isinstance(model, ChatOpenAI)
+        assert model.model_name == "gpt-4o-mini"
+
+    def test_unknown_provider(self):
+        with pytest.raises(ValueError, match="Could not load provider"):
+            model_from_string("not-a-provider/model")
+
+    def test_models_are_shared(self):
+        assert model_from_string("openai/gpt-4o-mini") is model_from_string(
+            "openai/gpt-4o-mini"
+        )
+        assert model_from_string("openai/gpt-4o-mini") is model_registry.get(
+            "openai", "gpt-4o-mini", temperature=0.7
+        )
+
+    def test_temperature_from_settings(self):
+        with temporary_settings(llm_temperature=0.3):
+            model = model_from_string("openai/gpt-4o-mini")
+        assert model.temperature == 0.3
+        assert model is not model_from_string("openai/gpt-4o-mini")
+
+
+class TestModelRegistry:
+    def test_models_are_keyed_by_arguments(self, registry):
+        model = registry.get("openai", "gpt-4o", temperature=0.1)
+        assert registry.get("openai", "gpt-4o", temperature=0.1) is model
+        assert registry.get("openai", "gpt-4o", temperature=0.2) is not model
+        assert registry.get("openai", "gpt-4o-mini", temperature=0.1) is not model
+
+    def test_dict_arguments(self, registry):
+        model = registry.get("openai", "gpt-4o", model_kwargs={"top_p": 0.5})
+        assert model.model_kwargs == {"top_p": 0.5}
+        assert registry.get("openai", "gpt-4o", model_kwargs={"top_p": 0.5}) is model
+
+    def test_unhashable_arguments_are_not_shared(self, registry):
+        class Unhashable:
+            __hash__ = None
+
+        model_1 = registry.get("openai", "gpt-4o", metadata={"x": Unhashable()})
+        model_2 = registry.get("openai", "gpt-4o", metadata={"x": Unhashable()})
+        assert model_1 is not model_2
+
+    def test_openai_models_share_connection_pools(self, registry):
+        gpt_4o = registry.get("openai", "gpt-4o")
+        gpt_4o_mini = registry.get("openai", "gpt-4o-mini")
+        azure = registry.get(
+            "azure-openai",
+            "gpt-4o",
+            azure_endpoint="https://example.openai.azure.com",
+            api_version="2024-02-01",
+        )
+        assert isinstance(azure, AzureChatOpenAI)
+        assert gpt_4o.http_client is gpt_4o_mini.http_client is azure.http_client
+        assert gpt_4o.http_async_client is gpt_4o_mini.http_async_client
+        assert gpt_4o.http_client is not gpt_4o.http_async_client
+
+    def test_http_clients_use_openai_defaults(self, registry):
+        model = registry.get("openai", "gpt-4o")
+        assert model.http_client.follow_redirects
+        assert model.http_async_client.follow_redirects
+        assert model.http_client.timeout.read == 600
+
+    def test_connection_pool_settings(self, registry):
+        with temporary_settings(
+            llm_connection_pool_size=7, llm_connection_idle_timeout=3
+        ):
+            model = registry.get("openai", "gpt-4o")
+
+        pool = model.http_client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._keepalive_expiry == 3
+        limits = model.http_async_client._transport.transport_kwargs["limits"]
+        assert limits.max_connections == 7
+
+        # new settings use a new pool
+        assert registry.get("openai", "gpt-4o-mini").http_client is not (
+            model.http_client
+        )
+
+    def test_clear(self, registry):
+        model = registry.get("openai", "gpt-4o")
+        registry.clear()
+        assert registry.get("openai", "gpt-4o") is not model
+
+
+class TestLoopLocalAsyncTransport:
+    def test_each_loop_gets_a_pool(self):
+        transport = LoopLocalAsyncTransport()
+
+        async def get_transports():
+            return transport.get_transport(), transport.get_transport()
+
+        first, same = asyncio.run(get_transports())
+        assert first is same
+        second, _ = asyncio.run(get_transports())
+        assert second is not first
+
+    def test_closed_loops_are_discarded(self):
+        transport = LoopLocalAsyncTransport()
+
+        async def get_transport():
+            return transport.get_transport()
+
+        for _ in range(3):
+            asyncio.run(get_transport())
+        assert len(transport._transports) == 1
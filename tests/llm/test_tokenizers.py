@@ -0,0 +1,76 @@
+import pytest
+from controlflow.llm.tokenizers import (
+    DEFAULT_TOKENIZER,
+    ApproximateTokenizer,
+    TiktokenTokenizer,
+    Tokenizer,
+    register_tokenizer,
+    tokenizer_for_model,
+)
+from controlflow.utilities.testing import FakeLLM
+from langchain_anthropic import ChatAnthropic
+from langchain_openai import ChatOpenAI
+
+
+class TestTokenizer:
+    def test_tokenizers_must_implement_count(self):
+        class IncompleteTokenizer(Tokenizer):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteTokenizer()
+
+
+class TestApproximateTokenizer:
+    def test_count(self):
+        tokenizer = ApproximateTokenizer(chars_per_token=4)
+        assert tokenizer.count("") == 0
+        assert tokenizer.count("abcd") == 1
+        assert tokenizer.count("abcde") == 2
+
+    def test_count_batch(self):
+        tokenizer = ApproximateTokenizer(chars_per_token=2)
+        assert tokenizer.count_batch(["ab", "abc", ""]) == [1, 2, 0]
+
+
+class TestTokenizerForModel:
+    def test_openai(self):
+        tokenizer = tokenizer_for_model(ChatOpenAI(model="gpt-4o", api_key="x"))
+        assert tokenizer == TiktokenTokenizer(encoding_name="o200k_base")
+
+    def test_openai_unknown_model(self):
+        tokenizer = tokenizer_for_model(ChatOpenAI(model="my-model", api_key="x"))
+        assert tokenizer == TiktokenTokenizer(encoding_name="cl100k_base")
+
+    def test_anthropic(self):
+        model = ChatAnthropic(model="claude-3-haiku-20240307", api_key="x")
+        tokenizer = tokenizer_for_model(model)
+        assert isinstance(tokenizer, ApproximateTokenizer)
+        assert tokenizer.chars_per_token < 4
+
+    def test_unknown_model_uses_default(self):
+        assert tokenizer_for_model(FakeLLM(responses=[])) == DEFAULT_TOKENIZER
+
+    def test_register_tokenizer(self, monkeypatch):
+        monkeypatch.setattr(
+            "controlflow.llm.tokenizers.TOKENIZERS",
+            {},
+        )
+        tokenizer = ApproximateTokenizer(chars_per_token=1)
+        register_tokenizer(FakeLLM, tokenizer)
+        assert tokenizer_for_model(FakeLLM(responses=[])) is tokenizer
+
+
+class TestTiktokenTokenizer:
+    def test_falls_back_when_encoding_unavailable(self, monkeypatch):
+        monkeypatch.setattr(
+            "controlflow.llm.tokenizers._get_encoding", lambda encoding_name: None
+        )
+        tokenizer = TiktokenTokenizer()
+        assert tokenizer.count("abcdefgh") == 2
+        assert tokenizer.count_batch(["abcd", "abcde"]) == [1, 2]
+
+    @pytest.mark.parametrize("texts", [[], ["hello world", "", "a" * 100]])
+    def test_count_batch_matches_count(self, texts):
+        tokenizer = TiktokenTokenizer()
+        assert tokenizer.count_batch(texts) == [tokenizer.count(t) for t in texts]
@@ -1,3 +1,4 @@
+import controlflow.orchestration.prompt_templates
 import pytest
 from controlflow.agents import Agent
 from controlflow.events.base import Event
@@ -142,3 +143,126 @@ class TestAgentContextGetEvents:
 
         context = AgentContext(flow=flow, agents=[a1], tasks=[t2, t4])
         assert len(context.get_events()) == 3
+
+
+class TestCompilePromptCache:
+    @pytest.fixture
+    def no_rendering(self, monkeypatch):
+        """Fail if a prompt template is rendered"""
+
+        def patch():
+            monkeypatch.setattr(
+                controlflow.orchestration.prompt_templates,
+                "get_template",
+                lambda path: pytest.fail(f"{path} was rendered"),
+            )
+
+        return patch
+
+    def test_unchanged_prompt_is_not_rendered(self, no_rendering):
+        agent = Agent()
+        flow = Flow()
+        upstream = SimpleTask(objective="upstream")
+        task = SimpleTask(depends_on=[upstream])
+        flow.add_task(task)
+        context = AgentContext(flow=flow, tasks=[task], agents=[agent])
+
+        prompt = context.compile_prompt(agent=agent)
+        no_rendering()
+        assert context.compile_prompt(agent=agent) == prompt
+        # a new context for the next turn
+        context = AgentContext(flow=flow, tasks=[task], agents=[agent])
+        assert context.compile_prompt(agent=agent) == prompt
+
+    def test_changes_are_rendered(self):
+        agent = Agent()
+        flow = Flow()
+        upstream = Task(objective="upstream")
+        task = SimpleTask(depends_on=[upstream])
+        flow.add_task(task)
+        context = AgentContext(flow=flow, tasks=[task], agents=[agent])
+        context.compile_prompt(agent=agent)
+
+        upstream.mark_successful(result="upstream result")
+        assert "upstream result" in context.compile_prompt(agent=agent)
+
+        agent.instructions = "new instructions"
+        assert "new instructions" in context.compile_prompt(agent=agent)
+
+        task.objective = "new objective"
+        assert "new objective" in context.compile_prompt(agent=agent)
+
+        flow.add_task(SimpleTask(objective="downstream", depends_on=[task]))
+        assert "downstream" in context.compile_prompt(agent=agent)
+
+    def test_new_dependencies_are_rendered(self):
+        agent = Agent()
+        task = SimpleTask()
+        context = AgentContext(flow=Flow(), tasks=[task], agents=[agent])
+        context.compile_prompt(agent=agent)
+
+        task.add_dependency(SimpleTask(objective="new dependency"))
+        assert "new dependency" in context.compile_prompt(agent=agent)
+
+    def test_in_place_changes_are_rendered(self):
+        agent = Agent()
+        flow = Flow(context={})
+        task = SimpleTask(agent=agent, context={})
+        context = AgentContext(flow=flow, tasks=[task], agents=[agent])
+        context.compile_prompt(agent=agent)
+
+        flow.context["flow_key"] = "flow value"
+        assert "flow value" in context.compile_prompt(agent=agent)
+
+        task.context["task_key"] = "task value"
+        assert "task value" in context.compile_prompt(agent=agent)
+
+        def special_tool():
+            pass
+
+        agent.tools.append(special_tool)
+        assert "special_tool" in context.compile_prompt(agent=agent)
+
+    def test_custom_prompts_are_not_cached(self):
+        agent = Agent(prompt="Tasks: {{ context.tasks | length }}")
+        context = AgentContext(flow=Flow(), tasks=[SimpleTask()], agents=[agent])
+        assert "Tasks: 1" in context.compile_prompt(agent=agent)
+        context.tasks = context.tasks + [SimpleTask()]
+        assert "Tasks: 2" in context.compile_prompt(agent=agent)
+
+    def test_templates_without_cache_dependencies_are_not_cached(self):
+        class UncachedAgentTemplate(
+            controlflow.orchestration.prompt_templates.Template
+        ):
+            template_path: str = "agent.md.jinja"
+            agent: Agent
+            context: AgentContext
+
+            cache_owner_field = "agent"
+
+        agent = Agent()
+        context = AgentContext(flow=Flow(), tasks=[SimpleTask()], agents=[agent])
+        template = UncachedAgentTemplate(agent=agent, context=context)
+        assert agent.name in template.render()
+        assert agent._prompt_cache is None
+
+    def test_other_context_objects_are_compared_by_identity(self, no_rendering):
+        class Opaque:
+            def __init__(self):
+                self.reprs = 0
+
+            def __repr__(self):
+                self.reprs += 1
+                return "<opaque>"
+
+        agent = Agent()
+        value = Opaque()
+        task = SimpleTask(agent=agent, context=dict(value=value))
+        context = AgentContext(flow=Flow(), tasks=[task], agents=[agent])
+        prompt = context.compile_prompt(agent=agent)
+        reprs = value.reprs
+
+        # checking the cache doesn't serialize the object
+        no_rendering()
+        assert context.compile_prompt(agent=agent) == prompt
+        assert value.reprs == reprs
@@ -1,6 +1,15 @@
+import asyncio
+from typing import Any
+
+import pytest
+from controlflow.agents import Agent
 from controlflow.flows import Flow
+from controlflow.llm.messages import AIMessage
 from controlflow.orchestration.orchestrator import Orchestrator
+from controlflow.settings import temporary_settings
 from controlflow.tasks import Task
+from controlflow.tasks.task import TaskStatus
+from controlflow.utilities.testing import FakeLLM
 
 
 class TestReadyTasks:
@@ -32,6 +41,76 @@ class TestReadyTasks:
         assert Orchestrator(flow=flow, tasks=[]).get_ready_tasks() == [child_1]
         assert Orchestrator(flow=flow, tasks=[child_1]).get_ready_tasks() == [child_1]
 
+    def test_ready_tasks_update_when_tasks_complete(self):
+        with Flow() as flow:
+            t1 = Task("t1")
+            t2 = Task("t2", depends_on=[t1])
+            t3 = Task("t3", depends_on=[t1, t2])
+
+        o = Orchestrator(flow=flow)
+        assert o.get_ready_tasks() == [t1]
+        t1.mark_successful(result="1")
+        assert o.get_ready_tasks() == [t2]
+        t2.mark_failed()
+        assert o.get_ready_tasks() == [t3]
+        t3.mark_skipped()
+        assert o.get_ready_tasks() == []
+
+    def test_ready_tasks_update_when_tasks_are_added(self):
+        with Flow() as flow:
+            t1 = Task("t1")
+            o = Orchestrator(flow=flow)
+            assert o.get_ready_tasks() == [t1]
+
+            with t1:
+                child = Task("child")
+        assert o.get_ready_tasks() == [child]
+
+    def test_ready_tasks_update_when_tasks_are_reopened(self):
+        with Flow() as flow:
+            t1 = Task("t1")
+            t2 = Task("t2", depends_on=[t1])
+
+        o = Orchestrator(flow=flow)
+        t1.mark_successful(result="1")
+        assert o.get_ready_tasks() == [t2]
+        t1.set_status(TaskStatus.RUNNING)
+        assert o.get_ready_tasks() == [t1]
+
+    def test_ready_tasks_update_when_dependencies_are_added(self):
+        with Flow() as flow:
+            t1 = Task("t1")
+            t2 = Task("t2")
+
+        o = Orchestrator(flow=flow)
+        assert o.get_ready_tasks() == [t1, t2]
+        t2.add_dependency(t1)
+        assert o.get_ready_tasks() == [t1]
+        t1.mark_successful(result="1")
+        assert o.get_ready_tasks() == [t2]
+
+    def test_ready_tasks_update_when_dependencies_are_replaced(self):
+        with Flow() as flow:
+            t1 = Task("t1")
+            t2 = Task("t2", depends_on=[t1])
+
+        o = Orchestrator(flow=flow)
+        assert o.get_ready_tasks() == [t1]
+        t2.depends_on = set()
+        assert o.get_ready_tasks() == [t1, t2]
+
+    def test_ready_tasks_are_not_rescanned(self, monkeypatch):
+        with Flow() as flow:
+            t1 = Task("t1")
+            t2 = Task("t2", depends_on=[t1])
+
+        o = Orchestrator(flow=flow)
+        assert o.get_ready_tasks() == [t1]
+        monkeypatch.setattr(flow.graph, "upstream_tasks", lambda *a, **k: pytest.fail())
+        monkeypatch.setattr(Task, "is_ready", lambda self: pytest.fail())
+        t1.mark_successful(result="1")
+        assert o.get_ready_tasks() == [t2]
+
 
 class TestMaxIteration:
     def test_max_iteration(self, default_fake_llm, caplog):
@@ -48,3 +127,104 @@ class TestMaxIteration:
         o.run(steps=1)
         assert "exceeded max iterations" in caplog.text
         assert t1.is_failed()
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+
+class SlowFakeLLM(FakeLLM):
+    """Responds after a short async sleep, tracking how many calls overlap"""
+
+    tracker: Any
+
+    async def _agenerate(self, *args, **kwargs):
+        self.tracker.running += 1
+        self.tracker.peak = max(self.tracker.peak, self.tracker.running)
+        try:
+            await asyncio.sleep(0.05)
+            return self._generate(*args, **kwargs)
+        finally:
+            self.tracker.running -= 1
+
+
+def complete_task_response(task: Task) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": f"mark_task_{task.id}_successful",
+                "args": {"result": "done"},
+                "id": f"call_{task.id}",
+            }
+        ],
+    )
+
+
+class TestRunAsync:
+    def make_tasks(
+        self, n: int, tracker: ConcurrencyTracker, chain: bool = False
+    ) -> list[Task]:
+        tasks = []
+        for i in range(n):
+            depends_on = tasks[-1:] if chain else []
+            task = Task(f"task {i}", id=f"task{i}", depends_on=depends_on)
+            task.agent = Agent(
+                name=f"agent {i}",
+                model=SlowFakeLLM(
+                    responses=[complete_task_response(task)], tracker=tracker
+                ),
+            )
+            tasks.append(task)
+        return tasks
+
+    async def test_independent_agents_run_concurrently(self):
+        tracker = ConcurrencyTracker()
+        with Flow() as flow:
+            tasks = self.make_tasks(5, tracker)
+
+        await Orchestrator(flow=flow, tasks=tasks).run_async()
+
+        assert all(t.is_successful() for t in tasks)
+        assert [t.result for t in tasks] == ["done"] * 5
+        assert tracker.peak == 5
+
+    def test_concurrency_is_bounded(self):
+        tracker = ConcurrencyTracker()
+        with Flow() as flow:
+            tasks = self.make_tasks(5, tracker)
+
+        with temporary_settings(max_concurrent_agents=2):
+            asyncio.run(Orchestrator(flow=flow, tasks=tasks).run_async())
+
+        assert all(t.is_successful() for t in tasks)
+        assert tracker.peak == 2
+
+    async def test_dependent_tasks_run_in_order(self):
+        tracker = ConcurrencyTracker()
+        with Flow() as flow:
+            first, second = self.make_tasks(2, tracker, chain=True)
+
+        await Orchestrator(flow=flow, tasks=[second]).run_async()
+
+        assert first.is_successful() and second.is_successful()
+        assert tracker.peak == 1
+
+    def test_agents_with_connected_tasks_are_not_concurrent(self):
+        a1, a2 = Agent(name="a1"), Agent(name="a2")
+        with Flow() as flow:
+            with Task("parent", agent=a1) as parent:
+                child = Task("child", agent=a2)
+            other = Task("other", agent=a2)
+
+        o = Orchestrator(flow=flow)
+        assert o.get_concurrent_agents([child, other, parent]) == [a2]
+        assert o.get_concurrent_agents([parent, child]) == [a1]
+        assert o.get_concurrent_agents([parent, other]) == [a1, a2]
+
+    async def test_task_run_async(self, default_fake_llm):
+        task = Task("say hello", id="12345")
+        default_fake_llm.set_responses([complete_task_response(task)])
+        assert await task.run_async() == "done"
@@ -1,4 +1,8 @@
+import json
+from typing import Annotated
+
 import controlflow
+import controlflow.utilities.type_adapters
 import pytest
 from controlflow.agents import Agent
 from controlflow.flows import Flow
@@ -11,7 +15,8 @@ from controlflow.tasks.task import (
     TaskStatus,
 )
 from controlflow.utilities.context import ctx
-from controlflow.utilities.testing import SimpleTask
+from controlflow.utilities.testing import SimpleTask, tasks_are_structurally_equal
+from pydantic import BaseModel
 
 
 def test_status_coverage():
@@ -284,3 +289,126 @@ class TestTaskPrompt:
         task = SimpleTask(prompt="{{ task.objective }}", objective="abc")
         prompt = task.get_prompt(context=agent_context)
         assert prompt == "abc"
+
+
+class TestSerializeForPrompt:
+    def test_serialize_for_prompt(self):
+        task = Task(objective="abc", result_type=int)
+        data = json.loads(task.serialize_for_prompt())
+        assert data["objective"] == "abc"
+        assert data["result_type"] == {
+            "type": "<class 'int'>",
+            "schema": {"type": "integer"},
+        }
+
+    def test_serialization_is_cached(self, monkeypatch):
+        task = SimpleTask()
+        serialized = task.serialize_for_prompt()
+        monkeypatch.setattr(Task, "model_dump_json", lambda self: pytest.fail())
+        assert task.serialize_for_prompt() is serialized
+
+    def test_cache_is_invalidated_by_assignment(self):
+        task = SimpleTask()
+        task.serialize_for_prompt()
+        task.objective = "new objective"
+        assert "new objective" in task.serialize_for_prompt()
+        task.mark_successful()
+        assert "SUCCESSFUL" in task.serialize_for_prompt()
+
+    def test_cache_is_invalidated_by_agent_changes(self):
+        agent = Agent(name="Arthur")
+        task = SimpleTask(agent=agent)
+        task.serialize_for_prompt()
+        agent.name = "Ford"
+        assert "Ford" in task.serialize_for_prompt()
+
+    def test_cache_is_invalidated_by_in_place_changes(self):
+        agent = Agent()
+        task = SimpleTask(agent=agent, context={})
+        task.serialize_for_prompt()
+        task.context["key"] = "context value"
+        assert "context value" in task.serialize_for_prompt()
+
+        def task_tool():
+            pass
+
+        task.tools.append(task_tool)
+        assert "task_tool" in task.serialize_for_prompt()
+
+        def agent_tool():
+            pass
+
+        agent.tools.append(agent_tool)
+        assert "agent_tool" in task.serialize_for_prompt()
+
+    def test_result_type_schemas_are_cached(self, monkeypatch):
+        class Result(BaseModel):
+            x: int
+
+        Task(objective="a", result_type=list[Result]).serialize_for_prompt()
+        monkeypatch.setattr(
+            controlflow.utilities.type_adapters, "TypeAdapter", lambda t: 1 / 0
+        )
+        data = json.loads(
+            Task(objective="b", result_type=list[Result]).serialize_for_prompt()
+        )
+        assert data["result_type"]["schema"]["type"] == "array"
+
+    def test_unhashable_result_types(self):
+        result_type = list[Annotated[int, {"unhashable": True}]]
+        data = json.loads(
+            Task(objective="a", result_type=result_type).serialize_for_prompt()
+        )
+        assert data["result_type"]["schema"]["items"] == {"type": "integer"}
+
+
+class TestTaskEquality:
+    def test_tasks_are_only_equal_to_themselves(self):
+        task = SimpleTask()
+        assert task == task
+        assert task != task.model_copy()
+        assert task != SimpleTask()
+
+    def test_tasks_with_the_same_id_are_distinct(self):
+        task = SimpleTask()
+        other = SimpleTask(id=task.id)
+        assert task != other
+        assert len({task, other}) == 2
+
+    def test_tasks_are_not_equal_to_other_types(self):
+        task = SimpleTask()
+        assert task != task.id
+        assert task != Agent(id=task.id)
+
+    def test_structural_equality(self):
+        a, b = SimpleTask(), SimpleTask()
+        task = SimpleTask(depends_on=[a, b])
+        assert tasks_are_structurally_equal(
+            task, task.model_copy(update=dict(depends_on={b, a}))
+        )
+        assert not tasks_are_structurally_equal(
+            task, task.model_copy(update=dict(depends_on={a}))
+        )
+        assert not tasks_are_structurally_equal(
+            task, task.model_copy(update=dict(objective="something else"))
+        )
+
+    def test_structural_equality_compares_parents_by_id(self):
+        parent = SimpleTask()
+        task = SimpleTask().model_copy(update=dict(parent=parent))
+        assert tasks_are_structurally_equal(
+            task, task.model_copy(update=dict(parent=SimpleTask(id=parent.id)))
+        )
+        assert not tasks_are_structurally_equal(
+            task, task.model_copy(update=dict(parent=SimpleTask()))
+        )
+        assert not tasks_are_structurally_equal(
+            task, task.model_copy(update=dict(parent=None))
+        )
+
+    def test_equality_does_not_compare_dependencies(self, monkeypatch):
+        upstream = SimpleTask()
+        task = SimpleTask(depends_on=[upstream])
+        monkeypatch.setattr(Task, "__iter__", lambda self: 1 / 0)
+        assert task != task.model_copy()
+        assert task in [upstream, task]
@@ -0,0 +1,116 @@
+import subprocess
+import sys
+import textwrap
+
+
+def get_imported_modules(code: str) -> set[str]:
+    """
+    Run code in a new interpreter with `-X importtime` and return the names of
+    the modules it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", textwrap.dedent(code)],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_import_does_not_load_prefect():
+    modules = get_imported_modules("import controlflow")
+    assert "controlflow" in modules
+    assert "prefect" not in modules
+
+
+def test_import_does_not_load_optional_providers():
+    modules = get_imported_modules("import controlflow")
+    assert "langchain_anthropic" not in modules
+    assert "langchain_google_genai" not in modules
+    assert "langchain_groq" not in modules
+
+
+def test_import_does_not_create_the_default_model():
+    modules = get_imported_modules("import controlflow")
+    assert "langchain_openai" not in modules
+
+
+def test_untracked_runs_do_not_load_prefect():
+    modules = get_imported_modules(
+        """
+        import controlflow
+
+        controlflow.settings.enable_prefect_tracking = False
+
+        @controlflow.tool
+        def add(a: int, b: int) -> int:
+            return a + b
+
+        assert add.run(input=dict(a=1, b=2)) == 3
+        """
+    )
+    assert "prefect" not in modules
+
+
+def test_untracked_flows_do_not_load_prefect():
+    modules = get_imported_modules(
+        """
+        import controlflow
+
+        controlflow.settings.enable_prefect_tracking = False
+
+        @controlflow.flow
+        def add(a: int, b: int) -> int:
+            return a + b
+
+        assert add(1, 2) == 3
+        """
+    )
+    assert "prefect" not in modules
+
+
+def test_tracked_runs_load_prefect_and_apply_settings():
+    modules = get_imported_modules(
+        """
+        import controlflow
+        import controlflow.utilities.prefect
+
+        controlflow.settings.prefect_log_level = "ERROR"
+        controlflow.utilities.prefect.load_prefect()
+
+        import prefect.settings
+
+        assert prefect.settings.PREFECT_LOGGING_LEVEL.value() == "ERROR"
+        """
+    )
+    assert "prefect" in modules
+
+
+def test_concurrent_tracked_runs_load_prefect_once():
+    get_imported_modules(
+        """
+        import time
+
+        import controlflow
+        from controlflow.tools.tools import handle_tool_calls
+
+        controlflow.settings.prefect_log_level = "ERROR"
+        controlflow.settings.tools_raise_on_error = True
+
+        @controlflow.tool
+        def add(a: int, b: int) -> int:
+            time.sleep(0.01)
+            return a + b
+
+        tool_calls = [
+            {"name": "add", "args": {"a": i, "b": 1}, "id": f"call_{i}"}
+            for i in range(4)
+        ]
+        results = handle_tool_calls(tool_calls, tools=[add])
+        assert [r.result for r in results] == [1, 2, 3, 4]
+        """
+    )
@@ -34,19 +34,28 @@ def test_prefect_settings_apply_at_runtime(caplog):
     assert "test-log-3" in caplog.text
 
 
-def test_import_without_default_api_key_warns_but_does_not_fail(monkeypatch, caplog):
+def test_default_model_is_created_from_settings_when_first_used():
+    with temporary_settings(llm_model="openai/gpt-4o-mini"):
+        model = controlflow.defaults.model
+        assert model.model_name == "gpt-4o-mini"
+        assert controlflow.defaults.model is model
+        assert controlflow.Agent().get_model() is model
+
+    # changing the setting changes the default model
+    with temporary_settings(llm_model="openai/gpt-3.5-turbo"):
+        assert controlflow.defaults.model.model_name == "gpt-3.5-turbo"
+
+    with temporary_settings(llm_model="openai/gpt-4o-mini"):
+        assert controlflow.defaults.model is model
+
+
+def test_missing_default_api_key_warns_but_does_not_fail(monkeypatch, caplog):
     # remove the OPENAI_API_KEY environment variable
     monkeypatch.delenv("OPENAI_API_KEY", raising=False)
 
-    # Clear any previous logs
-    caplog.clear()
-
-    # Import the library
-    with caplog.at_level("WARNING"):
-        # Reload the library to apply changes
-        defaults_module = importlib.import_module("controlflow.defaults")
-        importlib.reload(controlflow)
-        importlib.reload(defaults_module)
+    with temporary_settings(llm_model="openai/test-missing-key-warns"):
+        with caplog.at_level("WARNING"):
+            assert controlflow.defaults.model is None
 
     # Check if the warning was logged
     assert any(
@@ -56,22 +65,18 @@ def test_import_without_default_api_key_warns_but_does_not_fail(monkeypatch, cap
     ), "The expected warning was not logged"
 
 
-def test_import_without_default_api_key_errors_when_loading_model(monkeypatch):
+def test_missing_default_api_key_errors_when_loading_model(monkeypatch):
     # remove the OPENAI_API_KEY environment variable
     monkeypatch.delenv("OPENAI_API_KEY", raising=False)
 
-    # Reload the library to apply changes
-    defaults_module = importlib.import_module("controlflow.defaults")
-    importlib.reload(controlflow)
-    importlib.reload(defaults_module)
-
-    with pytest.raises(ValueError, match="Did not find openai_api_key"):
-        controlflow.llm.models.get_default_model()
+    with temporary_settings(llm_model="openai/test-missing-key-errors"):
+        with pytest.raises(ValueError, match="Did not find openai_api_key"):
+            controlflow.llm.models.get_default_model()
 
-    with pytest.raises(
-        ValueError, match="No model provided and no default model could be loaded"
-    ):
-        controlflow.Agent().get_model()
+        with pytest.raises(
+            ValueError, match="No model provided and no default model could be loaded"
+        ):
+            controlflow.Agent().get_model()
 
 
 def test_import_without_api_key_for_non_default_model_warns_but_does_not_fail(
@@ -80,6 +85,10 @@ def test_import_without_api_key_for_non_default_model_warns_but_does_not_fail(
     # remove the OPENAI_API_KEY environment variable
     monkeypatch.delenv("OPENAI_API_KEY", raising=False)
     monkeypatch.setenv("CONTROLFLOW_LLM_MODEL", "anthropic/not-a-model")
+    # loaded models are shared, so use a new registry that has to load them
+    monkeypatch.setattr(
+        controlflow.llm.models, "model_registry", controlflow.llm.models.ModelRegistry()
+    )
 
     # Clear any previous logs
     caplog.clear()
@@ -91,6 +100,22 @@ def test_import_without_api_key_for_non_default_model_warns_but_does_not_fail(
         importlib.reload(controlflow)
         importlib.reload(defaults_module)
 
+        # the default model is created when it's first used
+        defaults_module.defaults.model
+
+    # Check if the warning was logged
+    assert any(
+        record.levelname == "WARNING"
+        and "The default LLM model could not be created" in record.message
+        for record in caplog.records
+    ), "The expected warning was not logged"
+
+
+def test_unknown_provider_for_default_model_warns_but_does_not_fail(caplog):
+    with temporary_settings(llm_model="not-a-provider/not-a-model"):
+        with caplog.at_level("WARNING"):
+            assert controlflow.defaults.model is None
+
     # Check if the warning was logged
     assert any(
         record.levelname == "WARNING"
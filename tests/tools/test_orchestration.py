@@ -0,0 +1,50 @@
+from controlflow.tasks.task import Task
+from controlflow.tools.orchestration import (
+    create_task_fail_tool,
+    create_task_success_tool,
+)
+
+
+class TestTaskToolCaching:
+    def test_success_tool_is_reused(self):
+        task = Task("say hello")
+        assert create_task_success_tool(task) is create_task_success_tool(task)
+
+    def test_fail_tool_is_reused(self):
+        task = Task("say hello")
+        assert create_task_fail_tool(task) is create_task_fail_tool(task)
+
+    def test_tools_are_not_shared_between_tasks_with_the_same_id(self):
+        task_1 = Task("say hello", id="12345")
+        task_2 = Task("say hello", id="12345")
+        assert create_task_success_tool(task_1) is not create_task_success_tool(task_2)
+
+    def test_success_tool_is_replaced_when_result_type_changes(self):
+        task = Task("say hello", result_type=str)
+        tool = create_task_success_tool(task)
+        task.result_type = int
+        new_tool = create_task_success_tool(task)
+        assert new_tool is not tool
+        assert new_tool.parameters["properties"]["result"]["type"] == "integer"
+
+    def test_tools_are_replaced_when_id_changes(self):
+        task = Task("say hello")
+        tool = create_task_fail_tool(task)
+        task.id = "abcde"
+        new_tool = create_task_fail_tool(task)
+        assert new_tool is not tool
+        assert new_tool.name == "mark_task_abcde_failed"
+
+    def test_cached_tool_marks_task_successful(self):
+        task = Task("say hello")
+        tool = create_task_success_tool(task)
+        tool.run(input=dict(result="hello"))
+        assert task.is_successful()
+        assert task.result == "hello"
+
+    def test_cache_is_cleared_when_task_completes(self):
+        task = Task("say hello")
+        tool = create_task_success_tool(task)
+        task.mark_successful(result="hello")
+        assert task._orchestration_tools == {}
+        assert create_task_success_tool(task) is not tool
@@ -1,14 +1,26 @@
+import asyncio
+import gc
 import random
+import threading
+import time
+import weakref
 from typing import Annotated
 
+import controlflow.tools.tools
 import pytest
 from controlflow.agents.agent import Agent
 from controlflow.llm.messages import ToolMessage
+from controlflow.settings import temporary_settings
 from controlflow.tools.tools import (
     Tool,
+    as_tools,
+    get_function_schemas,
     handle_tool_call,
+    handle_tool_calls,
+    handle_tool_calls_async,
     tool,
 )
+from controlflow.utilities.context import ctx
 from pydantic import Field
 
 
@@ -154,6 +166,57 @@ class TestToolDecorator:
         assert foo.description == "Roll a die."
 
 
+class TestToolCaching:
+    def test_as_tools_reuses_tools(self):
+        def foo(x: int) -> int:
+            """Returns x"""
+            return x
+
+        [tool1] = as_tools([foo])
+        [tool2] = as_tools([foo])
+        assert tool1 is tool2
+        assert tool1.fn is foo
+
+    def test_schemas_are_computed_once(self, monkeypatch):
+        def foo(x: int) -> int:
+            return x
+
+        get_function_schemas(foo)
+        monkeypatch.setattr(
+            controlflow.tools.tools, "TypeAdapter", lambda *a: pytest.fail()
+        )
+        assert Tool.from_function(foo).parameters["properties"]["x"] == {
+            "title": "X",
+            "type": "integer",
+        }
+        assert Tool.from_function(foo, name="bar").name == "bar"
+
+    def test_cache_is_invalidated_when_function_changes(self):
+        def foo(x: int) -> int:
+            """Old description"""
+            return x
+
+        [tool1] = as_tools([foo])
+        foo.__doc__ = "New description"
+        [tool2] = as_tools([foo])
+        assert tool2 is not tool1
+        assert tool2.description.startswith("New description")
+
+        foo.__annotations__["x"] = str
+        [tool3] = as_tools([foo])
+        assert tool3.parameters["properties"]["x"]["type"] == "string"
+
+    def test_cache_does_not_keep_functions_alive(self):
+        def foo(x: int) -> int:
+            return x
+
+        as_tools([foo])
+        ref = weakref.ref(foo)
+        del foo
+        gc.collect()
+        assert ref() is None
+
+
 class TestRunTools:
     def run_tool(self):
         @tool
@@ -245,3 +308,185 @@ class TestHandleTools:
         message = handle_tool_call(tool_call, tools=[foo], agent=agent)
         assert message.agent.name == "test-agent"
         assert message.agent.id == agent.id
+
+
+class TestHandleToolCalls:
+    @pytest.fixture(autouse=True)
+    def untracked(self):
+        # these tests time concurrent calls, which Prefect tracking slows down
+        with temporary_settings(enable_prefect_tracking=False):
+            yield
+
+    def tool_calls(self, n: int, name: str = "foo") -> list[dict]:
+        return [{"name": name, "args": {"x": i}, "id": f"call_{i}"} for i in range(n)]
+
+    def test_sync_tool_calls_run_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=30)
+
+        @tool
+        def foo(x: int) -> int:
+            barrier.wait()
+            return x
+
+        results = handle_tool_calls(self.tool_calls(3), tools=[foo])
+        assert [r.tool_call_id for r in results] == ["call_0", "call_1", "call_2"]
+        assert [r.result for r in results] == [0, 1, 2]
+        assert not any(r.is_error for r in results)
+
+    def test_parallel_calls_to_different_tools_run_the_right_tool(self):
+        barrier = threading.Barrier(4, timeout=30)
+
+        def make_tool(i: int) -> Tool:
+            def fn() -> int:
+                barrier.wait()
+                return i
+
+            return Tool.from_function(fn, name=f"tool_{i}")
+
+        tools = [make_tool(i) for i in range(4)]
+        tool_calls = [
+            {"name": f"tool_{i}", "args": {}, "id": f"call_{i}"} for i in range(4)
+        ]
+        results = handle_tool_calls(tool_calls, tools=tools)
+        assert [r.result for r in results] == [0, 1, 2, 3]
+
+    def test_sync_tool_calls_are_bounded(self):
+        running = []
+        peak = []
+
+        @tool
+        def foo(x: int) -> int:
+            running.append(x)
+            peak.append(len(running))
+            time.sleep(0.01)
+            running.remove(x)
+            return x
+
+        with temporary_settings(max_parallel_tool_calls=1):
+            results = handle_tool_calls(self.tool_calls(4), tools=[foo])
+        assert [r.result for r in results] == [0, 1, 2, 3]
+        assert max(peak) == 1
+
+    def test_sync_tool_calls_see_context(self):
+        @tool
+        def foo(x: int) -> str:
+            return ctx.get("flow")
+
+        with ctx(flow="my-flow"):
+            results = handle_tool_calls(self.tool_calls(2), tools=[foo])
+        assert [r.result for r in results] == ["my-flow", "my-flow"]
+
+    def test_sync_errors_are_returned_in_order(self):
+        @tool
+        def foo(x: int) -> int:
+            if x == 1:
+                raise ValueError("bad")
+            return x
+
+        results = handle_tool_calls(
+            self.tool_calls(3) + self.tool_calls(1, name="bar"), tools=[foo]
+        )
+        assert [r.is_error for r in results] == [False, True, False, True]
+        assert results[1].str_result == 'Error calling function "foo": bad'
+        assert results[3].str_result == 'Function "bar" not found.'
+
+    async def test_async_tool_calls_run_concurrently(self):
+        event = asyncio.Event()
+        started = []
+
+        @tool
+        async def foo(x: int) -> int:
+            started.append(x)
+            if len(started) == 3:
+                event.set()
+            await asyncio.wait_for(event.wait(), timeout=5)
+            return x
+
+        results = await handle_tool_calls_async(self.tool_calls(3), tools=[foo])
+        assert [r.tool_call_id for r in results] == ["call_0", "call_1", "call_2"]
+        assert [r.result for r in results] == [0, 1, 2]
+        assert not any(r.is_error for r in results)
+
+    def test_serial_tools_run_alone(self):
+        events = []
+
+        @tool
+        def foo(x: int) -> int:
+            events.append(("start", x))
+            time.sleep(0.02)
+            events.append(("end", x))
+            return x
+
+        @tool(parallel=False)
+        def bar(x: int) -> int:
+            events.append(("start", "bar"))
+            time.sleep(0.02)
+            events.append(("end", "bar"))
+            return x
+
+        tool_calls = [
+            {"name": "foo", "args": {"x": 0}, "id": "call_0"},
+            {"name": "foo", "args": {"x": 1}, "id": "call_1"},
+            {"name": "bar", "args": {"x": 2}, "id": "call_2"},
+            {"name": "foo", "args": {"x": 3}, "id": "call_3"},
+        ]
+        results = handle_tool_calls(tool_calls, tools=[foo, bar])
+        assert [r.result for r in results] == [0, 1, 2, 3]
+        # both earlier calls finished before bar started, and bar finished
+        # before the last call started
+        assert set(events[:4]) == {("start", 0), ("end", 0), ("start", 1), ("end", 1)}
+        assert events[4:] == [
+            ("start", "bar"),
+            ("end", "bar"),
+            ("start", 3),
+            ("end", 3),
+        ]
+
+    async def test_async_serial_tools_run_alone(self):
+        events = []
+
+        @tool
+        async def foo(x: int) -> int:
+            events.append(("start", x))
+            await asyncio.sleep(0.02)
+            events.append(("end", x))
+            return x
+
+        @tool(parallel=False)
+        async def bar(x: int) -> int:
+            events.append(("start", "bar"))
+            await asyncio.sleep(0.02)
+            events.append(("end", "bar"))
+            return x
+
+        tool_calls = [
+            {"name": "bar", "args": {"x": 0}, "id": "call_0"},
+            {"name": "foo", "args": {"x": 1}, "id": "call_1"},
+            {"name": "bar", "args": {"x": 2}, "id": "call_2"},
+        ]
+        results = await handle_tool_calls_async(tool_calls, tools=[foo, bar])
+        assert [r.result for r in results] == [0, 1, 2]
+        assert events == [
+            ("start", "bar"),
+            ("end", "bar"),
+            ("start", 1),
+            ("end", 1),
+            ("start", "bar"),
+            ("end", "bar"),
+        ]
+
+    def test_talk_to_user_and_orchestration_tools_are_serial(self):
+        from controlflow.tasks.task import Task
+        from controlflow.tools.orchestration import (
+            create_end_turn_tool,
+            create_task_fail_tool,
+            create_task_success_tool,
+        )
+        from controlflow.tools.talk_to_user import talk_to_user
+
+        task = Task("test")
+        assert not talk_to_user.parallel
+        assert not create_end_turn_tool(Agent()).parallel
+        assert not create_task_success_tool(task).parallel
+        assert not create_task_fail_tool(task).parallel
+        assert Tool.from_function(lambda: None).parallel
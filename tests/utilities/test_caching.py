@@ -0,0 +1,55 @@
+import gc
+import weakref
+
+from controlflow.utilities.caching import IdentityKey, LRUCache
+
+
+class TestLRUCache:
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_get_or_create(self):
+        cache = LRUCache(max_size=2)
+        assert cache.get_or_create("a", create=lambda: [1]) == [1]
+        value = cache.get("a")
+        assert cache.get_or_create("a", create=lambda: [2]) is value
+        # invalid values are replaced
+        assert cache.get_or_create(
+            "a", create=lambda: [3], is_valid=lambda v: False
+        ) == [3]
+
+    def test_clear(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.clear()
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestIdentityKey:
+    def test_keys_compare_by_identity(self):
+        a = []
+        b = []
+        assert IdentityKey(a) == IdentityKey(a)
+        assert hash(IdentityKey(a)) == hash(IdentityKey(a))
+        assert IdentityKey(a) != IdentityKey(b)
+        assert IdentityKey(a) != id(a)
+
+    def test_keys_keep_their_object(self):
+        class Obj:
+            pass
+
+        obj = Obj()
+        ref = weakref.ref(obj)
+        key = IdentityKey(obj)
+        del obj
+        gc.collect()
+        assert ref() is key.obj
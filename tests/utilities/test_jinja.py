@@ -0,0 +1,26 @@
+from controlflow.orchestration.prompt_templates import Template
+from controlflow.settings import temporary_settings
+from controlflow.utilities.jinja import get_template, prompt_env, template_from_string
+
+
+class TestTemplateCache:
+    def test_templates_from_strings_are_compiled_once(self):
+        template = template_from_string("Hello {{ name }}")
+        assert template_from_string("Hello {{ name }}") is template
+        assert template_from_string("Goodbye {{ name }}") is not template
+
+    def test_custom_prompts_use_cached_templates(self, monkeypatch):
+        Template(template="Hi {{ name }}", name="Marvin").render()
+        monkeypatch.setattr(prompt_env, "from_string", lambda source: 1 / 0)
+        assert Template(template="Hi {{ name }}", name="Ford").render() == "Hi Ford"
+
+    def test_template_files_are_not_reloaded_by_default(self, monkeypatch):
+        template = get_template("agent.md.jinja")
+        monkeypatch.setattr(template, "_uptodate", lambda: False)
+        assert get_template("agent.md.jinja") is template
+
+    def test_template_files_are_reloaded_when_enabled(self, monkeypatch):
+        template = get_template("agent.md.jinja")
+        monkeypatch.setattr(template, "_uptodate", lambda: False)
+        with temporary_settings(prompt_template_auto_reload=True):
+            assert get_template("agent.md.jinja") is not template
@@ -0,0 +1,246 @@
+import threading
+import time
+import uuid
+
+import controlflow
+import controlflow.utilities.prefect
+import prefect.settings
+import pytest
+from controlflow.llm.messages import AIMessage
+from controlflow.settings import temporary_settings
+from controlflow.tasks.task import Task
+from controlflow.tools.tools import tool
+from controlflow.utilities.prefect import (
+    PrefectExporter,
+    create_markdown_artifact,
+    prefect_exporter,
+    prefect_flow,
+    prefect_flow_context,
+)
+from prefect.client.orchestration import get_client
+from prefect.client.schemas.filters import ArtifactFilter, ArtifactFilterKey
+from prefect.context import FlowRunContext, TaskRunContext
+from prefect.utilities.asyncutils import run_coro_as_sync
+
+
+@pytest.fixture
+def exporter():
+    exporter = PrefectExporter()
+    yield exporter
+    exporter.flush(timeout=10)
+
+
+class TestPrefectExporter:
+    def test_submit_does_not_wait_for_jobs(self, exporter):
+        release = threading.Event()
+        exporter.submit(lambda client: release.wait(5))
+
+        start = time.perf_counter()
+        exporter.submit(lambda client: None)
+        assert time.perf_counter() - start < 0.5
+        assert not exporter.flush(timeout=0.1)
+
+        release.set()
+        assert exporter.flush(timeout=5)
+
+    def test_jobs_run_in_order(self, exporter):
+        exporter.batch_size = 3
+        results = []
+        for i in range(10):
+            exporter.submit(lambda client, i=i: results.append(i))
+        exporter.flush(timeout=5)
+        assert results == list(range(10))
+
+    def test_jobs_receive_a_shared_client(self, exporter):
+        clients = []
+        for _ in range(3):
+            exporter.submit(clients.append)
+        exporter.flush(timeout=5)
+        assert len({id(c) for c in clients}) == 1
+
+    def test_jobs_run_in_the_submitting_context(self, exporter):
+        results = []
+        with prefect.settings.temporary_settings(
+            {prefect.settings.PREFECT_TASK_DEFAULT_RETRIES: 7}
+        ):
+            exporter.submit(
+                lambda client: results.append(
+                    prefect.settings.PREFECT_TASK_DEFAULT_RETRIES.value()
+                )
+            )
+        exporter.flush(timeout=5)
+        assert results == [7]
+
+    def test_errors_are_logged_not_raised(self, exporter, caplog):
+        results = []
+        exporter.submit(lambda client: 1 / 0)
+        exporter.submit(lambda client: results.append("ok"))
+        exporter.flush(timeout=5)
+        assert results == ["ok"]
+        assert "Error exporting to Prefect" in caplog.text
+
+    def test_jobs_run_immediately_without_background_export(self, exporter):
+        results = []
+        with temporary_settings(enable_background_prefect_export=False):
+            exporter.submit(lambda client: results.append(threading.current_thread()))
+        assert results == [threading.current_thread()]
+
+
+def test_create_markdown_artifact():
+    key = f"test-artifact-{uuid.uuid4().hex[:8]}"
+    create_markdown_artifact(key=key, markdown="# hello")
+    assert prefect_exporter.flush(timeout=10)
+
+    artifacts = run_coro_as_sync(
+        get_client().read_artifacts(
+            artifact_filter=ArtifactFilter(key=ArtifactFilterKey(any_=[key]))
+        )
+    )
+    assert [a.data for a in artifacts] == ["# hello"]
+
+
+def test_artifacts_use_the_exporters_client(monkeypatch):
+    jobs = []
+    monkeypatch.setattr(prefect_exporter, "submit", jobs.append)
+    monkeypatch.setattr(prefect, "get_client", lambda *args, **kwargs: 1 / 0)
+
+    key = f"test-artifact-{uuid.uuid4().hex[:8]}"
+    create_markdown_artifact(key=key, markdown="# hello")
+    [job] = jobs
+    with get_client(sync_client=True) as client:
+        job(client)
+
+    artifacts = run_coro_as_sync(
+        get_client().read_artifacts(
+            artifact_filter=ArtifactFilter(key=ArtifactFilterKey(any_=[key]))
+        )
+    )
+    assert [a.data for a in artifacts] == ["# hello"]
+
+
+def test_flow_context_does_not_wait_for_hung_exports():
+    release = threading.Event()
+    prefect_exporter.submit(lambda client: release.wait(30))
+    try:
+        with temporary_settings(background_prefect_export_timeout=0.1):
+            start = time.perf_counter()
+            with prefect_flow_context():
+                pass
+            assert time.perf_counter() - start < 10
+    finally:
+        release.set()
+        assert prefect_exporter.flush(timeout=10)
+
+
+class TestDecoratedFlowsFlush:
+    @pytest.fixture
+    def flushes(self, monkeypatch):
+        flushes = []
+        flush = prefect_exporter.flush
+
+        def record_flush(timeout=None):
+            flushes.append((timeout, FlowRunContext.get() is not None))
+            return flush(timeout=timeout)
+
+        monkeypatch.setattr(prefect_exporter, "flush", record_flush)
+        return flushes
+
+    def test_decorated_flows_flush_before_completing(self, flushes):
+        @controlflow.flow
+        def foo() -> int:
+            return 1
+
+        with temporary_settings(background_prefect_export_timeout=7):
+            assert foo() == 1
+        assert flushes == [(7, True)]
+
+    async def test_async_prefect_flows_flush_before_completing(self, flushes):
+        @prefect_flow
+        async def foo() -> int:
+            return 1
+
+        assert await foo() == 1
+        timeout = controlflow.settings.background_prefect_export_timeout
+        assert flushes == [(timeout, True)]
+
+    def test_untracked_flows_do_not_flush(self, flushes):
+        @controlflow.flow
+        def foo() -> int:
+            return 1
+
+        with temporary_settings(enable_prefect_tracking=False):
+            assert foo() == 1
+        assert flushes == []
+
+
+class TestDisablePrefectTracking:
+    @pytest.fixture(autouse=True)
+    def disable_tracking(self):
+        with temporary_settings(enable_prefect_tracking=False):
+            yield
+
+    @pytest.fixture
+    def timings(self, monkeypatch):
+        timings = []
+        monkeypatch.setattr(
+            controlflow.utilities.prefect,
+            "untracked_run_hooks",
+            [lambda name, duration: timings.append((name, duration))],
+        )
+        return timings
+
+    def test_tool_runs_without_a_task_run(self):
+        @tool
+        def foo() -> bool:
+            return TaskRunContext.get() is None
+
+        assert foo.run(input={}) is True
+
+    async def test_async_tool_runs_without_a_task_run(self):
+        @tool
+        async def foo() -> bool:
+            return TaskRunContext.get() is None
+
+        assert await foo.run_async(input={}) is True
+
+    def test_flow_runs_without_a_flow_run(self):
+        @controlflow.flow
+        def foo() -> bool:
+            return FlowRunContext.get() is None
+
+        assert foo() is True
+        assert foo.prefect_flow._flow is None
+
+    def test_timing_hooks(self, timings):
+        @tool
+        def foo(x: int) -> int:
+            return x
+
+        assert foo.run(input=dict(x=1)) == 1
+        [(name, duration)] = timings
+        assert name == "Tool call: foo"
+        assert duration >= 0
+
+    async def test_timing_hooks_async(self, timings):
+        @tool
+        async def foo(x: int) -> int:
+            return x
+
+        assert await foo.run_async(input=dict(x=1)) == 1
+        assert [name for name, _ in timings] == ["Tool call: foo"]
+
+    def test_task_runs_without_tracking(self, default_fake_llm):
+        task = Task("say hello")
+        response = AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": f"mark_task_{task.id}_successful",
+                    "args": {"result": "hello"},
+                    "id": "call_1",
+                }
+            ],
+        )
+        default_fake_llm.set_responses([response])
+        assert task.run() == "hello"
+        assert not task._prefect_task.is_started
@@ -0,0 +1,99 @@
+import threading
+from typing import Annotated
+
+import controlflow.utilities.type_adapters
+import pytest
+from controlflow.tasks.task import validate_result
+from controlflow.tools.tools import output_to_string
+from controlflow.utilities.type_adapters import TypeAdapterCache, type_adapter_cache
+from pydantic import BaseModel
+
+
+class Point(BaseModel):
+    x: int
+    y: int
+
+
+class TestTypeAdapterCache:
+    def test_adapters_are_cached(self):
+        cache = TypeAdapterCache()
+        adapter = cache.get(Point)
+        assert cache.get(Point) is adapter
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_equal_generic_aliases_share_adapters(self):
+        cache = TypeAdapterCache()
+        assert cache.get(list[int]) is cache.get(list[int])
+        assert cache.get(list[int]) is not cache.get(list[str])
+
+    def test_unhashable_types(self):
+        cache = TypeAdapterCache()
+        result_type = list[Annotated[int, {"unhashable": True}]]
+        adapter = cache.get(result_type)
+        assert adapter.validate_python(["1"]) == [1]
+        assert cache.get(result_type) is adapter
+        # unhashable types are keyed by identity
+        assert cache.get(list[Annotated[int, {"unhashable": True}]]) is not adapter
+
+    def test_json_schemas_are_cached(self, monkeypatch):
+        cache = TypeAdapterCache()
+        schema = cache.get_json_schema(Point)
+        assert schema["title"] == "Point"
+        monkeypatch.setattr(cache.get(Point), "json_schema", lambda: 1 / 0)
+        assert cache.get_json_schema(Point) is schema
+
+    def test_cache_is_bounded(self):
+        cache = TypeAdapterCache(max_size=2)
+        adapter = cache.get(int)
+        cache.get(str)
+        cache.get(int)
+        cache.get(float)
+        assert len(cache) == 2
+        assert cache.get(int) is adapter
+        assert cache.misses == 3
+
+    def test_errors_are_not_cached(self):
+        class NotAType:
+            pass
+
+        cache = TypeAdapterCache()
+        for _ in range(2):
+            with pytest.raises(Exception):
+                cache.get(NotAType)
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = TypeAdapterCache()
+        cache.get(int)
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_threads_share_adapters(self):
+        cache = TypeAdapterCache()
+        cache.get(Point)
+        adapters = []
+        threads = [
+            threading.Thread(target=lambda: adapters.append(cache.get(Point)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(map(id, adapters))) == 1
+
+
+class TestCacheUsage:
+    def test_validate_result(self, monkeypatch):
+        validate_result({"x": 1, "y": 2}, Point)
+        monkeypatch.setattr(
+            controlflow.utilities.type_adapters, "TypeAdapter", lambda t: 1 / 0
+        )
+        assert validate_result({"x": 3, "y": 4}, Point) == Point(x=3, y=4)
+
+    def test_output_to_string(self):
+        hits = type_adapter_cache.hits
+        output_to_string(Point(x=1, y=2))
+        assert output_to_string(Point(x=1, y=2)) == '{"x":1,"y":2}'
+        assert type_adapter_cache.hits > hits